@@ -0,0 +1,8 @@
+"""
+Benchmarks de LeanBridge (génération Lean, lexer, convertisseur inverse, aller-retour,
+durée des imports à froid).
+
+Lancement depuis la racine du dépôt : python -m benchmarks.run
+Les résultats sont comparés à la référence versionnée baseline.json (échelle 1) ;
+après une optimisation voulue : python -m benchmarks.run --save-baseline
+"""
@@ -0,0 +1,265 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from leanbridge import LeanBridgeInterpreter
+from reverse import LeanLexer, LeanToPythonConverter
+from . import workloads
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join(HERE, "results.json")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+
+class Case(NamedTuple):
+    """
+    Un benchmark : setup() prépare l'état (non mesuré), run(état) est la partie
+    mesurée et retourne le nombre d'unités traitées (pour le débit).
+    Avec self_timed, run(état) mesure lui-même et retourne (unités, secondes) ;
+    le pic mémoire n'est alors pas mesuré (ex: travail fait dans un autre processus).
+    """
+    name: str
+    unit: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+    self_timed: bool = False
+
+# Code exécuté dans un interpréteur neuf : durée de 'statement' seule (démarrage de Python exclu)
+_COLD_START = "import time\nstart = time.perf_counter()\n{statement}\nprint(time.perf_counter() - start)"
+
+def _size(n: int, scale: float) -> int:
+    return max(1, int(n * scale))
+
+def _filled(build: Callable, *sizes: int) -> Callable[[], Tuple[LeanBridgeInterpreter, int]]:
+    def setup():
+        bridge = LeanBridgeInterpreter()
+        return bridge, build(bridge, *sizes)
+    return setup
+
+def _process(state: Tuple[LeanBridgeInterpreter, int]) -> int:
+    bridge, units = state
+    bridge.process()
+    return units
+
+def _rendered(setup: Callable[[], Tuple[LeanBridgeInterpreter, int]]) -> Callable[[], Tuple[LeanBridgeInterpreter, int]]:
+    def wrapped():
+        state = setup()
+        state[0].process() # Le passage mesuré réutilise le cache de rendu
+        return state
+    return wrapped
+
+def _dump_ir(state: Tuple[LeanBridgeInterpreter, int]) -> int:
+    bridge, units = state
+    bridge.dump_buffer(io.BytesIO())
+    return units
+
+def _encoded(setup: Callable[[], Tuple[LeanBridgeInterpreter, int]]) -> Callable[[], Tuple[bytes, int]]:
+    def wrapped():
+        bridge, units = setup()
+        buffer = io.BytesIO()
+        bridge.dump_buffer(buffer)
+        return buffer.getvalue(), units
+    return wrapped
+
+def _load_ir(state: Tuple[bytes, int]) -> int:
+    data, units = state
+    LeanBridgeInterpreter().load_buffer(io.BytesIO(data))
+    return units
+
+def _index_symbols(state: Tuple[LeanBridgeInterpreter, int]) -> int:
+    bridge, units = state
+    bridge.symbols.names_under("")
+    return units
+
+def _tokenize(source: str) -> int:
+    return len(LeanLexer().tokenize(source))
+
+def _stray_quote(source: Callable[[], str]) -> Callable[[], bytes]:
+    """Source encodée précédée d'un littéral caractère '"' : guillemet jamais refermé."""
+    return lambda: ("def quote : Char := '\"'\n" + source()).encode("utf-8")
+
+def _stream(data: bytes) -> int:
+    return sum(1 for _ in LeanLexer().iter_tokens(data))
+
+def _opened(source: Callable[[], str]) -> Callable[[], Any]:
+    return lambda: LeanLexer().open_document(source())
+
+def _edit(document: Any) -> int:
+    """Frappe au milieu du document : un caractère par édition, un saut de ligne toutes les 5."""
+    line = document.line_count // 2
+    for i in range(2_000):
+        document.edit((line, 0), (line, 0), "x" if i % 5 else "\n")
+        line += i % 5 == 0
+    return 2_000
+
+def _convert(source: str) -> int:
+    converter = LeanToPythonConverter()
+    converter.convert(source)
+    return converter.token_count
+
+def _round_trip(source: str) -> int:
+    """Lean -> script Python -> exécution du script -> Lean."""
+    converter = LeanToPythonConverter()
+    script = converter.convert(source)
+    namespace: Dict[str, Any] = {}
+    exec(compile(script, "<round-trip>", "exec"), namespace)
+    namespace["bridge"].process()
+    return converter.token_count
+
+def _cold_start(statement: str) -> Callable[[], str]:
+    return lambda: statement
+
+def _run_cold(statement: str) -> Tuple[int, float]:
+    """Exécute 'statement' dans un nouvel interpréteur (imports à froid) et retourne sa durée."""
+    root = os.path.dirname(HERE)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-c", _COLD_START.format(statement=statement)],
+                            cwd=root, env=env, check=True, capture_output=True, text=True).stdout
+    return 1, float(output.split()[-1])
+
+def build_cases(scale: float = 1.0) -> List[Case]:
+    s = lambda n: _size(n, scale)
+    source = lambda: workloads.lean_source(s(20_000))
+    return [
+        Case("process.nested_scopes", "actions", _filled(workloads.build_nested_scopes, s(100), s(20)), _process),
+        Case("process.wide_structure", "champs", _filled(workloads.build_wide_structure, s(10_000)), _process),
+        Case("process.long_bodies", "définitions", _filled(workloads.build_long_bodies, s(100), s(5_000)), _process),
+        Case("process.huge_inductive", "constructeurs", _filled(workloads.build_huge_inductive, s(20_000)), _process),
+        Case("process.claims", "actions", _filled(workloads.build_claims, s(20_000)), _process),
+        Case("process.bulk_definitions", "définitions", _filled(workloads.build_bulk_definitions, s(100_000)), _process),
+        Case("process.rerender", "actions", _rendered(_filled(workloads.build_claims, s(20_000))), _process),
+        Case("symbols.index", "définitions", _filled(workloads.build_bulk_definitions, s(100_000)), _index_symbols),
+        Case("ir.dump", "actions", _filled(workloads.build_claims, s(20_000)), _dump_ir),
+        Case("ir.load", "actions", _encoded(_filled(workloads.build_claims, s(20_000))), _load_ir),
+        Case("lexer.tokenize", "tokens", source, _tokenize),
+        Case("lexer.edit", "éditions", _opened(source), _edit),
+        Case("lexer.stream_stray_quote", "tokens", _stray_quote(source), _stream),
+        Case("converter.convert", "tokens", source, _convert),
+        Case("roundtrip.lean_python_lean", "tokens", source, _round_trip),
+        Case("import.leanbridge", "imports", _cold_start("import leanbridge"), _run_cold, True),
+        Case("import.first_process", "imports", _cold_start(
+            "import leanbridge\nbridge = leanbridge.LeanBridgeInterpreter()\n"
+            "bridge.add_action(leanbridge.ActionDefine('f', 'n * n', ['(n : Nat)'], 'Nat'))\nbridge.process()"),
+            _run_cold, True),
+        Case("import.reverse", "imports", _cold_start("from reverse import LeanToPythonConverter"), _run_cold, True),
+    ]
+
+def measure(case: Case, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Meilleur temps et temps moyen sur 'repeat' exécutions, puis pic mémoire mesuré
+    par tracemalloc lors d'une exécution séparée (tracemalloc ralentit le code).
+    """
+    times = []
+    units = 0
+    for _ in range(repeat):
+        state = case.setup()
+        gc.collect()
+        if case.self_timed:
+            units, elapsed = case.run(state)
+            times.append(elapsed)
+            continue
+        start = time.perf_counter()
+        units = case.run(state)
+        times.append(time.perf_counter() - start)
+        del state
+
+    peak = 0
+    if not case.self_timed:
+        state = case.setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.run(state)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "seconds": best,
+        "mean_seconds": sum(times) / len(times),
+        "peak_bytes": peak,
+        "units": units,
+        "unit": case.unit,
+        "throughput": units / best if best else 0.0,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Retourne les régressions (temps ou pic mémoire au-delà de la tolérance)."""
+    regressions = []
+    for name, current in results["cases"].items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            continue
+        for key, label in (("seconds", "temps"), ("peak_bytes", "mémoire")):
+            if reference[key] and current[key] > reference[key] * (1 + tolerance):
+                regressions.append(f"{name}: {label} x{current[key] / reference[key]:.2f}")
+    return regressions
+
+def _format_row(name: str, result: Dict[str, Any], reference: Optional[Dict[str, Any]]) -> str:
+    ratio = f"x{result['seconds'] / reference['seconds']:.2f}" if reference and reference["seconds"] else ""
+    return (f"{name:<30} {result['seconds'] * 1000:>10.1f} ms {result['peak_bytes'] / 2**20:>9.1f} Mo "
+            f"{result['throughput']:>14,.0f} {result['unit']}/s {ratio:>7}")
+
+def _write_json(path: str, data: Dict[str, Any]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks LeanBridge (process, symboles, IR, lexer, convertisseur, aller-retour, imports).")
+    parser.add_argument("--scale", type=float, default=1.0, help="facteur appliqué à la taille des charges")
+    parser.add_argument("--repeat", type=int, default=3, help="exécutions mesurées par benchmark")
+    parser.add_argument("-k", "--filter", default="", help="ne lance que les benchmarks dont le nom contient ce texte")
+    parser.add_argument("--output", default=DEFAULT_RESULTS, help="fichier JSON des résultats")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="référence à comparer")
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="écart relatif toléré avant régression")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != args.scale:
+            print(f"Référence ignorée : échelle {baseline.get('scale')} != {args.scale}")
+            baseline = None
+
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "cases": {},
+    }
+    for case in build_cases(args.scale):
+        if args.filter not in case.name:
+            continue
+        result = measure(case, args.repeat)
+        results["cases"][case.name] = result
+        reference = baseline["cases"].get(case.name) if baseline else None
+        print(_format_row(case.name, result, reference), flush=True)
+
+    _write_json(args.output, results)
+    print(f"Résultats : {args.output}")
+    if args.save_baseline:
+        _write_json(args.baseline, results)
+        print(f"Référence enregistrée : {args.baseline}")
+        return 0
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"RÉGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
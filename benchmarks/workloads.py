@@ -0,0 +1,76 @@
+from contextlib import ExitStack
+from typing import Iterator
+from leanbridge import LeanBridgeInterpreter
+from leanbridge.actions.commands import ActionDefine, ActionClaim, ActionSolve
+
+# Générateurs de charges synthétiques. Chaque fonction 'build_*' remplit un
+# interpréteur et retourne le nombre d'actions (ou de lignes) ajoutées.
+
+def build_nested_scopes(bridge: LeanBridgeInterpreter, depth: int = 100, defs_per_scope: int = 20) -> int:
+    """Namespace/Section imbriqués sur 'depth' niveaux, avec des définitions à chaque niveau."""
+    count = 0
+    with ExitStack() as stack:
+        for level in range(depth):
+            scope = bridge.Namespace(f"N{level}") if level % 2 == 0 else bridge.Section(f"S{level}")
+            stack.enter_context(scope)
+            for i in range(defs_per_scope):
+                bridge.add_action(ActionDefine(f"d{level}_{i}", f"n + {i}", args=["(n : Nat)"], type_hint="Nat"))
+            count += defs_per_scope + 2
+    return count
+
+def build_wide_structure(bridge: LeanBridgeInterpreter, fields: int = 10_000) -> int:
+    """Une structure de 'fields' champs."""
+    types = ("Nat", "Int", "Real", "Prop")
+    bridge.define_structure("Wide", {f"field{i}": types[i % len(types)] for i in range(fields)})
+    return fields
+
+def build_long_bodies(bridge: LeanBridgeInterpreter, count: int = 100, terms: int = 5_000) -> int:
+    """Définitions dont le corps ('value_expr') est une somme de 'terms' termes."""
+    body = " + ".join(f"x * {i}" for i in range(terms))
+    for i in range(count):
+        bridge.add_action(ActionDefine(f"long{i}", body, args=["(x : Nat)"], type_hint="Nat"))
+    return count
+
+def build_huge_inductive(bridge: LeanBridgeInterpreter, constructors: int = 20_000) -> int:
+    """Un inductif de 'constructors' constructeurs."""
+    bridge.define_inductive("Huge", [f"c{i} : Nat → Huge" if i % 2 else f"c{i}" for i in range(constructors)])
+    return constructors
+
+def build_claims(bridge: LeanBridgeInterpreter, count: int = 20_000) -> int:
+    """Paires énoncé / preuve."""
+    for i in range(count):
+        bridge.add_action(ActionClaim(f"lemma{i}", f"{i} + 0 = {i}"))
+        bridge.add_action(ActionSolve("simp"))
+    return 2 * count
+
+def build_bulk_definitions(bridge: LeanBridgeInterpreter, count: int = 100_000) -> int:
+    """Définitions en masse par define_many (stockage en colonnes)."""
+    return bridge.define_many((f"bulk{i}", f"n * {i}", ["(n : Nat)"], "Nat") for i in range(count))
+
+def iter_lean_source(declarations: int = 20_000) -> Iterator[str]:
+    """Lignes d'un fichier Lean synthétique d'environ 'declarations' déclarations."""
+    yield "import Mathlib"
+    yield ""
+    block = 0
+    emitted = 0
+    while emitted < declarations:
+        yield f"namespace Block{block}"
+        yield ""
+        yield "variable (x : ℝ)"
+        yield ""
+        yield f"structure Point{block} where"
+        yield "  x : Float"
+        yield "  y : Float"
+        yield ""
+        for i in range(min(50, declarations - emitted)):
+            name = f"f{block}_{i}"
+            yield f"def {name} (n : ℕ) : ℕ := n * n + {i}"
+            yield f"theorem {name}_pos : {name} 1 ≥ {i} := by simp"
+            yield "-- commentaire"
+            emitted += 2
+        yield f"end Block{block}"
+        yield ""
+        block += 1
+
+def lean_source(declarations: int = 20_000) -> str:
+    return "\n".join(iter_lean_source(declarations))
@@ -1,3 +1,14 @@
-from .interpreter import LeanBridgeInterpreter
-from .core.objects import MathObject, MScalar, MSet, MFunc, MStruct
-from .actions.commands import ActionDeclare, ActionDefine, ActionClaim, ActionSolve
+from typing import TYPE_CHECKING
+from ._lazy import lazy_exports
+
+# Les modules ne sont importés qu'au premier accès (démarrage à froid rapide)
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".interpreter": ("LeanBridgeInterpreter",),
+    ".core.objects": ("MathObject", "MScalar", "MSet", "MFunc", "MStruct", "MStructure", "MInductive"),
+    ".actions.commands": ("ActionDeclare", "ActionDefine", "ActionClaim", "ActionSolve"),
+})
+
+if TYPE_CHECKING:
+    from .interpreter import LeanBridgeInterpreter
+    from .core.objects import MathObject, MScalar, MSet, MFunc, MStruct, MStructure, MInductive
+    from .actions.commands import ActionDeclare, ActionDefine, ActionClaim, ActionSolve
@@ -0,0 +1,25 @@
+import sys
+from importlib import import_module
+from typing import Callable, Dict, List, Sequence, Tuple
+
+def lazy_exports(package: str, modules: Dict[str, Sequence[str]]) -> Tuple[Callable, Callable, List[str]]:
+    """
+    Chargement paresseux des attributs d'un paquet (PEP 562).
+    'modules' associe un module relatif aux noms publics qu'il définit ; chaque module
+    n'est importé qu'au premier accès à l'un de ses noms. Retourne (__getattr__, __dir__, __all__).
+    """
+    namespace = sys.modules[package].__dict__
+    exports = {name: module for module, names in modules.items() for name in names}
+
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value # Les accès suivants ne passent plus par __getattr__
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*namespace, *exports})
+
+    return __getattr__, __dir__, list(exports)
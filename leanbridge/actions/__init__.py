@@ -1,3 +1,15 @@
-from .commands import Action, ActionDeclare, ActionDefine, ActionClaim, ActionSolve, ActionRaw
-from .scopes import ActionStartScope, ActionEndScope
-from .definitions_extended import ActionDefineStructure, ActionDefineInductive
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".commands": ("Action", "ActionDeclare", "ActionDefine", "ActionClaim", "ActionSolve", "ActionRaw"),
+    ".scopes": ("ActionStartScope", "ActionEndScope"),
+    ".definitions_extended": ("ActionDefineStructure", "ActionDefineInductive"),
+    ".tables": ("ActionTable", "ActionStructureTable", "read_records"),
+})
+
+if TYPE_CHECKING:
+    from .commands import Action, ActionDeclare, ActionDefine, ActionClaim, ActionSolve, ActionRaw
+    from .scopes import ActionStartScope, ActionEndScope
+    from .definitions_extended import ActionDefineStructure, ActionDefineInductive
+    from .tables import ActionTable, ActionStructureTable, read_records
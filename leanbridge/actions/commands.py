@@ -1,18 +1,97 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Any
+import re
+from typing import Optional, Any, List, Tuple
 from ..core.objects import MathObject
+from ..core.tracked import CONTAINERS, bump, copy_state, track
 from ..inference.context import ContextManager
 from ..inference.mapper import LibraryMapper
 
+def _revisions(obj: MathObject, out: List[int]):
+    """Révisions d'un MathObject modifiable et de ceux qu'il référence (les objets internés n'en ont pas)."""
+    state = getattr(obj, "__dict__", None)
+    if state is None:
+        return
+    for name, value in list(state.items()):
+        kind = type(value)
+        if kind is list or kind is dict:
+            state[name] = track(value, obj) # Objet désérialisé ou copié : conteneur pas encore suivi
+        elif isinstance(value, MathObject):
+            _revisions(value, out)
+    out.append(obj._rev)
+
 class Action(ABC):
     """
     Représente une intention atomique de l'utilisateur.
+
+    Chaque affectation d'attribut renouvelle '_rev', ce qui permet à l'interpréteur
+    de réutiliser le rendu d'une action inchangée. Les listes et dicts affectés sont
+    copiés dans des conteneurs suivis (voir core/tracked.py) dont les modifications
+    en place renouvellent aussi '_rev' ; celles des MathObject référencés sont
+    détectées par nested_state(). touch() reste disponible pour les autres cas
+    (ex: MathObject rangé dans une liste).
     """
+    # True si to_lean ne dépend que des champs de l'action et du mapper (pas d'effet sur le contexte)
+    is_pure: bool = False
+    # Gabarit de rendu équivalent à to_lean (voir actions/templates.py) : les actions
+    # pures d'une classe à gabarit sont rendues par lots par une fonction compilée.
+    # Toute modification de to_lean doit être reportée dans le gabarit.
+    lean_template: Optional[str] = None
+    # Sorte des noms déclarés, pour l'index des symboles (voir inference/symbols.py)
+    symbol_kind: str = "declaration"
+    _rev: int = 0
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, track(value, self) if type(value) in CONTAINERS else value)
+        bump(self)
+
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        copy_state(self, clone)
+        return clone
+
+    def touch(self):
+        """Marque l'action comme modifiée (à appeler après une mutation en place non suivie)."""
+        bump(self)
+
+    def changed_since(self, revision: int) -> bool:
+        """Vrai si l'action ou un MathObject qu'elle référence a été modifié après 'revision' (voir core/tracked.py)."""
+        if self._rev > revision:
+            return True
+        revisions = Action.nested_state(self)
+        return revisions is not None and max(revisions) > revision
+
+    def nested_state(self) -> Optional[Tuple]:
+        """
+        Révisions des MathObject modifiables référencés par l'action, ou None s'il n'y
+        en a pas : une valeur différente à '_rev' égal signale une mutation en place.
+        Le coût ne dépend que du nombre d'attributs, pas de la taille de leur contenu.
+        Les listes et dicts pas encore suivis (action désérialisée ou copiée) sont
+        remplacés par des conteneurs suivis.
+        """
+        state = self.__dict__
+        revisions: List[int] = []
+        for name, value in list(state.items()):
+            kind = type(value)
+            if kind is list or kind is dict:
+                state[name] = track(value, self)
+            elif isinstance(value, MathObject):
+                _revisions(value, revisions)
+        return tuple(revisions) if revisions else None
+
     @abstractmethod
     def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
         """Traduit l'action en code Lean."""
         pass
 
+    def declared_names(self) -> List[str]:
+        """Noms (relatifs au namespace courant) que l'action définit en Lean. Sert au découpage en modules."""
+        return []
+
+    def declared_symbols(self) -> List[Tuple[str, str]]:
+        """(nom, sorte) des noms déclarés, noms induits compris (champs, constructeurs). Sert à l'index des symboles."""
+        kind = self.symbol_kind
+        return [(name, kind) for name in self.declared_names()]
+
 class ActionDeclare(Action):
     """
     Déclare une variable ou une hypothèse dans le contexte courant.
@@ -29,7 +108,7 @@ class ActionDeclare(Action):
         
         type_str = self.obj_type.lean_type_hint
         # Mapper les noms de types si nécessaire (ex: "Real" -> "Real")
-        type_str = mapper.get_lean_name(type_str)
+        type_str = mapper.map_type(type_str)
         
         if self.is_hypothesis:
              # Hypothèse nommée ? Pour l'instant on garde simple : variable
@@ -37,21 +116,40 @@ class ActionDeclare(Action):
         else:
              return f"variable ({self.name} : {type_str})"
 
+# Déclarations reconnues dans du code brut (heuristique)
+_RAW_DECLARATION = re.compile(
+    r"^[ \t]*(?:@\[[^\]]*\][ \t]*)?(?:(?:private|protected|noncomputable|partial|unsafe)[ \t]+)*"
+    r"(def|theorem|lemma|abbrev|structure|inductive|class|instance|axiom|opaque)[ \t]+([^\s:({\[]+)",
+    re.MULTILINE,
+)
+
 class ActionRaw(Action):
     """
     Injecte du code Lean brut. Utile pour les imports, sections, ou fonctionnalités non encore supportées.
     """
+    is_pure = True
+
     def __init__(self, content: str):
         self.content = content
 
     def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
         return self.content
 
+    def declared_names(self) -> List[str]:
+        return [name for _, name in _RAW_DECLARATION.findall(str(self.content))]
+
+    def declared_symbols(self) -> List[Tuple[str, str]]:
+        return [(name, keyword) for keyword, name in _RAW_DECLARATION.findall(str(self.content))]
+
 class ActionDefine(Action):
     """
     Définit une nouvelle entité (fonction ou valeur).
     Ex: f(n) := n * n
     """
+    is_pure = True
+    lean_template = "{is_computable?def:noncomputable def} {name}[ {args|join|rewrite}][ : {type_hint|?|map_type}] := {value_expr|rewrite}"
+    symbol_kind = "def"
+
     def __init__(self, name: str, value_expr: Any, args: list = [], type_hint: str = None, is_computable: bool = True):
         self.name = name
         self.value_expr = value_expr 
@@ -61,22 +159,29 @@ class ActionDefine(Action):
         
     def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
         kw = "def" if self.is_computable else "noncomputable def"
-        args_str = " ".join(self.args)
+        args_str = mapper.rewrite(" ".join(self.args))
         if args_str:
             args_str = " " + args_str
             
         type_str = ""
         if self.type_hint:
-             clean_type = mapper.get_lean_name(self.type_hint)
+             clean_type = mapper.map_type(self.type_hint)
              type_str = f" : {clean_type}"
              
-        return f"{kw} {self.name}{args_str}{type_str} := {self.value_expr}"
+        return f"{kw} {self.name}{args_str}{type_str} := {mapper.rewrite(self.value_expr)}"
+
+    def declared_names(self) -> List[str]:
+        return [self.name]
 
 class ActionClaim(Action):
     """
     Affirme un lemme ou théorème.
     Ex: "x^2 >= 0"
     """
+    is_pure = True
+    lean_template = "lemma {name} : {statement|rewrite}"
+    symbol_kind = "lemma"
+
     def __init__(self, name: str, statement: str):
         self.name = name
         self.statement = statement # String formatée (ex: "x^2 >= 0")
@@ -85,12 +190,18 @@ class ActionClaim(Action):
         # Ici on entrerait typiquement dans un nouveau scope de preuve
         # context.push_scope() # géré par l'interpréteur ou ici ? 
         # Pour une action atomique, on génère juste l'en-tête.
-        return f"lemma {self.name} : {self.statement}"
+        return f"lemma {self.name} : {mapper.rewrite(self.statement)}"
+
+    def declared_names(self) -> List[str]:
+        return [self.name]
 
 class ActionSolve(Action):
     """
     Termine la preuve courante.
     """
+    is_pure = True
+    lean_template = "  := by {method}"
+
     def __init__(self, method: str = "sorry"):
         self.method = method # "sorry", "simp", "aesop"
         
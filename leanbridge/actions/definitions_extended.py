@@ -1,10 +1,24 @@
-from typing import List, Dict
+from typing import Any, Iterable, List, Dict, Tuple
 from .commands import Action
 from ..inference.context import ContextManager
 from ..inference.mapper import LibraryMapper
 from ..core.objects import MStructure, MInductive
 
+def structure_symbols(name: str, fields: Iterable[str]) -> List[Tuple[str, str]]:
+    """Noms déclarés par 'structure name where ...' : la structure, son constructeur et ses champs."""
+    symbols = [(name, "structure"), (f"{name}.mk", "constructor")]
+    symbols.extend((f"{name}.{field}", "field") for field in fields)
+    return symbols
+
+def _constructor_name(constructor: Any) -> str:
+    """'node (l r : Tree) : Tree' -> 'node'."""
+    words = str(constructor).split(None, 1)
+    return words[0].split(":", 1)[0] if words else ""
+
 class ActionDefineStructure(Action):
+    is_pure = True
+    lean_template = "structure {struct.name} where{struct.fields:items:\n  {0} : {1|map_type}}"
+
     def __init__(self, struct_obj: MStructure):
         self.struct = struct_obj
 
@@ -12,16 +26,37 @@ class ActionDefineStructure(Action):
         lines = [f"structure {self.struct.name} where"]
         for field, ftype in self.struct.fields.items():
             # Mapper le type si possible
-            clean_type = mapper.get_lean_name(ftype)
+            clean_type = mapper.map_type(ftype)
             lines.append(f"  {field} : {clean_type}")
         return "\n".join(lines)
 
+    def declared_names(self) -> List[str]:
+        return [self.struct.name]
+
+    def declared_symbols(self) -> List[Tuple[str, str]]:
+        return structure_symbols(self.struct.name, self.struct.fields)
+
 class ActionDefineInductive(Action):
+    is_pure = True
+    lean_template = "inductive {ind.name}{ind.constructors:each:\n| {0|rewrite}}"
+
     def __init__(self, ind_obj: MInductive):
         self.ind = ind_obj
 
     def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
         lines = [f"inductive {self.ind.name}"]
         for c in self.ind.constructors:
-            lines.append(f"| {c}")
+            lines.append(f"| {mapper.rewrite(c)}")
         return "\n".join(lines)
+
+    def declared_names(self) -> List[str]:
+        return [self.ind.name]
+
+    def declared_symbols(self) -> List[Tuple[str, str]]:
+        name = self.ind.name
+        symbols = [(name, "inductive")]
+        for constructor in self.ind.constructors:
+            constructor_name = _constructor_name(constructor)
+            if constructor_name:
+                symbols.append((f"{name}.{constructor_name}", "constructor"))
+        return symbols
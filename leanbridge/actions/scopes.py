@@ -6,6 +6,9 @@ class ActionStartScope(Action):
     """
     Début d'un scope (namespace ou section).
     """
+    is_pure = True
+    lean_template = "{kind}[ {name|?}]"
+
     def __init__(self, kind: str, name: str = ""):
         self.kind = kind # "namespace" ou "section"
         self.name = name
@@ -20,6 +23,9 @@ class ActionEndScope(Action):
     """
     Fin d'un scope.
     """
+    is_pure = True
+    lean_template = "end[ {name|?}]"
+
     def __init__(self, kind: str, name: str = ""):
         self.kind = kind
         self.name = name
@@ -0,0 +1,217 @@
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+from .commands import Action
+from ..core.tracked import bump
+from .definitions_extended import structure_symbols
+from ..inference.context import ContextManager
+from ..inference.mapper import LibraryMapper
+
+# Valeurs par défaut des champs optionnels d'un enregistrement tuple (args, type_hint, is_computable)
+_DEFINE_DEFAULTS = (None, None, True)
+
+def _as_bool(value: Any) -> bool:
+    """Interprète les booléens venant de CSV/JSON ("false", "0", "" -> False)."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "non", "")
+    return bool(value)
+
+def _join_args(args: Any) -> str:
+    if not args:
+        return ""
+    if isinstance(args, str):
+        return sys.intern(args)
+    return sys.intern(" ".join(args))
+
+def read_records(fp: TextIO, format: str = "jsonl") -> Iterator[Dict[str, Any]]:
+    """
+    Lit des enregistrements en flux depuis un fichier JSONL ou CSV (une ligne = un enregistrement).
+    Rien n'est conservé : chaque dict est consommé puis libéré par la table.
+    """
+    if format == "jsonl":
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+    elif format == "csv":
+        import csv
+        yield from csv.DictReader(fp)
+    else:
+        raise ValueError(f"Format inconnu : {format!r} (attendu 'jsonl' ou 'csv')")
+
+class ActionTable(Action):
+    """
+    Bloc de définitions homogènes stocké en colonnes (une liste par champ).
+    Le rendu est identique à une suite d'ActionDefine, sans objet Python par ligne.
+
+    Enregistrements acceptés par extend() :
+        {"name": ..., "value_expr": ..., "args": [...], "type_hint": ..., "is_computable": ...}
+        (name, value_expr, args, type_hint, is_computable)  # champs finaux optionnels
+    """
+    is_pure = True
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.value_exprs: List[str] = []
+        self.args: List[str] = [] # Arguments déjà joints, ex: "(n : Nat) (m : Nat)"
+        self.type_hints: List[Optional[str]] = []
+        self.computable = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __setattr__(self, name: str, value: Any):
+        # Colonnes non suivies (voir core/tracked.py) : un ajout de ligne ne doit rien coûter
+        object.__setattr__(self, name, value)
+        bump(self)
+
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        clone.__dict__.update((name, value[:] if type(value) in (list, bytearray) else value)
+                              for name, value in self.__dict__.items() if name != "_watched")
+        return clone
+
+    def changed_since(self, revision: int) -> bool:
+        return self._rev > revision # extend() et touch() renouvellent '_rev'
+
+    def nested_state(self) -> Tuple[int, ...]:
+        # Les colonnes peuvent être très longues : seules leurs longueurs sont comparées
+        # (lignes ajoutées hors d'extend()) ; une ligne remplacée en place doit être signalée par touch()
+        return len(self.names), len(self.value_exprs), len(self.args), len(self.type_hints), len(self.computable)
+
+    def extend(self, records: Iterable[Any]) -> int:
+        """Ajoute des lignes depuis un itérable d'enregistrements. Retourne le nombre ajouté."""
+        names, values, args, hints, computable = \
+            self.names, self.value_exprs, self.args, self.type_hints, self.computable
+        intern = sys.intern
+        count = 0
+        for record in records:
+            if isinstance(record, dict):
+                name = record["name"]
+                value = record.get("value_expr", record.get("value", ""))
+                rec_args = record.get("args")
+                hint = record.get("type_hint")
+                is_computable = record.get("is_computable", True)
+            else:
+                record = tuple(record)
+                name, value, rec_args, hint, is_computable = record + _DEFINE_DEFAULTS[len(record) - 2:]
+            names.append(name)
+            values.append(str(value))
+            args.append(_join_args(rec_args))
+            hints.append(intern(hint) if hint else None)
+            computable.append(_as_bool(is_computable))
+            count += 1
+        if count:
+            self.touch()
+        return count
+
+    def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
+        mapped: Dict[str, str] = {} # Résolutions du mapper mises en commun pour tout le bloc
+        rewritten: Dict[str, str] = {}
+        rewrite = mapper.rewrite
+        lines = []
+        append = lines.append
+        for name, value, args, hint, is_computable in zip(
+                self.names, self.value_exprs, self.args, self.type_hints, self.computable):
+            kw = "def" if is_computable else "noncomputable def"
+            args_str = ""
+            if args:
+                clean_args = rewritten.get(args)
+                if clean_args is None:
+                    clean_args = rewritten[args] = rewrite(args)
+                args_str = " " + clean_args
+            type_str = ""
+            if hint:
+                clean_type = mapped.get(hint)
+                if clean_type is None:
+                    clean_type = mapped[hint] = mapper.map_type(hint)
+                type_str = f" : {clean_type}"
+            append(f"{kw} {name}{args_str}{type_str} := {rewrite(value)}")
+        return "\n".join(lines)
+
+    def declared_names(self) -> List[str]:
+        return list(self.names)
+
+    def declared_symbols(self, start: int = 0) -> List[Tuple[str, str]]:
+        """Symboles des lignes à partir de 'start' (l'index n'ajoute que les lignes nouvelles)."""
+        return [(name, "def") for name in self.names[start:]]
+
+class ActionStructureTable(Action):
+    """
+    Bloc de structures stocké en colonnes : noms, puis champs aplatis
+    (noms et types) délimités par des bornes de fin cumulées.
+
+    Enregistrements acceptés par extend() :
+        {"name": ..., "fields": {"x": "Int", ...}}   # 'fields' peut aussi être du JSON (CSV)
+        (name, fields)
+    """
+    is_pure = True
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.field_names: List[str] = []
+        self.field_types: List[str] = []
+        self.ends: List[int] = [] # Fin (exclue) des champs de chaque structure dans les listes aplaties
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    __setattr__ = ActionTable.__setattr__ # Colonnes non suivies, comme ActionTable
+    __copy__ = ActionTable.__copy__
+    changed_since = ActionTable.changed_since
+
+    def nested_state(self) -> Tuple[int, ...]:
+        # Comme ActionTable : longueurs des colonnes seulement
+        return len(self.names), len(self.field_names), len(self.field_types), len(self.ends)
+
+    def extend(self, records: Iterable[Any]) -> int:
+        """Ajoute des structures depuis un itérable d'enregistrements. Retourne le nombre ajouté."""
+        names, field_names, field_types, ends = self.names, self.field_names, self.field_types, self.ends
+        intern = sys.intern
+        count = 0
+        for record in records:
+            if isinstance(record, dict):
+                name, fields = record["name"], record.get("fields") or {}
+            else:
+                name, fields = record
+            if isinstance(fields, str):
+                fields = json.loads(fields)
+            items = fields.items() if isinstance(fields, dict) else fields
+            for field, ftype in items:
+                field_names.append(intern(field))
+                field_types.append(intern(ftype))
+            names.append(name)
+            ends.append(len(field_names))
+            count += 1
+        if count:
+            self.touch()
+        return count
+
+    def to_lean(self, context: ContextManager, mapper: LibraryMapper) -> str:
+        mapped: Dict[str, str] = {}
+        lines = []
+        append = lines.append
+        field_names, field_types = self.field_names, self.field_types
+        start = 0
+        for name, end in zip(self.names, self.ends):
+            append(f"structure {name} where")
+            for i in range(start, end):
+                ftype = field_types[i]
+                clean_type = mapped.get(ftype)
+                if clean_type is None:
+                    clean_type = mapped[ftype] = mapper.map_type(ftype)
+                append(f"  {field_names[i]} : {clean_type}")
+            start = end
+        return "\n".join(lines)
+
+    def declared_names(self) -> List[str]:
+        return list(self.names)
+
+    def declared_symbols(self, start: int = 0) -> List[Tuple[str, str]]:
+        """Symboles des structures à partir de 'start' (l'index n'ajoute que les lignes nouvelles)."""
+        symbols: List[Tuple[str, str]] = []
+        field_names, ends = self.field_names, self.ends
+        begin = ends[start - 1] if start else 0
+        for name, end in zip(self.names[start:], ends[start:]):
+            symbols.extend(structure_symbols(name, field_names[begin:end]))
+            begin = end
+        return symbols
@@ -0,0 +1,311 @@
+"""
+Compilation des gabarits de rendu (Action.lean_template).
+
+Une classe d'action pure peut déclarer son rendu Lean sous forme de gabarit. Le code
+de rendu est alors généré (une fois) et inliné dans une boucle qui rend tout un lot
+d'actions : les attributs sont lus directement, sans appel de méthode par action, le
+moteur de réécriture est résolu une fois par lot et les traductions de types
+(map_type) sont mémoïsées.
+
+Syntaxe :
+    texte            littéral ('{{', '}}', '[[', ']]' pour les caractères spéciaux)
+    {a.b|f|g}        attribut (chemin pointé) passé dans les filtres f puis g, puis str()
+                     filtres : join (" ".join), rewrite (mapper.rewrite), map_type (mapper.map_type)
+    {a?OUI:NON}      'OUI' si l'attribut est vrai, 'NON' sinon (textes littéraux)
+    [ ... ]          groupe optionnel : rendu seulement si chacun de ses champs est non vide.
+                     Par défaut la valeur testée est la valeur finale ; un filtre '?' place
+                     le test à cette étape (ex: {nom|?} teste l'attribut brut)
+    {a:each:SOUS}    SOUS rendu pour chaque élément de l'attribut ({0} = l'élément)
+    {a:items:SOUS}   SOUS rendu pour chaque paire de a.items() ({0} = clé, {1} = valeur)
+"""
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from ..inference.context import ContextManager
+from ..inference.mapper import LibraryMapper
+
+_FILTERS = ("join", "rewrite", "map_type", "?")
+_MODES = ("each", "items")
+_MISSING = object()
+
+class _Parser:
+    def __init__(self, template: str):
+        self.text = template
+        self.pos = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Gabarit invalide (position {self.pos}) : {message} dans {self.text!r}")
+
+    def parse(self, stop: str = "") -> List[tuple]:
+        """Analyse jusqu'au caractère 'stop' (consommé) ou jusqu'à la fin si stop est vide."""
+        text = self.text
+        nodes: List[tuple] = []
+        literal: List[str] = []
+        while self.pos < len(text):
+            char = text[self.pos]
+            escaped = char in "{}[]" and text[self.pos + 1:self.pos + 2] == char
+            if escaped and not (char == stop and char == "}"):
+                literal.append(char)
+                self.pos += 2
+                continue
+            if char == stop:
+                self.pos += 1
+                break
+            if char in "{[":
+                if literal:
+                    nodes.append(("lit", "".join(literal)))
+                    literal = []
+                self.pos += 1
+                nodes.append(self.placeholder() if char == "{" else ("group", self.parse("]")))
+                continue
+            if char in "}]":
+                raise self.error(f"'{char}' inattendu")
+            literal.append(char)
+            self.pos += 1
+        else:
+            if stop:
+                raise self.error(f"'{stop}' manquant")
+        if literal:
+            nodes.append(("lit", "".join(literal)))
+        return nodes
+
+    def until(self, stops: str) -> str:
+        text = self.text
+        start = self.pos
+        while self.pos < len(text) and text[self.pos] not in stops:
+            self.pos += 1
+        if self.pos >= len(text):
+            raise self.error("'}' manquant")
+        return text[start:self.pos]
+
+    def placeholder(self) -> tuple:
+        path = self.until("|?:}").strip()
+        if not path or not all(part.isidentifier() or part.isdigit() for part in path.split(".")):
+            raise self.error(f"chemin d'attribut invalide {path!r}")
+        if self.text[self.pos] == "?":
+            self.pos += 1
+            yes = self.until(":")
+            self.pos += 1
+            no = self.until("}")
+            self.pos += 1
+            return ("choice", path, yes, no)
+        filters = []
+        while self.text[self.pos] == "|":
+            self.pos += 1
+            name = self.until("|:}").strip()
+            if name not in _FILTERS:
+                raise self.error(f"filtre inconnu {name!r}")
+            filters.append(name)
+        if self.text[self.pos] == ":":
+            self.pos += 1
+            mode = self.until(":").strip()
+            if mode not in _MODES or filters:
+                raise self.error(f"répétition invalide {mode!r}")
+            self.pos += 1
+            return ("repeat", path, mode, self.parse("}"))
+        self.pos += 1
+        return ("field", path, filters)
+
+class _Codegen:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.counter = 0
+
+    def temp(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+    @staticmethod
+    def source(path: str, scope: Tuple[str, ...]) -> str:
+        head, *rest = path.split(".")
+        if head.isdigit():
+            if int(head) >= len(scope):
+                raise ValueError(f"Gabarit invalide : {{{head}}} hors d'une répétition adaptée")
+            base = scope[int(head)]
+        else:
+            base = f"a.{head}"
+        return ".".join([base, *rest])
+
+    def filters(self, indent: int, var: str, filters: Sequence[str]):
+        for name in filters:
+            if name == "join":
+                self.emit(indent, f'{var} = " ".join({var})')
+            elif name == "rewrite":
+                self.emit(indent, f"if type({var}) is not str:")
+                self.emit(indent + 1, f"{var} = rewrite({var})")
+                self.emit(indent, "elif not plain:")
+                self.emit(indent + 1, f"{var} = apply({var})")
+            elif name == "map_type":
+                self.emit(indent, f"if type({var}) is str:")
+                self.emit(indent + 1, f"x = mt_get({var})")
+                self.emit(indent + 1, "if x is None:")
+                self.emit(indent + 2, f"x = mt_memo[{var}] = map_type({var})")
+                self.emit(indent + 1, f"{var} = x")
+                self.emit(indent, "else:")
+                self.emit(indent + 1, f"{var} = map_type({var})")
+
+    def finish(self, indent: int, var: str, filters: Sequence[str]):
+        """Conversion en str (comme un f-string), si les filtres n'en produisent pas déjà une."""
+        applied = [name for name in filters if name != "?"]
+        if not applied or applied[-1] not in ("join", "rewrite", "map_type"):
+            self.emit(indent, f"if type({var}) is not str:")
+            self.emit(indent + 1, f'{var} = format({var}, "")')
+
+    @staticmethod
+    def fstring(parts: Sequence[Tuple[bool, str]]) -> str:
+        """Expression f-string concaténant des littéraux et des variables ((est_variable, texte))."""
+        body = "".join("{" + text + "}" if is_var else text.replace("{", "{{").replace("}", "}}")
+                       for is_var, text in parts)
+        return "f" + repr(body)
+
+    def parts(self, nodes: Sequence[tuple], indent: int, scope: Tuple[str, ...]) -> List[Tuple[bool, str]]:
+        """Émet le code des noeuds et retourne les morceaux à concaténer : (est_variable, texte)."""
+        parts = []
+        for node in nodes:
+            kind = node[0]
+            if kind == "lit":
+                parts.append((False, node[1]))
+            elif kind == "choice":
+                _, path, yes, no = node
+                var = self.temp("v")
+                self.emit(indent, f"{var} = {yes!r} if {self.source(path, scope)} else {no!r}")
+                parts.append((True, var))
+            elif kind == "field":
+                _, path, filters = node
+                var = self.temp("v")
+                self.emit(indent, f"{var} = {self.source(path, scope)}")
+                self.filters(indent, var, filters)
+                parts.append((True, var))
+            elif kind == "repeat":
+                parts.append((True, self.repeat(node, indent, scope)))
+            else:
+                parts.append((True, self.group(node[1], indent, scope)))
+        return parts
+
+    def repeat(self, node: tuple, indent: int, scope: Tuple[str, ...]) -> str:
+        _, path, mode, body = node
+        out, var = self.temp("r"), self.temp("v")
+        source = self.source(path, scope)
+        self.emit(indent, f"{out} = []")
+        if mode == "items":
+            names = (self.temp("e"), self.temp("e"))
+            self.emit(indent, f"for {names[0]}, {names[1]} in {source}.items():")
+        else:
+            names = (self.temp("e"),)
+            self.emit(indent, f"for {names[0]} in {source}:")
+        parts = self.parts(body, indent + 1, names)
+        self.emit(indent + 1, f"{out}.append({self.fstring(parts)})")
+        self.emit(indent, f'{var} = "".join({out})')
+        return var
+
+    def group(self, nodes: Sequence[tuple], indent: int, scope: Tuple[str, ...]) -> str:
+        var = self.temp("g")
+        self.emit(indent, f'{var} = ""')
+        # Champs du groupe : valeur calculée jusqu'au point de test
+        tested: Dict[int, str] = {}
+        for position, node in enumerate(nodes):
+            if node[0] != "field":
+                continue
+            _, path, filters = node
+            split = filters.index("?") if "?" in filters else len(filters)
+            field_var = self.temp("v")
+            self.emit(indent, f"{field_var} = {self.source(path, scope)}")
+            self.filters(indent, field_var, filters[:split])
+            if split == len(filters):
+                self.finish(indent, field_var, filters)
+            tested[position] = field_var
+        condition = " and ".join(tested.values()) or "True"
+        self.emit(indent, f"if {condition}:")
+        parts = []
+        for position, node in enumerate(nodes):
+            field_var = tested.get(position)
+            if field_var is None:
+                parts.extend(self.parts([node], indent + 1, scope))
+                continue
+            filters = node[2]
+            if "?" in filters:
+                self.filters(indent + 1, field_var, filters[filters.index("?") + 1:])
+            parts.append((True, field_var))
+        self.emit(indent + 1, f"{var} = {self.fstring(parts)}")
+        return var
+
+# Classe d'action -> gabarit analysé (None : rendu par to_lean)
+_TEMPLATES: Dict[type, Optional[List[tuple]]] = {}
+# Ensemble de classes à gabarit -> fonction de rendu compilée
+_RENDERERS: Dict[FrozenSet[type], Callable] = {}
+_MAX_RENDERERS = 64
+
+def template_for(cls: type) -> Optional[List[tuple]]:
+    """
+    Gabarit analysé d'une classe d'action, ou None. Le gabarit n'est utilisé que si la
+    classe est pure et que son to_lean est celui de la classe qui déclare le gabarit
+    (une sous-classe qui redéfinit to_lean garde son rendu).
+    """
+    nodes = _TEMPLATES.get(cls, _MISSING)
+    if nodes is not _MISSING:
+        return nodes
+    nodes = None
+    template = getattr(cls, "lean_template", None)
+    if template and getattr(cls, "is_pure", False):
+        owner = next(klass for klass in cls.__mro__ if "lean_template" in klass.__dict__)
+        if next(klass for klass in cls.__mro__ if "to_lean" in klass.__dict__) is owner:
+            nodes = _Parser(template).parse()
+    _TEMPLATES[cls] = nodes
+    return nodes
+
+def compile_renderer(classes: Sequence[type]) -> Callable[[Iterable, List[str], tuple, ContextManager, LibraryMapper], None]:
+    """
+    Génère une fonction render(actions, out, state, context, mapper) qui ajoute à 'out'
+    le fragment de chaque action : le code du gabarit de sa classe est inliné (aiguillage
+    sur le type), les actions des autres classes passent par to_lean, dans l'ordre.
+    'state' est l'état du mapper pour le rendu en cours (voir render_state).
+    """
+    gen = _Codegen()
+    gen.emit(0, "def render(actions, out, state, context, mapper):")
+    gen.emit(1, "plain, apply, rewrite, map_type, mt_memo = state")
+    gen.emit(1, "mt_get = mt_memo.get")
+    gen.emit(1, "append = out.append")
+    gen.emit(1, "for a in actions:")
+    gen.emit(2, "c = type(a)")
+    namespace: Dict[str, object] = {}
+    for index, cls in enumerate(classes):
+        nodes = template_for(cls)
+        if nodes is None:
+            raise ValueError(f"{cls.__name__} n'a pas de gabarit de rendu utilisable")
+        namespace[f"K{index}"] = cls
+        gen.emit(2, f"{'if' if index == 0 else 'elif'} c is K{index}: # {cls.__name__}")
+        parts = gen.parts(nodes, 3, ())
+        gen.emit(3, f"append({gen.fstring(parts)})")
+    if classes:
+        gen.emit(2, "else:")
+    gen.emit(3 if classes else 2, "append(a.to_lean(context, mapper))")
+    source = "\n".join(gen.lines)
+    exec(compile(source, "<lean_template>", "exec"), namespace)
+    render = namespace["render"]
+    render.source = source
+    return render
+
+def render_state(mapper: LibraryMapper) -> tuple:
+    """État de rendu d'un mapper : moteur de réécriture résolu une fois, mémo des types traduits."""
+    rewriter = mapper.active_rewriter()
+    apply = None if rewriter is None else rewriter.apply
+    return rewriter is None, apply, mapper.rewrite, mapper.map_type, {}
+
+def render_actions(actions: Sequence, context: ContextManager, mapper: LibraryMapper) -> List[str]:
+    """
+    Rend une séquence d'actions ; résultat identique à [a.to_lean(context, mapper) for a in actions].
+    Les actions des classes à gabarit sont rendues par une fonction compilée pour les
+    classes présentes ; les autres passent par to_lean, dans l'ordre.
+    """
+    classes = frozenset(cls for cls in set(map(type, actions)) if template_for(cls) is not None)
+    if not classes:
+        return [action.to_lean(context, mapper) for action in actions]
+    render = _RENDERERS.get(classes)
+    if render is None:
+        if len(_RENDERERS) >= _MAX_RENDERERS:
+            _RENDERERS.clear()
+        render = _RENDERERS[classes] = compile_renderer(sorted(classes, key=lambda cls: cls.__name__))
+    fragments: List[str] = []
+    render(actions, fragments, render_state(mapper), context, mapper)
+    return fragments
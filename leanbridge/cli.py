@@ -0,0 +1,74 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+# Point d'entrée en ligne de commande : 'leanbridge serve|build' (ou 'python -m leanbridge').
+# Les modules d'une commande ne sont importés qu'à son exécution.
+
+def _serve(args: argparse.Namespace) -> int:
+    from .server import DEFAULT_ADDRESS, RenderServer
+    server = RenderServer(args.listen or DEFAULT_ADDRESS, workers=args.jobs, max_pending=args.max_pending,
+                          config_path=args.config, executor=args.executor)
+
+    def ready(server: RenderServer):
+        print(f"LeanBridge : {server.workers} workers, écoute sur {server.bound_address}", file=sys.stderr, flush=True)
+
+    server.run(ready)
+    return 0
+
+def _build(args: argparse.Namespace) -> int:
+    from .specs import SpecError, build
+
+    def progress(result):
+        if not args.json and not args.quiet:
+            detail = result.error or f"{result.declarations} décl."
+            print(f"  {result.path:<40} {result.seconds * 1000:9.1f} ms  {result.status:<9} {detail}", flush=True)
+
+    try:
+        report = build(args.specs, args.out, jobs=args.jobs, config_path=args.config,
+                       remove_stale=args.clean, on_result=progress)
+    except (OSError, SpecError) as exc:
+        print(f"leanbridge build : {exc}", file=sys.stderr)
+        return 2
+    if args.json:
+        print(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+    else:
+        print(report.summary().rsplit("\n", 1)[-1])
+    return 1 if report.failed else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="leanbridge", description="LeanBridge : génération de code Lean 4.")
+    commands = parser.add_subparsers(dest="command", metavar="COMMANDE")
+    commands.required = True
+
+    serve = commands.add_parser("serve", help="démon de rendu (socket Unix ou port local)",
+                                description="Rend les lots d'actions envoyés par RenderClient avec des interpréteurs chauds.")
+    serve.add_argument("--listen", default=None,
+                       help="'hôte:port' ou 'unix:chemin' (défaut : 127.0.0.1:7878)")
+    serve.add_argument("-j", "--jobs", type=int, default=None, help="workers de rendu (défaut : nombre de CPU)")
+    serve.add_argument("--max-pending", type=int, default=None,
+                       help="rendus en cours au-delà desquels les requêtes attendent (défaut : 4 par worker)")
+    serve.add_argument("--executor", choices=("process", "thread"), default="process", help="type de workers")
+    serve.add_argument("--config", default="leanbridge/config.yaml", help="fichier de configuration du mapper")
+    serve.set_defaults(run=_serve)
+
+    build = commands.add_parser("build", help="génère des modules Lean depuis des spécifications (JSONL/YAML)",
+                                description="Lit des spécifications en flux et écrit un module Lean par "
+                                            "enregistrement 'module' (voir leanbridge/specs.py).")
+    build.add_argument("specs", nargs="+", help="fichiers .jsonl, .yaml ou '-' (JSONL sur l'entrée standard)")
+    build.add_argument("-o", "--out", required=True, help="dossier de sortie")
+    build.add_argument("-j", "--jobs", type=int, default=None, help="processus (défaut : nombre de CPU)")
+    build.add_argument("--clean", action="store_true", help="supprime les modules générés absents des spécifications")
+    build.add_argument("--config", default="leanbridge/config.yaml", help="fichier de configuration du mapper")
+    build.add_argument("--json", action="store_true", help="rapport au format JSON")
+    build.add_argument("-q", "--quiet", action="store_true", help="n'affiche que le résumé")
+    build.set_defaults(run=_build)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
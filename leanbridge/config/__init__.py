@@ -1 +1,11 @@
-from .registry import Registry, TranslationTarget
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".registry": ("Registry", "TranslationTarget"),
+    ".rewriter": ("TokenRewriter",),
+})
+
+if TYPE_CHECKING:
+    from .registry import Registry, TranslationTarget
+    from .rewriter import TokenRewriter
@@ -1,34 +1,124 @@
-from typing import Dict, Any, Optional, Callable, Type
+from typing import Dict, Any, Optional, Callable, Type, Tuple
+from .rewriter import TokenRewriter
 
 class TranslationTarget:
     LEAN = "lean"
     LATEX = "latex"
 
+class _Watched(dict):
+    """
+    dict qui incrémente la version du registre à chaque modification, pour que
+    'registry.rewrites[cible][token] = ...' invalide aussi les rendus en cache.
+    Avec nested=True, les valeurs (dicts par cible) sont elles-mêmes surveillées.
+    """
+    def __init__(self, registry: "Registry", items: Any = (), nested: bool = False):
+        super().__init__()
+        self._registry = registry
+        self._nested = nested
+        for key, value in dict(items).items():
+            dict.__setitem__(self, key, self._wrap(value))
+
+    def _wrap(self, value: Any) -> Any:
+        return _Watched(self._registry, value) if self._nested else value
+
+    def _changed(self):
+        self._registry.version += 1
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            dict.__setitem__(self, key, self._wrap(value))
+        self._changed()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        value = dict.pop(self, key, *default)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._changed()
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
+
+    def __reduce__(self):
+        return type(self), (self._registry, dict(self), self._nested)
+
 class Registry:
     """
     Registre central pour la configuration dynamique de LeanBridge.
     Permet d'enregistrer des mappings symboliques et des handlers de commandes.
     """
     def __init__(self):
-        # Mappings simples : token -> traduction
-        self.rewrites: Dict[str, Dict[str, str]] = {
-            TranslationTarget.LEAN: {},
-            TranslationTarget.LATEX: {}
-        }
+        # Incrémenté à chaque enregistrement ou modification de 'rewrites' (invalide les rendus en cache)
+        self.version = 0
+        # Mappings simples : cible -> (token -> traduction)
+        self._rewrites = _Watched(self, {TranslationTarget.LEAN: {}, TranslationTarget.LATEX: {}}, nested=True)
         # Handlers avancés pour des comportements spécifiques
         self.handlers: Dict[str, Callable] = {}
+        # Réécritures compilées par cible : cible -> (version, TokenRewriter)
+        self._rewriters: Dict[str, Tuple[int, TokenRewriter]] = {}
+
+    def copy(self) -> "Registry":
+        """Copie indépendante (les réécritures déjà compilées sont partagées)."""
+        clone = Registry()
+        clone._rewrites = _Watched(clone, self._rewrites, nested=True)
+        clone.handlers = dict(self.handlers)
+        clone.version = self.version
+        clone._rewriters = dict(self._rewriters)
+        return clone
+
+    @property
+    def rewrites(self) -> Dict[str, Dict[str, str]]:
+        """Réécritures par cible ; toute modification (même imbriquée) incrémente 'version'."""
+        return self._rewrites
+
+    @rewrites.setter
+    def rewrites(self, rewrites: Dict[str, Dict[str, str]]):
+        self._rewrites = _Watched(self, rewrites, nested=True)
+        self.version += 1
 
     def register_token(self, token: str, target: str, value: str):
         """
         Enregistre une traduction simple.
         Ex: register_token("mon_symbole", Target.LEAN, "MySpecialOp")
         """
-        if target not in self.rewrites:
-            self.rewrites[target] = {}
-        self.rewrites[target][token] = value
+        self._rewrites.setdefault(target, {})[token] = value
     
     def get_token(self, token: str, target: str) -> Optional[str]:
         return self.rewrites.get(target, {}).get(token)
 
+    def get_rewriter(self, target: str) -> TokenRewriter:
+        """
+        Retourne le moteur de réécriture compilé pour une cible.
+        Il n'est recompilé que si le registre a changé depuis la dernière compilation.
+        """
+        entry = self._rewriters.get(target)
+        if entry is not None and entry[0] == self.version:
+            return entry[1]
+        rewriter = TokenRewriter(self._rewrites.get(target, {}))
+        self._rewriters[target] = (self.version, rewriter)
+        return rewriter
+
     def register_handler(self, command_name: str, handler: Callable):
         self.handlers[command_name] = handler
+        self.version += 1
@@ -0,0 +1,67 @@
+import re
+from typing import Dict, Iterable, Optional, Pattern
+
+# Caractères d'identifiant Lean : un token alphanumérique ne doit pas être collé à l'un d'eux
+_IDENT_CHAR = re.compile(r"[\w']")
+_NOT_AFTER_IDENT = r"(?<![\w'])"
+_NOT_BEFORE_IDENT = r"(?![\w'])"
+
+def _trie_regex(tokens: Iterable[str]) -> str:
+    """
+    Compile des tokens en une expression régulière factorisée par préfixes (trie).
+    Les branches les plus longues sont essayées en premier : la correspondance
+    retenue est la plus longue à une position donnée. Les contraintes de frontière
+    d'identifiant sont placées sur la première arête et sur les fins de token.
+    """
+    trie: Dict[str, dict] = {}
+    for token in tokens:
+        node = trie
+        for ch in token:
+            node = node.setdefault(ch, {})
+        node[""] = {} # Fin de token
+    branches = []
+    for ch, child in sorted(trie.items()):
+        if ch:
+            guard = _NOT_AFTER_IDENT if _IDENT_CHAR.match(ch) else ""
+            branches.append(guard + re.escape(ch) + _node_regex(child, ch))
+    return "|".join(branches)
+
+def _node_regex(node: Dict[str, dict], last: str) -> str:
+    branches = [re.escape(ch) + _node_regex(child, ch) for ch, child in sorted(node.items()) if ch]
+    if "" in node:
+        end = _NOT_BEFORE_IDENT if _IDENT_CHAR.match(last) else ""
+        if not branches:
+            return end
+        if not end:
+            return f"(?:{'|'.join(branches)})?"
+        branches.append(end) # Alternative vide, essayée en dernier
+    if len(branches) == 1:
+        return branches[0]
+    return f"(?:{'|'.join(branches)})"
+
+class TokenRewriter:
+    """
+    Applique un ensemble de réécritures token -> traduction en une seule passe linéaire.
+
+    Tous les tokens sont compilés dans une unique expression régulière à base de trie.
+    Un token qui commence (resp. finit) par un caractère d'identifiant n'est remplacé
+    que s'il n'est pas précédé (resp. suivi) d'un tel caractère : 'mon_symbole'
+    n'est pas réécrit dans 'mon_symbole2'.
+    """
+    def __init__(self, rewrites: Dict[str, str]):
+        self.rewrites = {token: value for token, value in rewrites.items() if token}
+        self.pattern: Optional[Pattern[str]] = self._compile(self.rewrites)
+
+    @staticmethod
+    def _compile(rewrites: Dict[str, str]) -> Optional[Pattern[str]]:
+        if not rewrites:
+            return None
+        return re.compile(_trie_regex(rewrites))
+
+    def _replace(self, match) -> str:
+        return self.rewrites[match.group()]
+
+    def apply(self, text: str) -> str:
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(self._replace, text)
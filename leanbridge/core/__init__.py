@@ -1 +1,13 @@
-from .objects import MathObject, MScalar, MSet, MFunc, MStruct, MInductive, MStructure, MClass, MInstance, MAttribute
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".objects": ("MathObject", "MScalar", "MSet", "MFunc", "MStruct", "MInductive", "MStructure",
+                 "MClass", "MInstance", "MAttribute"),
+    ".interned": ("FrozenMathObject", "FrozenScalar", "FrozenSet", "FrozenFunc", "FrozenStruct",
+                  "scalar", "set_of", "func", "struct", "intern"),
+})
+
+if TYPE_CHECKING:
+    from .objects import MathObject, MScalar, MSet, MFunc, MStruct, MInductive, MStructure, MClass, MInstance, MAttribute
+    from .interned import FrozenMathObject, FrozenScalar, FrozenSet, FrozenFunc, FrozenStruct, scalar, set_of, func, struct, intern
@@ -0,0 +1,133 @@
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Set
+
+class ActionBuffer:
+    """
+    Séquence d'actions en ajout seul, dont le préfixe peut être partagé.
+
+    Un buffer est un segment propre ('_items') précédé des '_parent_len' premiers
+    éléments d'un buffer parent. branch() crée un nouveau buffer qui voit tout le
+    contenu courant sans le copier ; le buffer d'origine ne doit alors plus
+    recevoir d'ajouts (l'interpréteur le remplace lui aussi par une branche).
+
+    Les éléments antérieurs à la branche sont partagés avec les autres branches
+    (is_shared()) : replace() les remplace pour ce buffer seul.
+    """
+    __slots__ = ("_parent", "_parent_len", "_items", "_shared", "_replaced")
+
+    def __init__(self, parent: Optional["ActionBuffer"] = None, parent_len: int = 0):
+        self._parent = parent
+        self._parent_len = parent_len
+        self._items: List[Any] = []
+        self._shared = parent_len # Positions dont l'élément est partagé avec d'autres buffers
+        self._replaced: Optional[Set[int]] = None # Positions partagées déjà remplacées
+
+    def branch(self) -> "ActionBuffer":
+        """
+        Nouvelle branche sur le contenu courant. Les segments récents sont fusionnés
+        tant que leur taille cumulée atteint celle du segment qui les précède : la
+        chaîne des parents reste de longueur logarithmique et chaque élément n'est
+        recopié que O(log n) fois (O(1) amorti par branche).
+        """
+        if not self._items:
+            # Rien d'ajouté depuis la dernière branche : on évite d'allonger la chaîne
+            return ActionBuffer(self._parent, self._parent_len)
+        merged = [(self._items, len(self._items))] # Du plus récent au plus ancien
+        size = len(self._items)
+        buf, limit = self._parent, self._parent_len
+        while buf is not None and limit:
+            own = limit - buf._parent_len
+            if own > 0:
+                if size < own:
+                    break
+                merged.append((buf._items, own))
+                size += own
+                limit = buf._parent_len
+            buf, limit = buf._parent, min(limit, buf._parent_len)
+        if len(merged) == 1:
+            return ActionBuffer(self, len(self))
+        base = ActionBuffer(buf if limit else None, limit)
+        for items, count in reversed(merged):
+            base._items.extend(islice(items, count))
+        return ActionBuffer(base, len(base))
+
+    def append(self, action: Any):
+        self._items.append(action)
+
+    def is_shared(self, index: int) -> bool:
+        """Vrai si l'élément 'index' est partagé avec d'autres buffers (antérieur à la branche)."""
+        return index < self._shared and not (self._replaced and index in self._replaced)
+
+    def replace(self, index: int, action: Any):
+        """
+        Remplace l'élément 'index' pour ce buffer seul. Si l'élément appartient au
+        préfixe partagé, le buffer copie d'abord ses références (O(n), une fois).
+        """
+        if index < self._parent_len:
+            self._items = list(self)
+            self._parent = None
+            self._parent_len = 0
+        self._items[index - self._parent_len] = action
+        if index < self._shared:
+            if self._replaced is None:
+                self._replaced = set()
+            self._replaced.add(index)
+
+    def clear(self):
+        self._parent = None
+        self._parent_len = 0
+        self._items = []
+        self._shared = 0
+        self._replaced = None
+
+    def last_owned(self) -> Optional[Any]:
+        """Dernier élément s'il appartient au segment propre (donc modifiable sans effet sur les branches)."""
+        return self._items[-1] if self._items else None
+
+    def _segments(self) -> List[List[Any]]:
+        """Segments (listes, avec borne) du plus ancien au plus récent."""
+        segments = [(self._items, len(self._items))]
+        buf, limit = self._parent, self._parent_len
+        while buf is not None and limit:
+            own = limit - buf._parent_len
+            if own > 0:
+                segments.append((buf._items, own))
+                limit = buf._parent_len
+            buf, limit = buf._parent, min(limit, buf._parent_len)
+        segments.reverse()
+        return segments
+
+    def __len__(self) -> int:
+        return self._parent_len + len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items) or self._parent_len > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        for items, limit in self._segments():
+            if limit == len(items):
+                yield from items
+            else:
+                for i in range(limit):
+                    yield items[i]
+
+    def iter_from(self, start: int) -> Iterator[Any]:
+        """Éléments à partir de l'indice 'start', sans parcourir ceux qui précèdent."""
+        offset = 0
+        for items, limit in self._segments():
+            if start < offset + limit:
+                yield from islice(items, max(start - offset, 0), limit)
+            offset += limit
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("index hors du buffer")
+        buf = self
+        while index < buf._parent_len:
+            buf = buf._parent
+        return buf._items[index - buf._parent_len]
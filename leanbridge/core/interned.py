@@ -0,0 +1,146 @@
+import sys
+import weakref
+from abc import abstractmethod
+from typing import Any, Optional, Tuple
+from .objects import MathObject, MScalar, MSet, MFunc, MStruct
+
+# Variantes immuables (sans __dict__) de MScalar, MSet, MFunc et MStruct.
+# Les instances sont partagées (hash-consing) : construire deux fois le même objet
+# retourne la même instance, donc l'égalité structurelle se réduit à 'is' et les
+# chaînes lean_type_hint ne sont calculées (et internées) qu'une fois.
+
+# (classe, (type, champ)...) -> instance ; une entrée disparaît avec le dernier objet qui l'utilise
+_TABLE: "weakref.WeakValueDictionary[Tuple, FrozenMathObject]" = weakref.WeakValueDictionary()
+
+def _interned(text: Any) -> Any:
+    return sys.intern(text) if type(text) is str else text
+
+class FrozenMathObject(MathObject):
+    """
+    Base des objets immuables et partagés. Chaque sous-classe déclare '_fields'
+    (dans l'ordre des paramètres de '_normalize') ; l'appel de la classe passe par
+    la table d'internement. Les champs doivent être hashables.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def __new__(cls, *args, **kwargs):
+        if cls.__abstractmethods__: # object.__new__ ne le vérifierait qu'après _normalize
+            raise TypeError(f"Classe abstraite {cls.__name__} : définir {', '.join(sorted(cls.__abstractmethods__))}")
+        values = cls._normalize(*args, **kwargs)
+        # Types dans la clé : 1, 1.0 et True sont égaux et de même hash, mais distincts ici
+        key = (cls, *[(type(value), value) for value in values])
+        obj = _TABLE.get(key)
+        if obj is None:
+            obj = object.__new__(cls)
+            for name, value in zip(cls._fields, values):
+                object.__setattr__(obj, name, value)
+            obj = _TABLE.setdefault(key, obj)
+        return obj
+
+    def __init__(self, *args, **kwargs):
+        pass # État fixé par __new__
+
+    @staticmethod
+    @abstractmethod
+    def _normalize(*args, **kwargs) -> Tuple:
+        """Valeurs des champs (dans l'ordre de '_fields') à partir des arguments du constructeur."""
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} est immuable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} est immuable")
+
+    def __reduce__(self):
+        # Le dépickling repasse par la table : l'instance reste partagée
+        return type(self), tuple(getattr(self, name) for name in self._fields)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+class FrozenScalar(FrozenMathObject):
+    """Équivalent immuable de MScalar."""
+    __slots__ = ("scalar_type", "value")
+    _fields = ("scalar_type", "value", "latex_symbol", "lean_type_hint", "is_computable")
+
+    @staticmethod
+    def _normalize(scalar_type: str = "Real", value: Any = None, latex_symbol: str = "",
+                   lean_type_hint: Optional[str] = None, is_computable: bool = True) -> Tuple:
+        scalar_type = _interned(scalar_type)
+        return scalar_type, value, latex_symbol, _interned(lean_type_hint or scalar_type), is_computable
+
+class FrozenSet(FrozenMathObject):
+    """Équivalent immuable de MSet."""
+    __slots__ = ("element_type", "is_type_universe")
+    _fields = ("element_type", "is_type_universe", "latex_symbol", "lean_type_hint", "is_computable")
+
+    @staticmethod
+    def _normalize(element_type: Optional[str] = None, is_type_universe: bool = False, latex_symbol: str = "",
+                   lean_type_hint: Optional[str] = None, is_computable: bool = True) -> Tuple:
+        if not lean_type_hint:
+            if is_type_universe:
+                lean_type_hint = "Type*"
+            else:
+                lean_type_hint = f"Set {element_type}" if element_type else "Set ?"
+        return _interned(element_type), is_type_universe, latex_symbol, _interned(lean_type_hint), is_computable
+
+class FrozenFunc(FrozenMathObject):
+    """Équivalent immuable de MFunc (domaine et codomaine sont internés)."""
+    __slots__ = ("domain", "codomain", "body")
+    _fields = ("domain", "codomain", "body", "latex_symbol", "lean_type_hint", "is_computable")
+
+    @staticmethod
+    def _normalize(domain: MathObject, codomain: MathObject, body: Any = None, latex_symbol: str = "",
+                   lean_type_hint: Optional[str] = None, is_computable: bool = True) -> Tuple:
+        domain, codomain = intern(domain), intern(codomain)
+        if not lean_type_hint:
+            lean_type_hint = f"{domain.lean_type_hint or '?'} -> {codomain.lean_type_hint or '?'}"
+        return domain, codomain, body, latex_symbol, _interned(lean_type_hint), is_computable
+
+class FrozenStruct(FrozenMathObject):
+    """Équivalent immuable de MStruct."""
+    __slots__ = ("struct_name", "carrier")
+    _fields = ("struct_name", "carrier", "latex_symbol", "lean_type_hint", "is_computable")
+
+    @staticmethod
+    def _normalize(struct_name: str, carrier: Optional[MathObject] = None, latex_symbol: str = "",
+                   lean_type_hint: Optional[str] = None, is_computable: bool = True) -> Tuple:
+        if carrier is not None:
+            carrier = intern(carrier)
+        if not lean_type_hint:
+            if carrier and carrier.latex_symbol:
+                lean_type_hint = f"{struct_name} {carrier.latex_symbol}"
+            else:
+                lean_type_hint = struct_name
+        return _interned(struct_name), carrier, latex_symbol, _interned(lean_type_hint), is_computable
+
+# isinstance(scalar("Real"), MScalar) reste vrai
+MScalar.register(FrozenScalar)
+MSet.register(FrozenSet)
+MFunc.register(FrozenFunc)
+MStruct.register(FrozenStruct)
+
+# Fabriques : l'appel de la classe retourne déjà l'instance partagée
+scalar = FrozenScalar
+set_of = FrozenSet
+func = FrozenFunc
+struct = FrozenStruct
+
+def intern(obj: MathObject) -> FrozenMathObject:
+    """Retourne l'objet partagé équivalent à un MScalar, MSet, MFunc ou MStruct (éventuellement mutable)."""
+    if isinstance(obj, FrozenMathObject):
+        return obj
+    kind = type(obj)
+    if kind is MScalar:
+        return FrozenScalar(obj.scalar_type, obj.value, obj.latex_symbol, obj.lean_type_hint, obj.is_computable)
+    if kind is MSet:
+        return FrozenSet(obj.element_type, obj.is_type_universe, obj.latex_symbol, obj.lean_type_hint, obj.is_computable)
+    if kind is MFunc:
+        return FrozenFunc(obj.domain, obj.codomain, obj.body, obj.latex_symbol, obj.lean_type_hint, obj.is_computable)
+    if kind is MStruct:
+        return FrozenStruct(obj.struct_name, obj.carrier, obj.latex_symbol, obj.lean_type_hint, obj.is_computable)
+    raise TypeError(f"Impossible d'interner un objet de type {kind.__name__}")
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Optional, List, Any, Union, Dict
+from .tracked import bump, copy_state, track
 
 class MathObject(ABC):
     """
@@ -10,11 +11,34 @@ class MathObject(ABC):
         lean_type_hint (Optional[str]): Type Lean explicite ou inféré (ex: "Real", "group G").
         is_computable (bool): Si l'objet est calculable (implique `def` vs `noncomputable def`).
     """
+    # Les sous-classes sans __slots__ gardent un __dict__ ; celles de core/interned.py n'en ont pas
+    __slots__ = ("latex_symbol", "lean_type_hint", "is_computable", "__weakref__")
+    # Renouvelée à chaque affectation et à chaque modification en place d'une liste ou
+    # d'un dict de l'objet (voir core/tracked.py) : les rendus en cache le comparent
+    _rev: int = 0
+
     def __init__(self, latex_symbol: str = "", lean_type_hint: Optional[str] = None, is_computable: bool = True):
         self.latex_symbol = latex_symbol
         self.lean_type_hint = lean_type_hint
         self.is_computable = is_computable
 
+    def __setattr__(self, name: str, value: Any):
+        state = getattr(self, "__dict__", None)
+        if state is None: # Sans __dict__, rien à suivre
+            object.__setattr__(self, name, value)
+            return
+        object.__setattr__(self, name, track(value, self))
+        bump(self)
+
+    def __copy__(self):
+        clone = object.__new__(type(self))
+        for name in ("latex_symbol", "lean_type_hint", "is_computable"):
+            if hasattr(self, name):
+                object.__setattr__(clone, name, getattr(self, name))
+        if hasattr(self, "__dict__"):
+            copy_state(self, clone)
+        return clone
+
     def __repr__(self):
         return f"<{self.__class__.__name__}: {self.latex_symbol or 'anon'} : {self.lean_type_hint}>"
 
@@ -0,0 +1,173 @@
+from itertools import count
+from typing import Any
+
+# Listes et dicts suivis : rangés dans une action ou un MathObject modifiable (leur
+# « propriétaire »), ils renouvellent sa révision '_rev' à chaque modification en
+# place. Le cache de rendu de l'interpréteur n'a donc jamais à relire leur contenu.
+# L'affectation à un attribut copie le conteneur : une modification faite par une
+# autre référence à l'original n'atteint pas le propriétaire.
+#
+# Les révisions sont tirées d'un compteur global : une révision supérieure à
+# next_revision() pris à un instant donné signale une modification postérieure.
+# Les objets surveillés (watch(), ex: actions indexées) comptent en plus leurs
+# modifications dans edit_count(), ce qui évite de les relire tant qu'il ne bouge pas.
+
+_REVISIONS = count(1)
+_EDITS = [0] # Modifications d'objets surveillés
+
+def next_revision() -> int:
+    """Révision supérieure à toutes celles déjà attribuées."""
+    return next(_REVISIONS)
+
+def edit_count() -> int:
+    """Nombre de modifications d'objets surveillés depuis le démarrage."""
+    return _EDITS[0]
+
+def bump(owner: Any):
+    """Renouvelle la révision d'une action ou d'un MathObject."""
+    state = owner.__dict__
+    state["_rev"] = next(_REVISIONS)
+    if "_watched" in state:
+        _EDITS[0] += 1
+
+def watch(obj: Any):
+    """Surveille un objet et les MathObject modifiables qu'il référence (voir edit_count())."""
+    state = getattr(obj, "__dict__", None)
+    if state is None or "_watched" in state:
+        return
+    state["_watched"] = True
+    for value in list(state.values()):
+        if hasattr(type(value), "_rev"):
+            watch(value)
+
+def track(value: Any, owner: Any) -> Any:
+    """Version suivie (pour 'owner') d'une liste ou d'un dict ; les autres valeurs sont retournées telles quelles."""
+    kind = type(value)
+    if kind is list or kind is TrackedList:
+        return value if kind is TrackedList and value._owner is owner else TrackedList(owner, value)
+    if kind is dict or kind is TrackedDict:
+        return value if kind is TrackedDict and value._owner is owner else TrackedDict(owner, value)
+    return value
+
+def copy_state(obj: Any, clone: Any):
+    """Recopie le __dict__ de 'obj' dans 'clone', conteneurs suivis pour 'clone' (copie superficielle)."""
+    state = clone.__dict__
+    for name, value in obj.__dict__.items():
+        if name != "_watched": # La copie n'est pas surveillée
+            state[name] = track(value, clone)
+
+class TrackedList(list):
+    """list dont chaque modification incrémente la révision de son propriétaire."""
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: Any, items: Any = ()):
+        list.__init__(self, [track(item, owner) for item in items])
+        self._owner = owner
+
+    def __reduce__(self):
+        return list, (list(self),) # Picklée comme une liste ordinaire
+
+    def __setitem__(self, index, value):
+        owner = self._owner
+        if isinstance(index, slice):
+            value = [track(item, owner) for item in value]
+        else:
+            value = track(value, owner)
+        list.__setitem__(self, index, value)
+        bump(owner)
+
+    def __delitem__(self, index):
+        list.__delitem__(self, index)
+        bump(self._owner)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, count):
+        list.__imul__(self, count)
+        bump(self._owner)
+        return self
+
+    def append(self, value):
+        list.append(self, track(value, self._owner))
+        bump(self._owner)
+
+    def extend(self, values):
+        owner = self._owner
+        list.extend(self, [track(item, owner) for item in values])
+        bump(owner)
+
+    def insert(self, index, value):
+        list.insert(self, index, track(value, self._owner))
+        bump(self._owner)
+
+    def pop(self, *index):
+        value = list.pop(self, *index)
+        bump(self._owner)
+        return value
+
+    def remove(self, value):
+        list.remove(self, value)
+        bump(self._owner)
+
+    def clear(self):
+        list.clear(self)
+        bump(self._owner)
+
+    def sort(self, *, key=None, reverse=False):
+        list.sort(self, key=key, reverse=reverse)
+        bump(self._owner)
+
+    def reverse(self):
+        list.reverse(self)
+        bump(self._owner)
+
+class TrackedDict(dict):
+    """dict dont chaque modification incrémente la révision de son propriétaire."""
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: Any, items: Any = ()):
+        dict.__init__(self, {key: track(value, owner) for key, value in dict(items).items()})
+        self._owner = owner
+
+    def __reduce__(self):
+        return dict, (dict(self),) # Picklé comme un dict ordinaire
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, track(value, self._owner))
+        bump(self._owner)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        bump(self._owner)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        owner = self._owner
+        dict.update(self, {key: track(value, owner) for key, value in dict(*args, **kwargs).items()})
+        bump(owner)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        value = dict.pop(self, key, *default)
+        bump(self._owner)
+        return value
+
+    def popitem(self):
+        item = dict.popitem(self)
+        bump(self._owner)
+        return item
+
+    def clear(self):
+        dict.clear(self)
+        bump(self._owner)
+
+CONTAINERS = frozenset({list, dict, TrackedList, TrackedDict})
@@ -1,2 +1,13 @@
-from .context import ContextManager
-from .mapper import LibraryMapper
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".context": ("ContextManager",),
+    ".mapper": ("LibraryMapper",),
+    ".symbols": ("SymbolIndex", "Symbol"),
+})
+
+if TYPE_CHECKING:
+    from .context import ContextManager
+    from .mapper import LibraryMapper
+    from .symbols import SymbolIndex, Symbol
@@ -1,50 +1,153 @@
-from typing import Dict, List, Optional
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Mapping, Optional, Tuple
 from ..core.objects import MathObject
+from .persistent import PMap
+
+_MISSING = object()
+
+def _as_pmap(bindings: Mapping) -> PMap:
+    if isinstance(bindings, PMap):
+        return bindings
+    pmap = PMap()
+    for name, value in bindings.items():
+        pmap = pmap.set(name, value)
+    return pmap
+
+class _Bindings(MutableMapping):
+    """
+    Vue dict des liaisons d'un Environment (compatibilité avec l'ancienne API) :
+    les écritures remplacent la PMap de cet Environment, en place.
+    """
+    __slots__ = ("_env", "_field")
+
+    def __init__(self, env: "Environment", field: str):
+        self._env = env
+        self._field = field
+
+    def __getitem__(self, name: str) -> Any:
+        return getattr(self._env, self._field)[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self._env, self._field).get(name, default)
+
+    def __contains__(self, name: object) -> bool:
+        return name in getattr(self._env, self._field)
+
+    def __setitem__(self, name: str, value: Any):
+        setattr(self._env, self._field, getattr(self._env, self._field).set(name, value))
+
+    def __delitem__(self, name: str):
+        bindings = getattr(self._env, self._field)
+        remaining = bindings.delete(name)
+        if remaining is bindings:
+            raise KeyError(name)
+        setattr(self._env, self._field, remaining)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(getattr(self._env, self._field))
+
+    def __len__(self) -> int:
+        return len(getattr(self._env, self._field))
+
+    def __repr__(self) -> str:
+        return f"{dict(self.items())!r}"
 
 class Environment:
     """
     Stocke l'état courant des variables et hypothèses.
+
+    Un Environment est immuable pour ContextManager : toutes les liaisons visibles
+    (celles des scopes parents comprises) sont dans une table persistante (PMap), et
+    déclarer une variable produit un nouvel Environment qui partage tout le reste
+    avec l'ancien. 'variables' et 'hypotheses' restent accessibles comme des dicts ;
+    les écritures par ces vues ou par add_variable() modifient cet Environment en
+    place (un snapshot qui le référence les voit aussi, pas les scopes déjà ouverts
+    au-dessus de lui) : préférer ContextManager.declare().
     """
-    def __init__(self):
-        self.variables: Dict[str, MathObject] = {}
-        self.hypotheses: Dict[str, str] = {} # nom -> énoncé (str pour l'instant)
+    __slots__ = ("parent", "_variables", "_hypotheses", "depth")
+
+    def __init__(self, parent: Optional["Environment"] = None,
+                 variables: Mapping = PMap(), hypotheses: Mapping = PMap()):
+        self.parent = parent
+        self._variables = _as_pmap(variables)
+        self._hypotheses = _as_pmap(hypotheses) # nom -> énoncé (str pour l'instant)
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    @property
+    def variables(self) -> _Bindings:
+        return _Bindings(self, "_variables")
+
+    @variables.setter
+    def variables(self, variables: Mapping):
+        self._variables = _as_pmap(variables)
+
+    @property
+    def hypotheses(self) -> _Bindings:
+        return _Bindings(self, "_hypotheses")
+
+    @hypotheses.setter
+    def hypotheses(self, hypotheses: Mapping):
+        self._hypotheses = _as_pmap(hypotheses)
+
+    def with_variable(self, name: str, obj: MathObject) -> "Environment":
+        return Environment(self.parent, self._variables.set(name, obj), self._hypotheses)
 
     def add_variable(self, name: str, obj: MathObject):
-        self.variables[name] = obj
+        """Ajoute une variable à cet Environment, en place (ancienne API, voir la docstring de la classe)."""
+        self._variables = self._variables.set(name, obj)
 
     def get_variable(self, name: str) -> Optional[MathObject]:
-        return self.variables.get(name)
+        return self._variables.get(name)
 
 class ContextManager:
     """
     Gère une pile d'environnements (scopes) pour l'inférence.
+
+    La pile est persistante : resolve() est une seule recherche dans la table du
+    scope courant, et snapshot()/fork() sont en O(1) (aucune copie des déclarations).
     """
-    def __init__(self):
-        self.scopes: List[Environment] = [Environment()] # Scope global par défaut
+    def __init__(self, _env: Optional[Environment] = None):
+        self._env = _env if _env is not None else Environment() # Scope global par défaut
 
     @property
     def current_scope(self) -> Environment:
-        return self.scopes[-1]
+        return self._env
+
+    @property
+    def scopes(self) -> Tuple[Environment, ...]:
+        """Pile des scopes, du global au courant (lecture seule : utiliser push_scope/pop_scope)."""
+        scopes = []
+        env = self._env
+        while env is not None:
+            scopes.append(env)
+            env = env.parent
+        return tuple(reversed(scopes))
 
     def push_scope(self):
         """Entre dans un nouveau bloc (ex: corps d'une fonction, preuve)."""
-        # Pour faire simple, on pourrait copier le scope précédent, 
-        # mais ici on va juste faire une pile et chercher récursivement.
-        # Pour l'instant, simplifions : chaque scope est indépendant mais a accès aux parents ?
-        # Dans un premier temps, une liste simple. La recherche se fera du dernier au premier.
-        self.scopes.append(Environment())
+        # Le nouveau scope voit les liaisons du parent ; ses propres déclarations les masquent.
+        env = self._env
+        self._env = Environment(env, env._variables, env._hypotheses)
 
     def pop_scope(self):
-        if len(self.scopes) > 1:
-            self.scopes.pop()
+        if self._env.parent is not None:
+            self._env = self._env.parent
 
     def declare(self, name: str, obj: MathObject):
-        self.current_scope.add_variable(name, obj)
+        self._env = self._env.with_variable(name, obj)
 
     def resolve(self, name: str) -> Optional[MathObject]:
-        """Cherche une variable dans la pile de scopes, du plus récent au plus ancien."""
-        for scope in reversed(self.scopes):
-            res = scope.get_variable(name)
-            if res:
-                return res
-        return None
+        """Cherche une variable visible depuis le scope courant (le plus récent masque les plus anciens)."""
+        return self._env._variables.get(name)
+
+    def snapshot(self) -> Environment:
+        """Capture l'état courant (O(1), l'Environment étant immuable)."""
+        return self._env
+
+    def restore(self, env: Environment):
+        """Revient à un état capturé par snapshot()."""
+        self._env = env
+
+    def fork(self) -> "ContextManager":
+        """Crée une branche indépendante partageant l'état courant."""
+        return ContextManager(self._env)
@@ -1,36 +1,259 @@
-import yaml
-from typing import Dict, Optional
+import marshal
+import os
+from collections import ChainMap, OrderedDict
+from typing import Any, Dict, Iterator, MutableMapping, Optional, Tuple
+from ..core.objects import MathObject
+
+# Quelques défauts standard pour la démo
+DEFAULT_MAPPING: Dict[str, str] = {
+    "norm": "NormedSpace.norm",
+    "abs": "abs",
+    "add": "Add.add",
+    "mul": "Mul.mul",
+    "pow": "Pow.pow",
+    "ge": "ge", # Greater or equal
+    "le": "le",
+    "eq": "Eq",
+    "Real": "Real",
+    "Nat": "Nat"
+}
+
+# Version du format du cache compilé (sidecar marshal)
+_SIDECAR_FORMAT = 1
+
+# Cache process-wide : chemin absolu -> (signature du fichier, mapping partagé)
+# La signature (mtime_ns, taille) vaut None si le fichier n'existe pas.
+# Les mappings partagés ne sont jamais modifiés : les surcharges vont dans l'overlay de chaque mapper.
+_SHARED_MAPPINGS: Dict[str, Tuple[Optional[Tuple[int, int]], Dict[str, str]]] = {}
+
+def _sidecar_path(path: str) -> str:
+    """Le cache compilé de 'dir/config.yaml' est 'dir/__pycache__/config.yaml.mapping'."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, "__pycache__", name + ".mapping")
+
+def _read_config(path: str, signature: Tuple[int, int]) -> Dict[str, Any]:
+    """Lit le mapping d'un fichier YAML, via le cache compilé s'il est à jour."""
+    sidecar = _sidecar_path(path)
+    try:
+        with open(sidecar, "rb") as f:
+            fmt, cached_signature, mapping = marshal.load(f)
+        if fmt == _SIDECAR_FORMAT and tuple(cached_signature) == signature:
+            return mapping
+    except (OSError, EOFError, ValueError, TypeError):
+        pass # Cache absent, corrompu ou d'un autre format : on relit le YAML
+
+    import yaml # Importé seulement si un fichier de configuration doit être analysé
+    with open(path, 'r') as f:
+        custom_config = yaml.safe_load(f)
+    mapping = {}
+    if custom_config and 'mapping' in custom_config:
+        mapping = dict(custom_config['mapping'] or {})
+
+    # Écriture atomique du cache ; un répertoire en lecture seule n'est pas une erreur
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        tmp = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump((_SIDECAR_FORMAT, signature, mapping), f)
+        os.replace(tmp, sidecar)
+    except (OSError, ValueError):
+        pass
+    return mapping
+
+def load_shared_mapping(config_path: str) -> Dict[str, str]:
+    """
+    Retourne le mapping (défauts + fichier de configuration) partagé par tout le processus.
+    Le fichier n'est relu que si sa date de modification ou sa taille change ;
+    le YAML n'est analysé que si le cache compilé est périmé.
+    Le dict retourné est partagé : il ne doit pas être modifié.
+    """
+    path = os.path.abspath(config_path)
+    try:
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        signature = None
+
+    entry = _SHARED_MAPPINGS.get(path)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+
+    mapping = dict(DEFAULT_MAPPING)
+    if signature is not None:
+        mapping.update(_read_config(path, signature))
+    _SHARED_MAPPINGS[path] = (signature, mapping)
+    return mapping
+
+class _MappingView(MutableMapping):
+    """
+    Vue modifiable du mapping effectif d'un LibraryMapper. Les écritures vont dans
+    la surcouche de l'instance et incrémentent sa version (les rendus et les types
+    en cache sont invalidés) ; le mapping de base partagé n'est jamais modifié.
+    """
+    __slots__ = ("_mapper",)
+
+    def __init__(self, mapper: "LibraryMapper"):
+        self._mapper = mapper
+
+    def __getitem__(self, key: str) -> str:
+        mapper = self._mapper
+        if key in mapper._overrides:
+            return mapper._overrides[key]
+        return mapper._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._mapper._overrides or key in self._mapper._base
+
+    def __setitem__(self, key: str, value: str):
+        self._mapper.register(key, value)
+
+    def __delitem__(self, key: str):
+        # Comme ChainMap : seules les entrées de la surcouche peuvent être retirées
+        mapper = self._mapper
+        if key not in mapper._overrides:
+            raise KeyError(f"{key!r} ne fait pas partie des surcharges de l'instance")
+        del mapper._overrides[key]
+        mapper.version += 1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(ChainMap(self._mapper._overrides, self._mapper._base))
+
+    def __len__(self) -> int:
+        return len(ChainMap(self._mapper._overrides, self._mapper._base))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
 
 class LibraryMapper:
     """
     Mappe les concepts 'Pythoniques/LaTeX' vers les noms de fonctions Mathlib.
     Utilise un fichier de configuration ou des défauts.
+
+    Le mapping de base est partagé entre toutes les instances (voir load_shared_mapping) ;
+    les modifications propres à une instance vont dans une surcouche (copy-on-write).
     """
+    # Nombre de types traduits gardés en mémoire par map_type (LRU)
+    TYPE_CACHE_SIZE = 4096
+
     def __init__(self, config_path: str = "leanbridge/config.yaml"):
-        self.mapping: Dict[str, str] = {}
-        self._load_defaults()
-        try:
-            with open(config_path, 'r') as f:
-                custom_config = yaml.safe_load(f)
-                if custom_config and 'mapping' in custom_config:
-                    self.mapping.update(custom_config['mapping'])
-        except FileNotFoundError:
-            pass # Utilise juste les défauts
-
-    def _load_defaults(self):
-        # Quelques défauts standard pour la démo
-        self.mapping = {
-            "norm": "NormedSpace.norm",
-            "abs": "abs",
-            "add": "Add.add",
-            "mul": "Mul.mul",
-            "pow": "Pow.pow",
-            "ge": "ge", # Greater or equal
-            "le": "le",
-            "eq": "Eq",
-            "Real": "Real",
-            "Nat": "Nat"
-        }
+        self._base = load_shared_mapping(config_path)
+        self._overrides: Dict[str, str] = {}
+        # Incrémenté à chaque modification du mapping (invalide les rendus en cache)
+        self.version = 0
+        # Réécritures de tokens (voir bind_registry)
+        self._registry = None
+        self._target: Optional[str] = None
+        self._rewriter = None
+        # Cache de map_type : type -> traduction, valide pour _types_stamp (versions du mapping et du registre)
+        self._types: "OrderedDict[str, str]" = OrderedDict()
+        self._types_stamp = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._registry is not None:
+            # Seules les réécritures compilées servent au rendu (les handlers du registre
+            # ne sont pas forcément sérialisables, ex: lambdas)
+            state["_rewriter"] = self._registry.get_rewriter(self._target)
+            state["_registry"] = None
+        state["_types"] = OrderedDict()
+        state["_types_stamp"] = None
+        return state
+
+    def copy(self) -> "LibraryMapper":
+        """Copie indépendante : le mapping de base reste partagé, seule la surcouche est dupliquée."""
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone._overrides = dict(self._overrides)
+        clone._types = OrderedDict(self._types)
+        return clone
+
+    def bind_registry(self, registry, target: str):
+        """Applique les réécritures de tokens du registre pour la cible donnée (ex: TranslationTarget.LEAN)."""
+        self._registry = registry
+        self._target = target
+        self._rewriter = None
+        self.version += 1
+
+    @property
+    def mapping(self) -> MutableMapping[str, str]:
+        """Vue du mapping effectif. Les écritures vont dans la surcouche de l'instance et incrémentent 'version'."""
+        return _MappingView(self)
+
+    @mapping.setter
+    def mapping(self, mapping: Dict[str, str]):
+        self._base = {}
+        self._overrides = dict(mapping)
+        self.version += 1
+
+    def register(self, abstract_name: str, lean_name: str):
+        """
+        Ajoute ou remplace une correspondance (équivaut à 'mapping[abstract_name] = lean_name').
+        Les rendus en cache sont invalidés.
+        """
+        self._overrides[abstract_name] = lean_name
+        self.version += 1
+
+    def update(self, mapping: Dict[str, str]):
+        """Ajoute plusieurs correspondances d'un coup."""
+        self._overrides.update(mapping)
+        self.version += 1
 
     def get_lean_name(self, abstract_name: str) -> str:
-        return self.mapping.get(abstract_name, abstract_name)
+        overrides = self._overrides
+        if overrides and abstract_name in overrides:
+            return overrides[abstract_name]
+        return self._base.get(abstract_name, abstract_name)
+
+    def active_rewriter(self):
+        """Moteur de réécriture effectif (TokenRewriter), ou None s'il n'y a aucune réécriture."""
+        registry = self._registry
+        rewriter = registry.get_rewriter(self._target) if registry is not None else self._rewriter
+        if rewriter is None or rewriter.pattern is None:
+            return None
+        return rewriter
+
+    def rewrite(self, text: Any) -> str:
+        """Applique les réécritures de tokens du registre lié à un texte (expression, énoncé, arguments)."""
+        registry = self._registry
+        rewriter = registry.get_rewriter(self._target) if registry is not None else self._rewriter
+        if rewriter is None or rewriter.pattern is None:
+            return text if type(text) is str else str(text)
+        return rewriter.apply(str(text))
+
+    def _type_cache(self) -> "OrderedDict[str, str]":
+        """Cache de map_type, vidé si le mapping ou les réécritures du registre ont changé."""
+        registry = self._registry
+        stamp = (self.version, registry.version if registry is not None else None)
+        if stamp != self._types_stamp:
+            self._types.clear()
+            self._types_stamp = stamp
+        return self._types
+
+    def map_type(self, type_hint: str) -> str:
+        """
+        Traduit un type, puis applique les réécritures de tokens. Un type présent tel quel
+        dans le mapping est remplacé en bloc ; sinon chaque identifiant libre de l'expression
+        ('Real -> Nat', 'Set Real', '(n : Nat) → Fin n'...) passe par le mapping.
+        Accepte aussi un MathObject (son lean_type_hint). Les traductions sont mémorisées (LRU).
+        """
+        if type(type_hint) is not str:
+            if not isinstance(type_hint, MathObject):
+                return self.rewrite(self.get_lean_name(type_hint))
+            type_hint = type_hint.lean_type_hint
+
+        types = self._type_cache()
+        mapped = types.get(type_hint)
+        if mapped is not None:
+            types.move_to_end(type_hint)
+            return mapped
+
+        if type_hint in self._overrides or type_hint in self._base:
+            mapped = self.get_lean_name(type_hint)
+        else:
+            from .types import map_type_expression # Analyseur chargé au premier type composé
+            mapped = map_type_expression(type_hint, self.get_lean_name)
+        mapped = self.rewrite(mapped)
+        types[type_hint] = mapped
+        if len(types) > self.TYPE_CACHE_SIZE:
+            types.popitem(last=False)
+        return mapped
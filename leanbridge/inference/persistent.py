@@ -0,0 +1,188 @@
+from collections.abc import Mapping
+from typing import Any, Iterator, Optional, Tuple
+
+# Table de hachage persistante (HAMT : Hash Array Mapped Trie).
+# Chaque niveau consomme 5 bits du hash ; une insertion ne recopie que le chemin
+# de la racine à la feuille (au plus quelques nœuds), le reste est partagé.
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+def _popcount(n: int) -> int:
+    return bin(n).count("1")
+
+class _Leaf:
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, h: int, key: Any, value: Any):
+        self.hash = h
+        self.key = key
+        self.value = value
+
+class _Collision:
+    """Plusieurs clés de même hash (64 bits) : liste de paires (clé, valeur)."""
+    __slots__ = ("hash", "pairs")
+
+    def __init__(self, h: int, pairs: Tuple[Tuple[Any, Any], ...]):
+        self.hash = h
+        self.pairs = pairs
+
+class _Node:
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: tuple):
+        self.bitmap = bitmap
+        self.entries = entries
+
+_EMPTY_NODE = _Node(0, ())
+
+def _merge(a, b, shift: int) -> _Node:
+    """Crée le sous-arbre contenant deux entrées de hash différents."""
+    ia = (a.hash >> shift) & _MASK
+    ib = (b.hash >> shift) & _MASK
+    if ia == ib:
+        return _Node(1 << ia, (_merge(a, b, shift + _BITS),))
+    if ia < ib:
+        return _Node((1 << ia) | (1 << ib), (a, b))
+    return _Node((1 << ia) | (1 << ib), (b, a))
+
+def _assoc(node: _Node, shift: int, leaf: _Leaf) -> Tuple[_Node, bool]:
+    """Retourne (nouveau nœud, clé ajoutée ?)."""
+    bit = 1 << ((leaf.hash >> shift) & _MASK)
+    idx = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    if not node.bitmap & bit:
+        return _Node(node.bitmap | bit, entries[:idx] + (leaf,) + entries[idx:]), True
+
+    entry = entries[idx]
+    kind = type(entry)
+    if kind is _Node:
+        child, added = _assoc(entry, shift + _BITS, leaf)
+    elif kind is _Leaf:
+        if entry.hash == leaf.hash and entry.key == leaf.key:
+            child, added = leaf, False
+        elif entry.hash == leaf.hash:
+            child, added = _Collision(leaf.hash, ((entry.key, entry.value), (leaf.key, leaf.value))), True
+        else:
+            child, added = _merge(entry, leaf, shift + _BITS), True
+    elif entry.hash == leaf.hash: # _Collision
+        pairs = tuple(p for p in entry.pairs if p[0] != leaf.key)
+        added = len(pairs) == len(entry.pairs)
+        child = _Collision(leaf.hash, pairs + ((leaf.key, leaf.value),))
+    else:
+        child, added = _merge(entry, leaf, shift + _BITS), True
+    return _Node(node.bitmap, entries[:idx] + (child,) + entries[idx + 1:]), added
+
+def _dissoc(node: _Node, shift: int, h: int, key: Any) -> Optional[_Node]:
+    """Retourne le nœud sans 'key', ou None si la clé est absente."""
+    bit = 1 << ((h >> shift) & _MASK)
+    if not node.bitmap & bit:
+        return None
+    idx = _popcount(node.bitmap & (bit - 1))
+    entries = node.entries
+    entry = entries[idx]
+    kind = type(entry)
+    if kind is _Node:
+        child = _dissoc(entry, shift + _BITS, h, key)
+        if child is None:
+            return None
+        if not child.bitmap:
+            child = None
+    elif kind is _Leaf:
+        if entry.hash != h or entry.key != key:
+            return None
+        child = None
+    else: # _Collision
+        if entry.hash != h:
+            return None
+        pairs = tuple(p for p in entry.pairs if p[0] != key)
+        if len(pairs) == len(entry.pairs):
+            return None
+        child = _Leaf(h, *pairs[0]) if len(pairs) == 1 else _Collision(h, pairs)
+    if child is None:
+        return _Node(node.bitmap & ~bit, entries[:idx] + entries[idx + 1:])
+    return _Node(node.bitmap, entries[:idx] + (child,) + entries[idx + 1:])
+
+def _iter_node(node: _Node) -> Iterator[Tuple[Any, Any]]:
+    for entry in node.entries:
+        kind = type(entry)
+        if kind is _Leaf:
+            yield entry.key, entry.value
+        elif kind is _Node:
+            yield from _iter_node(entry)
+        else:
+            yield from entry.pairs
+
+class PMap:
+    """
+    Dictionnaire persistant (immuable) à partage structurel.
+    set() retourne une nouvelle PMap en O(log32 n) sans copier les autres entrées ;
+    get() est en O(log32 n), soit au plus quelques niveaux en pratique.
+    """
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, _root: _Node = _EMPTY_NODE, _count: int = 0):
+        self._root = _root
+        self._count = _count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Any]:
+        for key, _ in _iter_node(self._root):
+            yield key
+
+    def __getitem__(self, key: Any) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return _iter_node(self._root)
+
+    def keys(self) -> Iterator[Any]:
+        return iter(self)
+
+    def values(self) -> Iterator[Any]:
+        for _, value in _iter_node(self._root):
+            yield value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        h = hash(key) & _HASH_MASK
+        node = self._root
+        shift = 0
+        while True:
+            bit = 1 << ((h >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return default
+            entry = node.entries[_popcount(node.bitmap & (bit - 1))]
+            kind = type(entry)
+            if kind is _Node:
+                node = entry
+                shift += _BITS
+            elif kind is _Leaf:
+                return entry.value if entry.hash == h and entry.key == key else default
+            else:
+                if entry.hash == h:
+                    for k, v in entry.pairs:
+                        if k == key:
+                            return v
+                return default
+
+    def set(self, key: Any, value: Any) -> "PMap":
+        root, added = _assoc(self._root, 0, _Leaf(hash(key) & _HASH_MASK, key, value))
+        return PMap(root, self._count + added)
+
+    def delete(self, key: Any) -> "PMap":
+        """Nouvelle PMap sans 'key' (la même PMap si la clé est absente)."""
+        root = _dissoc(self._root, 0, hash(key) & _HASH_MASK, key)
+        return self if root is None else PMap(root, self._count - 1)
+
+# Lecture seule, mais utilisable partout où un Mapping est attendu
+Mapping.register(PMap)
@@ -0,0 +1,285 @@
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from ..actions.commands import ActionRaw
+from ..actions.scopes import ActionStartScope, ActionEndScope
+
+# Index des noms qualifiés déclarés par un buffer d'actions ('Geometrie.Point',
+# 'Geometrie.Point.x'...), pour les recherches façon Lean : résolution depuis un
+# namespace avec les 'open' en vigueur, doublons, noms sous un namespace.
+#
+# L'index est immuable : ajouter des actions produit un nouvel index qui partage
+# tout le reste avec l'ancien (snapshot/fork en O(1)). Les noms sont rangés par
+# couches de dicts figés ; chaque ajout crée une couche, fusionnée avec les plus
+# récentes tant qu'elles ne sont pas au moins deux fois plus grosses (comme un
+# compteur binaire) : il y a au plus log2(n) couches, et chaque nom n'est recopié
+# qu'O(log n) fois. Ajouter par lots (add_actions) revient à remplir un dict.
+
+_ROOT = "_root_."
+# 'open A B' (pas 'open A in', limité à la commande suivante)
+_OPEN = re.compile(r"^[ \t]*open[ \t]+(?:scoped[ \t]+)?([^\n]*)", re.M)
+_OPEN_STOP = {"hiding", "renaming"}
+
+class Symbol(NamedTuple):
+    """Nom déclaré : nom qualifié, sorte ('def', 'lemma', 'structure', 'field'...) et action d'origine."""
+    name: str
+    kind: str
+    action: Any = None
+
+class _Scope(NamedTuple):
+    kind: str # "namespace" ou "section" ("" au niveau global)
+    namespace: str # Namespace courant dans ce scope
+    opened: Tuple[str, ...] # Namespaces ouverts ('open X') dans ce scope
+
+class _Layer(NamedTuple):
+    symbols: Dict[str, Symbol] # Nom qualifié -> première déclaration
+    children: Dict[str, Dict[str, None]] # Nœud du trie : namespace -> segments fils (dans l'ordre)
+    duplicates: Dict[str, List[Symbol]] # Nom qualifié -> redéclarations
+
+def _opened_namespaces(words: List[str]) -> List[str]:
+    """Namespaces d'une commande 'open' : les mots avant 'hiding', 'renaming' ou '(' (noms choisis)."""
+    namespaces = []
+    for word in words:
+        if word in _OPEN_STOP or word.startswith("("):
+            break
+        namespaces.append(word)
+    return namespaces
+
+def _join(namespace: str, name: str) -> str:
+    return f"{namespace}.{name}" if namespace else name
+
+def _prefixes(namespace: str) -> List[str]:
+    """'A.B' -> ['A.B', 'A', ''] (du plus intérieur au global)."""
+    prefixes = [namespace]
+    while namespace:
+        namespace = namespace.rpartition(".")[0]
+        prefixes.append(namespace)
+    return prefixes
+
+def _merge(older: _Layer, newer: _Layer) -> _Layer:
+    symbols = {**older.symbols, **newer.symbols}
+    children = dict(older.children)
+    for namespace, segments in newer.children.items():
+        known = children.get(namespace)
+        children[namespace] = {**known, **segments} if known else segments
+    duplicates = dict(older.duplicates)
+    for name, symbols_list in newer.duplicates.items():
+        duplicates[name] = duplicates.get(name, []) + symbols_list
+    return _Layer(symbols, children, duplicates)
+
+class _Batch:
+    """Couche en construction (mutable) pendant un add_actions()."""
+    def __init__(self, index: "SymbolIndex"):
+        self.index = index
+        self.symbols: Dict[str, Symbol] = {}
+        self.children: Dict[str, Dict[str, None]] = {}
+        self.duplicates: Dict[str, List[Symbol]] = {}
+        self.scopes = list(index._scopes)
+
+    def add(self, symbols: Iterable[Tuple[str, str]], action: Any):
+        """Ajoute des noms (relatifs au namespace courant, avec leur sorte) déclarés par 'action'."""
+        namespace = self.scopes[-1].namespace
+        declared, duplicates, link = self.symbols, self.duplicates, self._link
+        known = self.index._get if self.index._layers else None
+        root = self.children.setdefault("", {})
+        new = tuple.__new__
+        for name, kind in symbols:
+            if name.startswith(_ROOT):
+                name = name[len(_ROOT):]
+            elif namespace:
+                name = f"{namespace}.{name}"
+            if name in declared or (known is not None and known(name) is not None):
+                duplicates.setdefault(name, []).append(Symbol(name, kind, action))
+                continue
+            declared[name] = new(Symbol, (name, kind, action))
+            if "." in name:
+                link(name)
+            else:
+                root[name] = None
+
+    def _link(self, name: str):
+        """Ajoute le chemin de 'name' au trie (jusqu'au premier ancêtre déjà présent)."""
+        children, has_node = self.children, self.index._has_node
+        while True:
+            namespace, _, segment = name.rpartition(".")
+            node = children.get(namespace)
+            if node is None:
+                children[namespace] = {segment: None}
+            elif segment in node:
+                return
+            else:
+                node[segment] = None
+            if not namespace or has_node(namespace, segment):
+                return
+            name = namespace
+
+    def open_scope(self, kind: str, name: str):
+        namespace = self.scopes[-1].namespace
+        if kind == "namespace" and name:
+            namespace = _join(namespace, name)
+        self.scopes.append(_Scope(kind, namespace, ()))
+
+    def close_scope(self):
+        if len(self.scopes) > 1:
+            self.scopes.pop()
+
+    def open_namespaces(self, names: Iterable[str]):
+        scope = self.scopes[-1]
+        self.scopes[-1] = scope._replace(opened=scope.opened + tuple(names))
+
+    def layer(self) -> _Layer:
+        children = {namespace: node for namespace, node in self.children.items() if node}
+        return _Layer(self.symbols, children, self.duplicates)
+
+class SymbolIndex:
+    """
+    Index immuable des noms qualifiés déclarés (voir l'en-tête du module).
+    Suit aussi les scopes ouverts (namespace courant, 'open' en vigueur) au fil des actions.
+    """
+    __slots__ = ("_layers", "_scopes", "_count")
+
+    def __init__(self, _layers: Tuple[_Layer, ...] = (), _scopes: Tuple[_Scope, ...] = (_Scope("", "", ()),),
+                 _count: int = 0):
+        self._layers = _layers
+        self._scopes = _scopes
+        self._count = _count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: str) -> bool:
+        return self._get(name) is not None
+
+    @property
+    def namespace(self) -> str:
+        """Namespace courant (après la dernière action indexée)."""
+        return self._scopes[-1].namespace
+
+    @property
+    def opened(self) -> Tuple[str, ...]:
+        """Namespaces ouverts en vigueur, du scope le plus intérieur au global."""
+        return tuple(name for scope in reversed(self._scopes) for name in reversed(scope.opened))
+
+    def _get(self, name: str) -> Optional[Symbol]:
+        for layer in reversed(self._layers):
+            symbol = layer.symbols.get(name)
+            if symbol is not None:
+                return symbol
+        return None
+
+    def _has_node(self, namespace: str, segment: str) -> bool:
+        """Le trie contient-il déjà le segment 'segment' sous 'namespace' (couches figées) ?"""
+        for layer in self._layers:
+            node = layer.children.get(namespace)
+            if node is not None and segment in node:
+                return True
+        return False
+
+    def get(self, name: str) -> Optional[Symbol]:
+        """Première déclaration du nom qualifié 'name' (ex: 'Geometrie.Point')."""
+        return self._get(name[len(_ROOT):] if name.startswith(_ROOT) else name)
+
+    def _paths(self, name: str, namespace: Optional[str], opened: Optional[Iterable[str]]) -> Iterable[str]:
+        if name.startswith(_ROOT):
+            yield name[len(_ROOT):]
+            return
+        prefixes = _prefixes(self.namespace if namespace is None else namespace)
+        for prefix in prefixes:
+            yield _join(prefix, name)
+        for opened_namespace in (self.opened if opened is None else opened):
+            for prefix in prefixes:
+                yield _join(_join(prefix, opened_namespace), name)
+
+    def resolve(self, name: str, namespace: Optional[str] = None,
+                opened: Optional[Iterable[str]] = None) -> Optional[Symbol]:
+        """
+        Résout 'name' comme Lean depuis 'namespace' (par défaut le namespace courant) :
+        namespace courant puis ses parents, puis les namespaces ouverts ('opened', par
+        défaut ceux en vigueur). Retourne None si le nom est inconnu.
+        """
+        get = self._get
+        for path in self._paths(name, namespace, opened):
+            symbol = get(path)
+            if symbol is not None:
+                return symbol
+        return None
+
+    def candidates(self, name: str, namespace: Optional[str] = None,
+                   opened: Optional[Iterable[str]] = None) -> List[Symbol]:
+        """Toutes les déclarations que 'name' peut désigner (plus d'une : nom ambigu ou masqué)."""
+        found: Dict[str, Symbol] = {}
+        for path in self._paths(name, namespace, opened):
+            symbol = self._get(path)
+            if symbol is not None:
+                found.setdefault(symbol.name, symbol)
+        return list(found.values())
+
+    def _segments(self, namespace: str) -> List[str]:
+        segments: Dict[str, None] = {}
+        for layer in self._layers:
+            node = layer.children.get(namespace)
+            if node:
+                segments.update(node)
+        return list(segments)
+
+    def names_under(self, namespace: str, recursive: bool = True) -> List[str]:
+        """
+        Noms qualifiés déclarés sous 'namespace' ('' : tous), en profondeur avec
+        'recursive', sinon seulement les enfants directs. Le coût ne dépend que du
+        nombre de noms retournés (et du nombre de couches), pas de la taille du buffer.
+        """
+        names: List[str] = []
+        stack = [_join(namespace, segment) for segment in reversed(self._segments(namespace))]
+        while stack:
+            name = stack.pop()
+            if self._get(name) is not None:
+                names.append(name)
+            if recursive:
+                stack.extend(_join(name, segment) for segment in reversed(self._segments(name)))
+        return names
+
+    def duplicates(self) -> Dict[str, List[Symbol]]:
+        """Noms déclarés plusieurs fois -> toutes leurs déclarations, dans l'ordre."""
+        result: Dict[str, List[Symbol]] = {}
+        for layer in self._layers:
+            for name, symbols in layer.duplicates.items():
+                result.setdefault(name, []).extend(symbols)
+        return {name: [self._get(name), *symbols] for name, symbols in result.items()}
+
+    def add_actions(self, actions: Iterable[Any]) -> "SymbolIndex":
+        """Nouvel index avec les noms déclarés par 'actions' (et leurs effets sur les scopes)."""
+        batch = _Batch(self)
+        for action in actions:
+            kind = type(action)
+            if kind is ActionStartScope:
+                batch.open_scope(action.kind, action.name)
+                continue
+            if kind is ActionEndScope:
+                batch.close_scope()
+                continue
+            if kind is ActionRaw:
+                for match in _OPEN.finditer(str(action.content)):
+                    words = match.group(1).split("--", 1)[0].split()
+                    if "in" not in words:
+                        batch.open_namespaces(_opened_namespaces(words))
+            batch.add(action.declared_symbols(), action)
+        return self._with(batch)
+
+    def add_action(self, action: Any) -> "SymbolIndex":
+        return self.add_actions((action,))
+
+    def add_symbols(self, symbols: Iterable[Tuple[str, str]], action: Any = None) -> "SymbolIndex":
+        """Nouvel index avec des noms (relatifs au namespace courant, avec leur sorte)."""
+        batch = _Batch(self)
+        batch.add(symbols, action)
+        return self._with(batch)
+
+    def _with(self, batch: _Batch) -> "SymbolIndex":
+        scopes = tuple(batch.scopes)
+        if not batch.symbols and not batch.duplicates:
+            return SymbolIndex(self._layers, scopes, self._count)
+        layers = list(self._layers)
+        layer = batch.layer()
+        while layers and len(layers[-1].symbols) <= 2 * len(layer.symbols) + 1:
+            layer = _merge(layers.pop(), layer)
+        layers.append(layer)
+        return SymbolIndex(tuple(layers), scopes, self._count + len(batch.symbols))
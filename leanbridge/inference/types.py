@@ -0,0 +1,282 @@
+import re
+from functools import lru_cache
+from typing import Callable, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+
+# Expressions de type Lean : analyse minimale (flèches, applications, produits, lieurs),
+# suffisante pour savoir quels identifiants désignent des types à traduire et lesquels
+# sont des variables liées. Le texte d'origine est conservé : seuls les identifiants
+# libres sont remplacés (espacement, notations et opérateurs inconnus restent intacts).
+
+# Compilé au premier usage (la compilation coûte plus que le reste de l'import)
+_TOKEN_PATTERN = r"""
+    (?P<space>\s+)
+  | (?P<arrow>->|→)
+  | (?P<prod>×'?)
+  | (?P<maps>=>|↦)
+  | (?P<assign>:=)
+  | (?P<colon>:)
+  | (?P<comma>,)
+  | (?P<open>[(\[{⦃⟨])
+  | (?P<close>[)\]}⦄⟩])
+  | (?P<quant>[∀Π∃λΣ])
+  | (?P<ident>[^\W\d][\w'.₀-₉]*)
+  | (?P<number>\d[\w.]*)
+  | (?P<op>//|\S)
+"""
+
+_KEYWORDS = {"fun": "quant", "forall": "quant", "exists": "quant"}
+_CLOSING = {"(": ")", "[": "]", "{": "}", "⦃": "⦄", "⟨": "⟩"}
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+
+class TypeIdent(NamedTuple):
+    name: str
+    start: int
+
+class TypeOp(NamedTuple):
+    """Opérateur, nombre ou symbole conservé tel quel (ex: '*' de 'Type*', '?', '=')."""
+    text: str
+    start: int
+
+class TypeApp(NamedTuple):
+    """Juxtaposition : application 'Set Real', ou suite de termes et d'opérateurs 'x = y'."""
+    items: Tuple["TypeNode", ...]
+
+class TypeArrow(NamedTuple):
+    domain: "TypeNode"
+    codomain: "TypeNode"
+
+class TypeProd(NamedTuple):
+    left: "TypeNode"
+    right: "TypeNode"
+
+class TypeGroup(NamedTuple):
+    """
+    Expression parenthésée. Avec 'names', c'est un lieur '(x y : T)' (ou '{x // p x}') :
+    les noms sont liés dans la suite (codomaine d'une flèche, corps d'un quantificateur,
+    prédicat d'un sous-type).
+    """
+    bracket: str
+    names: Tuple[TypeIdent, ...]
+    items: Tuple["TypeNode", ...] # Type des noms, ou éléments séparés par des virgules
+    predicate: Optional["TypeNode"] = None # Partie après '//'
+
+class TypeBinder(NamedTuple):
+    """Quantificateur ou lambda : '∀ x y : T, corps', '∀ (x : T) {y : U}, corps', 'fun x => corps'."""
+    quantifier: str
+    groups: Tuple[TypeGroup, ...]
+    body: "TypeNode"
+
+TypeNode = Union[TypeIdent, TypeOp, TypeApp, TypeArrow, TypeProd, TypeGroup, TypeBinder]
+
+@lru_cache(maxsize=None)
+def _token_regex() -> Pattern[str]:
+    return re.compile(_TOKEN_PATTERN, re.VERBOSE)
+
+def _tokens(text: str) -> Iterator[Token]:
+    for match in _token_regex().finditer(text):
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        value = match.group()
+        if kind == "ident":
+            if value.endswith("."):
+                # 'x.' : le point final n'appartient pas à l'identifiant
+                yield Token(_KEYWORDS.get(value[:-1], "ident"), value[:-1], match.start())
+                yield Token("op", ".", match.end() - 1)
+                continue
+            kind = _KEYWORDS.get(value, "ident")
+        yield Token(kind, value, match.start())
+
+class _TypeParser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = list(_tokens(text))
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos].kind if self.pos < len(self.tokens) else None
+
+    def next(self) -> Token:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Type invalide {self.text!r} : {message}")
+
+    def parse(self) -> TypeNode:
+        node = self.expr()
+        if self.pos < len(self.tokens):
+            raise self.error(f"{self.tokens[self.pos].text!r} inattendu")
+        return node
+
+    def expr(self) -> TypeNode:
+        if self.peek() == "quant":
+            return self.binder()
+        left = self.prod()
+        if self.peek() == "arrow":
+            self.next()
+            return TypeArrow(left, self.expr())
+        return left
+
+    def prod(self) -> TypeNode:
+        left = self.app()
+        if self.peek() == "prod":
+            self.next()
+            return TypeProd(left, self.prod())
+        return left
+
+    def app(self) -> TypeNode:
+        items: List[TypeNode] = []
+        while True:
+            kind = self.peek()
+            if kind in (None, "arrow", "prod", "close", "comma", "colon", "maps", "assign"):
+                break
+            if kind == "op" and self.tokens[self.pos].text == "//":
+                break
+            if kind == "quant":
+                items.append(self.binder()) # 'p ∧ ∀ x, q' : le lieur s'étend jusqu'à la fin
+                break
+            token = self.next()
+            if kind == "ident":
+                items.append(TypeIdent(token.text, token.start))
+            elif kind == "open":
+                items.append(self.group(token.text))
+            else:
+                items.append(TypeOp(token.text, token.start))
+        if not items:
+            raise self.error("terme attendu")
+        return items[0] if len(items) == 1 else TypeApp(tuple(items))
+
+    def _binder_names(self) -> int:
+        """Nombre d'identifiants en tête s'ils sont suivis de ':' ou '//' (lieur), sinon 0."""
+        count = 0
+        tokens = self.tokens
+        while self.pos + count < len(tokens) and tokens[self.pos + count].kind == "ident":
+            count += 1
+        if count and self.pos + count < len(tokens):
+            following = tokens[self.pos + count]
+            if following.kind == "colon" or following.text == "//":
+                return count
+        return 0
+
+    def group(self, bracket: str) -> TypeGroup:
+        closing = _CLOSING[bracket]
+        names: Tuple[TypeIdent, ...] = ()
+        count = self._binder_names()
+        if count:
+            names = tuple(TypeIdent(token.text, token.start) for token in self.tokens[self.pos:self.pos + count])
+            self.pos += count
+        items: List[TypeNode] = []
+        predicate = None
+        if names and self.peek() == "colon":
+            self.next()
+            items.append(self.expr())
+        elif not names and self.peek() != "close":
+            items.append(self.expr())
+            while self.peek() == "comma":
+                self.next()
+                items.append(self.expr())
+        if self.peek() == "op" and self.tokens[self.pos].text == "//":
+            self.next()
+            predicate = self.expr()
+        if self.peek() != "close" or self.tokens[self.pos].text != closing:
+            raise self.error(f"'{closing}' attendu")
+        self.next()
+        return TypeGroup(bracket, names, tuple(items), predicate)
+
+    def binder(self) -> TypeBinder:
+        quantifier = self.next().text
+        groups: List[TypeGroup] = []
+        while self.peek() not in ("comma", "maps"):
+            kind = self.peek()
+            if kind == "open":
+                groups.append(self.group(self.next().text))
+            elif kind == "ident":
+                # '∀ x y : T,' ou '∀ x y,'
+                names = []
+                while self.peek() == "ident":
+                    token = self.next()
+                    names.append(TypeIdent(token.text, token.start))
+                items: Tuple[TypeNode, ...] = ()
+                if self.peek() == "colon":
+                    self.next()
+                    items = (self.expr(),)
+                groups.append(TypeGroup("", tuple(names), items))
+            else:
+                raise self.error("lieur attendu")
+        self.next()
+        return TypeBinder(quantifier, tuple(groups), self.expr())
+
+def parse_type(text: str) -> TypeNode:
+    """Analyse une expression de type Lean. Lève ValueError si elle est mal formée."""
+    return _TypeParser(text).parse()
+
+def _root(name: str) -> str:
+    return name.split(".", 1)[0]
+
+def free_identifiers(node: TypeNode, bound: frozenset = frozenset()) -> Iterator[TypeIdent]:
+    """Identifiants libres (non liés par un lieur), dans l'ordre du texte."""
+    kind = type(node)
+    if kind is TypeIdent:
+        if _root(node.name) not in bound:
+            yield node
+    elif kind is TypeApp:
+        for item in node.items:
+            yield from free_identifiers(item, bound)
+    elif kind is TypeArrow:
+        yield from free_identifiers(node.domain, bound)
+        domain = node.domain
+        if type(domain) is TypeGroup and domain.names:
+            bound = bound | {name.name for name in domain.names}
+        yield from free_identifiers(node.codomain, bound)
+    elif kind is TypeProd:
+        yield from free_identifiers(node.left, bound)
+        yield from free_identifiers(node.right, bound)
+    elif kind is TypeGroup:
+        for item in node.items:
+            yield from free_identifiers(item, bound)
+        if node.predicate is not None:
+            inner = bound | {name.name for name in node.names}
+            yield from free_identifiers(node.predicate, inner)
+    elif kind is TypeBinder:
+        for group in node.groups:
+            for item in group.items:
+                yield from free_identifiers(item, bound)
+            bound = bound | {name.name for name in group.names}
+        yield from free_identifiers(node.body, bound)
+
+@lru_cache(maxsize=4096)
+def type_template(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Découpe un type en (littéraux, identifiants libres) : le texte est
+    littéraux[0] + id[0] + littéraux[1] + ... + littéraux[-1].
+    Un type mal formé est traité comme un identifiant unique (le texte entier).
+    L'analyse ne dépend pas du mapping : elle est faite une fois par texte.
+    """
+    try:
+        identifiers = list(free_identifiers(parse_type(text)))
+    except ValueError:
+        return ("", ""), (text,)
+    literals: List[str] = []
+    names: List[str] = []
+    position = 0
+    for identifier in identifiers:
+        literals.append(text[position:identifier.start])
+        names.append(identifier.name)
+        position = identifier.start + len(identifier.name)
+    literals.append(text[position:])
+    return tuple(literals), tuple(names)
+
+def map_type_expression(text: str, lookup: Callable[[str], str]) -> str:
+    """Remplace chaque identifiant libre de 'text' par lookup(identifiant)."""
+    literals, names = type_template(text)
+    parts = [literals[0]]
+    for name, literal in zip(names, literals[1:]):
+        parts.append(lookup(name))
+        parts.append(literal)
+    return "".join(parts)
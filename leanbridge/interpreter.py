@@ -1,29 +1,118 @@
-from typing import List
+from copy import copy
+from itertools import islice, repeat
+from operator import attrgetter
+from time import perf_counter
+from typing import IO, TYPE_CHECKING, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple
 from .core.objects import MathObject, MScalar, MStructure, MInductive
 from .inference.context import ContextManager
 from .inference.mapper import LibraryMapper
-from .actions.commands import Action, ActionDefine  # Import ActionDefine
+from .actions.commands import Action, ActionDefine, ActionSolve  # Import ActionDefine
 from .actions.definitions_extended import ActionDefineStructure, ActionDefineInductive
+from .actions.tables import ActionTable, ActionStructureTable
+from .actions.templates import render_actions
 from .config.registry import Registry, TranslationTarget
 from .core.scopes import ScopeManager
+from .core.buffer import ActionBuffer
+from .inference.context import Environment
+from .inference.symbols import SymbolIndex
+from .core.tracked import edit_count, next_revision, watch
+
+# Modules importés à la demande (pool, profilage, modules, vérification) : ils ne
+# pèsent pas sur le démarrage de qui n'utilise que process()
+if TYPE_CHECKING:
+    from .profiling import Tracer, ProfileStats
+    from .sharding import Shard
+    from .output import OutputWriter
+    from .verify.cache import OutcomeCache
+    from .verify.claims import Outcome
+
+def _render_chunk(actions: List[Action], mapper: LibraryMapper) -> List[str]:
+    """Rend un lot d'actions pures (exécuté dans un worker du pool)."""
+    return render_actions(actions, ContextManager(), mapper)
+
+def _render_encoded_chunk(data: bytes, mapper: LibraryMapper) -> List[str]:
+    """Comme _render_chunk, pour un lot reçu encodé (voir serialization.dumps_actions)."""
+    from .serialization import loads_actions
+    return render_actions(loads_actions(data), ContextManager(), mapper)
+
+class _SymbolState(NamedTuple):
+    """Index des symboles couvrant les 'position' premières actions du buffer."""
+    index: SymbolIndex
+    position: int
+    last: Optional[Action] # Dernière action indexée (une table peut être prolongée en place)
+    rows: int # Nombre de lignes de 'last' déjà indexées si c'est une table
+    revision: int = 0 # Révision à l'indexation : une action modifiée depuis a une révision supérieure
+    edits: int = 0 # edit_count() à l'indexation (voir core/tracked.py)
+    # Points de reprise (index, position, last, rows) : après une modification en place,
+    # l'index est reconstruit depuis le dernier point précédant la première action modifiée
+    checkpoints: Tuple[Tuple, ...] = ((SymbolIndex(), 0, None, 0),)
+
+_EMPTY_SYMBOLS = _SymbolState(SymbolIndex(), 0, None, 0)
+
+def _table_rows(action: Optional[Action]) -> int:
+    return len(action) if type(action) in (ActionTable, ActionStructureTable) else 0
+
+def _watched(action: Action) -> Action:
+    watch(action)
+    return action
+
+class InterpreterSnapshot(NamedTuple):
+    """État capturé par LeanBridgeInterpreter.snapshot() (buffer partagé et contexte immuable)."""
+    buffer: ActionBuffer
+    context: Environment
+    symbols: _SymbolState = _EMPTY_SYMBOLS
 
 class LeanBridgeInterpreter:
     """
     Orchestre la traduction des actions utilisateur en code Lean.
     Version v0.2 : Supporte l'API impérative, les Scopes et le Registre.
     """
-    def __init__(self, config_path: str = "leanbridge/config.yaml"):
+    # Nombre de lignes rendues à la fois par define_many() en mode write-through
+    WRITE_THROUGH_BATCH = 4096
+    # Taille des lots rendus par process_stream() (gabarits compilés, mémoire bornée)
+    STREAM_BATCH = 1024
+    # Écart (en actions) entre deux points de reprise de l'index des symboles
+    SYMBOL_CHECKPOINT = 1024
+
+    # Méthodes remplacées au niveau de l'instance quand un traceur est installé :
+    # sans traceur, le chemin de rendu normal ne fait aucun test supplémentaire.
+    _TRACED_METHODS = {
+        "add_action": "_traced_add_action",
+        "process_stream": "_traced_process_stream",
+        "_render_buffer": "_traced_render_buffer",
+        "_render_parallel": "_traced_render_parallel",
+    }
+
+    def __init__(self, config_path: str = "leanbridge/config.yaml", write_through: Optional[TextIO] = None):
         self.context = ContextManager()
         self.header_imports = ["import Mathlib"]
         
         # v0.2 Components
         self.config = Registry() # Registre de configuration
-        self.mapper = LibraryMapper(config_path) # Pourrait utiliser le registre aussi
-        self._action_buffer: List[Action] = [] # Buffer interne pour l'API impérative
+        self.mapper = LibraryMapper(config_path)
+        self.mapper.bind_registry(self.config, TranslationTarget.LEAN) # Réécritures du registre
+        self._action_buffer = ActionBuffer() # Buffer interne pour l'API impérative
+
+        # Index des symboles, mis à jour à la demande (voir la propriété symbols)
+        self._symbol_state = _EMPTY_SYMBOLS
+        self._symbol_pending: List[Action] = [] # Actions write-through pas encore indexées
+
+        # Cache de rendu : id(action) -> (action, révision, fragment)
+        self._render_cache: Dict[int, Tuple[Action, int, str, Optional[Tuple]]] = {}
+        self._render_stamp = None
         
         # Scope Factories
         self._scope_manager = ScopeManager(self)
 
+        # Mode write-through : les actions sont rendues et écrites dès leur ajout
+        self._sink: Optional[TextIO] = None
+        if write_through is not None:
+            self.start_write_through(write_through)
+
+        # Instrumentation (voir set_tracer / enable_profiling)
+        self._tracer: Optional["Tracer"] = None
+        self._profile: Optional["ProfileStats"] = None
+
     def Namespace(self, name: str):
         return self._scope_manager.Namespace(name)
 
@@ -31,9 +120,109 @@ class LeanBridgeInterpreter:
         return self._scope_manager.Section(name)
 
     def add_action(self, action: Action):
-        """Ajoute une action au buffer courant."""
+        """
+        Ajoute une action au buffer courant.
+        En mode write-through, l'action est rendue et écrite immédiatement, sans être conservée.
+        """
+        if self._sink is not None:
+            self._sink.write("\n")
+            self._sink.write(action.to_lean(self.context, self.mapper))
+            self._pend_symbols(action)
+            return
         self._action_buffer.append(action)
 
+    def start_write_through(self, fileobj: TextIO):
+        """
+        Active le mode write-through : l'en-tête est écrit tout de suite, puis chaque
+        action ajoutée est rendue dans 'fileobj'. La mémoire reste bornée quelle que soit
+        la taille du corpus. Le texte produit est identique à celui de process().
+        """
+        fileobj.write("\n".join([*self.header_imports, ""]))
+        self._sink = fileobj
+
+    def stop_write_through(self):
+        """Désactive le mode write-through et vide le flux de sortie."""
+        if self._symbol_pending:
+            self._update_symbols() # Les actions ajoutées ensuite au buffer viennent après
+        if self._sink is not None:
+            flush = getattr(self._sink, "flush", None)
+            if flush:
+                flush()
+        self._sink = None
+
+    @property
+    def symbols(self) -> SymbolIndex:
+        """
+        Index des noms qualifiés déclarés jusqu'ici (voir inference/symbols.py) :
+        résolution avec namespaces et 'open', doublons, noms sous un namespace.
+        L'index est complété à la demande avec les seules actions ajoutées depuis
+        la dernière consultation : add_action() n'a aucun coût supplémentaire.
+
+        Les actions indexées sont surveillées (core/tracked.py) : après une
+        modification en place (ex: action.name = ..., touch()), l'index est
+        reconstruit depuis le point de reprise (toutes les SYMBOL_CHECKPOINT
+        actions) qui précède la première action modifiée. Les actions écrites en
+        mode write-through ne sont pas conservées : les actions du buffer qui les
+        précèdent ne sont plus réindexées.
+        """
+        return self._update_symbols().index
+
+    def _update_symbols(self) -> _SymbolState:
+        state = self._symbol_state
+        buffer = self._action_buffer
+        size = len(buffer)
+        if size < state.position:
+            # Buffer remplacé par un buffer plus court sans passer par rollback() : on réindexe
+            state = _EMPTY_SYMBOLS
+        elif state.edits != edit_count():
+            state = self._rewind_symbols(state)
+        index, position, last, rows, _, edits, checkpoints = state
+        if (size == position and not self._symbol_pending and _table_rows(last) == rows
+                and edits == edit_count()):
+            self._symbol_state = state
+            return state
+        if _table_rows(last) > rows:
+            # Lignes ajoutées en place à la table en fin de buffer
+            index = index.add_symbols(last.declared_symbols(rows), last)
+        step = self.SYMBOL_CHECKPOINT
+        while size > position:
+            stop = min(size, position + step)
+            index = index.add_actions(map(_watched, islice(buffer.iter_from(position), stop - position)))
+            position, last = stop, buffer[stop - 1]
+            if position - checkpoints[-1][1] >= step:
+                checkpoints = (*checkpoints, (index, position, last, _table_rows(last)))
+        if self._symbol_pending:
+            index = index.add_actions(self._symbol_pending)
+            self._symbol_pending = []
+            # Les actions write-through ne sont pas conservées : on ne reprend qu'après elles
+            checkpoints = ((index, size, last, _table_rows(last)),)
+        state = self._symbol_state = _SymbolState(index, size, last, _table_rows(last),
+                                                  next_revision(), edit_count(), checkpoints)
+        return state
+
+    def _rewind_symbols(self, state: _SymbolState) -> _SymbolState:
+        """
+        Des objets surveillés ont été modifiés : état du dernier point de reprise
+        précédant la première action indexée modifiée depuis l'indexation, ou 'state'
+        (à jour de edit_count()) si aucune ne l'a été.
+        """
+        checkpoints = state.checkpoints
+        start = checkpoints[0][1]
+        actions = islice(self._action_buffer.iter_from(start), state.position - start)
+        changed = next((position for position, action in enumerate(actions, start)
+                        if action.changed_since(state.revision)), None)
+        if changed is None:
+            return state._replace(edits=edit_count())
+        kept = tuple(checkpoint for checkpoint in checkpoints if checkpoint[1] <= changed)
+        return _SymbolState(*kept[-1], state.revision, -1, kept)
+
+    def _pend_symbols(self, action: Action):
+        """Mode write-through : l'action n'est pas conservée, on l'indexe par lots."""
+        pending = self._symbol_pending
+        pending.append(action)
+        if len(pending) >= self.WRITE_THROUGH_BATCH:
+            self._update_symbols()
+
     def define_structure(self, name: str, fields: dict):
         """Helper pour définir une structure rapidement."""
         struct = MStructure(name, fields)
@@ -44,24 +233,419 @@ class LeanBridgeInterpreter:
         ind = MInductive(name, constructors)
         self.add_action(ActionDefineInductive(ind))
     
+    def define_many(self, records: Iterable) -> int:
+        """
+        Ajoute des définitions en masse (voir ActionTable pour le format des enregistrements).
+        Les lignes sont stockées en colonnes : aucun objet Action n'est créé par ligne.
+        Retourne le nombre de définitions ajoutées.
+        """
+        return self._add_rows(ActionTable, records)
+
+    def define_structures_from_records(self, records: Iterable) -> int:
+        """
+        Ajoute des structures en masse (voir ActionStructureTable), par ex. depuis
+        read_records(open("structures.jsonl")). Retourne le nombre de structures ajoutées.
+        """
+        return self._add_rows(ActionStructureTable, records)
+
+    def _add_rows(self, table_cls, records: Iterable) -> int:
+        # En write-through, les lignes sont rendues par lots pour garder la mémoire bornée
+        if self._sink is not None:
+            records = iter(records)
+            total = 0
+            while True:
+                table = table_cls()
+                count = table.extend(islice(records, self.WRITE_THROUGH_BATCH))
+                if not count:
+                    return total
+                self.add_action(table)
+                total += count
+
+        # Les lignes consécutives prolongent la table en fin de buffer (si elle n'est pas partagée)
+        last = self._action_buffer.last_owned()
+        if type(last) is table_cls:
+            return last.extend(records)
+        table = table_cls()
+        count = table.extend(records)
+        if count:
+            self.add_action(table)
+        return count
+
+    def snapshot(self) -> InterpreterSnapshot:
+        """
+        Capture l'état du buffer et du contexte en O(1), sans copie.
+        Voir rollback().
+        """
+        if self._symbol_pending:
+            self._update_symbols()
+        snap = InterpreterSnapshot(self._action_buffer, self.context.snapshot(), self._symbol_state)
+        self._action_buffer = self._action_buffer.branch() # Le buffer capturé n'est plus modifié
+        return snap
+
+    def rollback(self, snap: InterpreterSnapshot):
+        """Revient à l'état capturé par snapshot() (O(1))."""
+        self._action_buffer = snap.buffer.branch()
+        self.context.restore(snap.context)
+        self._symbol_state = snap.symbols
+        self._symbol_pending = []
+
+    def fork(self) -> "LeanBridgeInterpreter":
+        """
+        Crée un interpréteur indépendant qui part de l'état courant.
+        Le buffer et le contexte sont partagés structurellement (le préfixe n'est
+        pas copié) ; le mapper et le registre sont dupliqués pour que leurs
+        modifications restent propres à chaque branche. La branche n'hérite ni
+        du mode write-through ni du traceur.
+
+        Les actions déjà ajoutées sont partagées par les deux interpréteurs : pour en
+        modifier une dans une seule branche, passer par editable_action() (copie à la
+        première modification). verify_claims() le fait pour les ActionSolve.
+        """
+        tracer = self._tracer
+        if tracer is not None:
+            self.set_tracer(None) # La branche n'est pas tracée
+        try:
+            child = self._fork()
+        finally:
+            if tracer is not None:
+                self.set_tracer(tracer)
+        return child
+
+    def editable_action(self, index: int) -> Action:
+        """
+        Action à la position 'index' du buffer, modifiable en place sans effet sur les
+        autres branches (fork(), snapshot()) : une action partagée est d'abord
+        remplacée par une copie propre à cet interpréteur.
+        """
+        buffer = self._action_buffer
+        if index < 0:
+            index += len(buffer)
+        action = buffer[index]
+        if buffer.is_shared(index):
+            action = copy(action)
+            buffer.replace(index, action)
+            watch(action)
+            action.touch() # L'index des symboles relit la position
+        return action
+
+    def _fork(self) -> "LeanBridgeInterpreter":
+        child = object.__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child.context = self.context.fork()
+        child.header_imports = list(self.header_imports)
+        child.config = self.config.copy()
+        child.mapper = self.mapper.copy()
+        child.mapper.bind_registry(child.config, TranslationTarget.LEAN)
+        child._scope_manager = ScopeManager(child)
+        child._render_cache = {}
+        child._render_stamp = None
+        child._sink = None
+        child._profile = None
+        child._symbol_pending = list(self._symbol_pending)
+
+        shared = self._action_buffer
+        self._action_buffer = shared.branch()
+        child._action_buffer = shared.branch()
+        return child
+
     # Pour compatibilité v0.1 ou usage hybride, on garde process si on lui passe une liste
-    def process(self, actions: List[Action] = None) -> str:
+    def process(self, actions: List[Action] = None, parallel: int = 0, executor: str = "process") -> str:
         """
         Traite une séquence d'actions et retourne le code Lean complet.
-        Si 'actions' est None, utilise le buffer interne accumulé.
+        Si 'actions' est None, utilise le buffer interne accumulé : dans ce cas, le rendu
+        des actions inchangées depuis le dernier appel est réutilisé.
+
+        Avec parallel=N (N > 1), les actions pures sont rendues dans un pool de N workers
+        ('process' ou 'thread'). Les actions qui modifient le contexte (ActionDeclare)
+        servent de barrières : elles sont rejouées dans l'ordre, dans le processus courant.
+        Le résultat est identique au rendu séquentiel.
+        """
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Exécuteur inconnu : {executor!r} (attendu 'process' ou 'thread')")
+        if actions is None:
+            return "\n".join([*self.header_imports, "", *self._render_buffer(parallel, executor)])
+        if parallel > 1:
+            return "\n".join([*self.header_imports, "", *self._render_parallel(list(actions), parallel, executor)])
+        return "\n".join(self.process_stream(actions))
+
+    def _render_parallel(self, actions: List[Action], workers: int, executor: str) -> List[str]:
+        """Rend les actions pures dans un pool et les barrières dans l'ordre, ici."""
+        fragments: List[Optional[str]] = [None] * len(actions)
+        todo = []
+        for index, action in enumerate(actions):
+            if action.is_pure:
+                todo.append(index)
+            else:
+                fragments[index] = action.to_lean(self.context, self.mapper)
+        rendered = self._render_pool([actions[i] for i in todo], workers, executor)
+        for index, fragment in zip(todo, rendered):
+            fragments[index] = fragment
+        return fragments
+
+    def _render_pool(self, actions: List[Action], workers: int, executor: str) -> List[str]:
+        """Découpe 'actions' (toutes pures) en lots rendus par un pool, en préservant l'ordre."""
+        if len(actions) < 2:
+            return _render_chunk(actions, self.mapper)
+        size = max(1, -(-len(actions) // (workers * 4)))
+        chunks = [actions[i:i + size] for i in range(0, len(actions), size)]
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        render = _render_chunk
+        if executor == "process":
+            # Les lots traversent la frontière de processus encodés plutôt que picklés
+            # (sauf si une valeur n'est pas encodable, ex: objet d'un type utilisateur)
+            from .serialization import dumps_actions
+            try:
+                chunks = [dumps_actions(chunk) for chunk in chunks]
+                render = _render_encoded_chunk
+            except TypeError:
+                pass
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            results = pool.map(render, chunks, repeat(self.mapper))
+            return [fragment for chunk in results for fragment in chunk]
+
+    def clear_render_cache(self):
+        """Oublie les fragments mémorisés par process() et les actions qu'ils retiennent."""
+        self._render_cache = {}
+
+    def _render_buffer(self, parallel: int = 0, executor: str = "process") -> List[str]:
+        """
+        Rend le buffer interne en réutilisant les fragments en cache.
+        Un fragment reste valide tant que l'action (révision et contenu modifiable
+        en place, voir Action.nested_state), le mapping du LibraryMapper et les
+        réécritures du Registry n'ont pas changé.
+        Les actions non pures (ex: ActionDeclare) sont toujours rejouées pour
+        conserver leurs effets sur le contexte. Les actions pures à re-rendre le sont
+        ensuite par lots (gabarits compilés), ou par le pool si parallel > 1.
+        """
+        mapper, registry = self.mapper, self.config
+        stamp = (mapper, mapper.version, registry, registry.version)
+        if stamp != self._render_stamp:
+            self._render_cache = {}
+            self._render_stamp = stamp
+
+        cache = self._render_cache
+        get = cache.get
+        fragments = []
+        append = fragments.append
+        context = self.context
+        pending: List[Action] = [] # Actions pures à rendre, par lots
+        positions: List[int] = []
+        for index, action in enumerate(self._action_buffer):
+            entry = get(id(action))
+            # Sans MathObject modifiable référencé (entry[3] None), '_rev' suffit
+            if (entry is not None and entry[0] is action and entry[1] == action._rev
+                    and (entry[3] is None or entry[3] == action.nested_state())):
+                append(entry[2])
+                continue
+            if action.is_pure:
+                pending.append(action)
+                positions.append(index)
+                append(None)
+                continue
+            append(action.to_lean(context, mapper))
+
+        if pending:
+            if parallel > 1:
+                rendered = self._render_pool(pending, parallel, executor)
+            else:
+                rendered = render_actions(pending, context, mapper)
+            if len(pending) == len(fragments):
+                fragments = rendered
+            else:
+                for index, fragment in zip(positions, rendered):
+                    fragments[index] = fragment
+            cache.update(zip(map(id, pending), zip(pending, map(attrgetter("_rev"), pending), rendered,
+                                                   [action.nested_state() for action in pending])))
+
+        # Purge des entrées d'actions retirées du buffer
+        if len(cache) > 2 * len(fragments) + 64:
+            live = {id(action) for action in self._action_buffer}
+            self._render_cache = {k: v for k, v in cache.items() if k in live}
+        return fragments
+
+    def process_stream(self, actions: Iterable[Action] = None) -> Iterator[str]:
+        """
+        Version générateur de process() : produit le code Lean fragment par fragment.
+        'actions' peut être n'importe quel itérable (y compris un générateur) : les
+        actions sont rendues par lots de STREAM_BATCH, seul le lot courant est en mémoire.
         """
         target_actions = actions if actions is not None else self._action_buffer
-        
-        lines = []
-        
+
         # 1. Imports
-        lines.extend(self.header_imports)
-        lines.append("") 
-        
-        # 2. Traitement des actions
+        yield from self.header_imports
+        yield ""
+
+        # 2. Traitement des actions, par lots de STREAM_BATCH
+        context, mapper = self.context, self.mapper
+        iterator = iter(target_actions)
+        size = self.STREAM_BATCH
+        while True:
+            batch = list(islice(iterator, size))
+            if not batch:
+                break
+            yield from render_actions(batch, context, mapper)
+
+    def process_sharded(self, out_dir: str, max_decls: int = 200, module_name: str = "Generated",
+                        actions: List[Action] = None, writer: Optional["OutputWriter"] = None) -> List["Shard"]:
+        """
+        Variante de process() qui écrit le code Lean en plusieurs modules, pour que
+        Lean (lake) les élabore en parallèle : '<out_dir>/<module_name>/PartNNNN.lean',
+        plus un module racine '<out_dir>/<module_name>.lean' qui les importe tous.
+
+        Le découpage suit les scopes (rouverts dans chaque module) et les dépendances
+        entre déclarations (imports entre modules), voir sharding.split_modules.
+        Les fichiers inchangés ne sont pas réécrits. Pour obtenir le rapport des
+        changements, passer un OutputWriter et appeler ensuite writer.finish().
+        """
+        if actions is None:
+            actions = list(self._action_buffer)
+            fragments = self._render_buffer()
+        else:
+            actions = list(actions)
+            fragments = list(self.process_stream(actions))[len(self.header_imports) + 1:]
+        from .output import OutputWriter
+        from .sharding import split_modules, write_modules
+        shards = split_modules(actions, fragments, self.header_imports, max_decls, module_name)
+        if writer is None:
+            out = OutputWriter(out_dir)
+            write_modules(out, module_name, shards)
+            out.finish()
+        else:
+            write_modules(writer, module_name, shards)
+        return shards
+
+    def write_output(self, writer: "OutputWriter", rel_path: str, actions: List[Action] = None) -> bool:
+        """Écrit le résultat de process() via un OutputWriter (pas de réécriture s'il est inchangé)."""
+        return writer.write(rel_path, self.process(actions))
+
+    def verify_claims(self, verifier, tactics: Optional[Sequence[str]] = None, only_sorry: bool = True,
+                      batch_size: int = 64, cache: Optional["OutcomeCache"] = None) -> List["Outcome"]:
+        """
+        Vérifie les énoncés du buffer (paires ActionClaim + ActionSolve) par lots, avec
+        'verifier' (ex: verify.CheckerPool) : pour chaque énoncé, les tactiques (par défaut
+        verify.DEFAULT_TACTICS) sont essayées en concurrence et la première qui réussit est
+        écrite dans l'ActionSolve. Avec only_sorry, seules les preuves encore en 'sorry'
+        sont tentées. Avec un 'cache' (verify.OutcomeCache), les tentatives déjà connues
+        ne sont pas renvoyées.
+        """
+        from .verify.claims import DEFAULT_TACTICS, collect_claims
+        if tactics is None:
+            tactics = DEFAULT_TACTICS
+        if cache is not None:
+            from .verify.cache import CachedVerifier
+            verifier = CachedVerifier(verifier, cache)
+        actions = list(self._action_buffer)
+        fragments = self._render_buffer()
+        requests, solves = collect_claims(actions, fragments, "\n".join(self.header_imports), only_sorry)
+        # Les ActionSolve partagées avec une autre branche sont copiées avant d'être modifiées
+        positions = {id(action): index for index, action in enumerate(actions) if type(action) is ActionSolve}
+        outcomes: List["Outcome"] = []
+        for start in range(0, len(requests), batch_size):
+            results = verifier.verify(requests[start:start + batch_size], tactics)
+            for outcome, solve in zip(results, solves[start:start + batch_size]):
+                if outcome.success:
+                    self.editable_action(positions[id(solve)]).method = outcome.tactic
+            outcomes.extend(results)
+        return outcomes
+
+    def write_to(self, fileobj: TextIO, actions: Iterable[Action] = None):
+        """
+        Écrit le code Lean dans un objet fichier texte, fragment par fragment.
+        Le contenu écrit est identique à la chaîne retournée par process().
+        """
+        write = fileobj.write
+        fragments = self.process_stream(actions)
+        for fragment in fragments:
+            write(fragment)
+            break
+        for fragment in fragments:
+            write("\n")
+            write(fragment)
+
+    def dump_buffer(self, fp: IO, format: str = "binary") -> int:
+        """
+        Écrit les actions du buffer dans 'fp' (voir serialization : 'binary' ou 'jsonl').
+        Retourne le nombre d'actions écrites.
+        """
+        from .serialization import dump_actions
+        return dump_actions(self._action_buffer, fp, format)
+
+    def load_buffer(self, fp: IO) -> int:
+        """
+        Ajoute les actions lues dans 'fp' au fil de la lecture (en mode write-through,
+        elles sont rendues sans être conservées). Retourne le nombre d'actions lues.
+        """
+        from .serialization import load_actions
+        add_action = self.add_action
+        count = 0
+        for action in load_actions(fp):
+            add_action(action)
+            count += 1
+        return count
+
+    def set_tracer(self, tracer: Optional["Tracer"]):
+        """
+        Installe un traceur (voir profiling.Tracer), appelé autour de chaque to_lean(),
+        ou le retire (None). Pendant le traçage, le rendu est séquentiel et le cache
+        de rendu n'est pas consulté : chaque action est rendue et mesurée.
+        """
+        if self._tracer is not None:
+            self._tracer.detach(self)
+            for name in self._TRACED_METHODS:
+                self.__dict__.pop(name, None)
+        self._tracer = tracer
+        if tracer is not None:
+            from .profiling import ProfileStats
+            if isinstance(tracer, ProfileStats):
+                self._profile = tracer
+            tracer.attach(self)
+            for name, traced in self._TRACED_METHODS.items():
+                setattr(self, name, getattr(self, traced))
+
+    def enable_profiling(self) -> "ProfileStats":
+        """Active le profilage intégré et retourne les statistiques (remises à zéro)."""
+        from .profiling import ProfileStats
+        stats = ProfileStats()
+        self.set_tracer(stats)
+        return stats
+
+    def disable_profiling(self) -> Optional["ProfileStats"]:
+        """Retire le traceur ; les statistiques restent disponibles pour profile_report()."""
+        self.set_tracer(None)
+        return self._profile
+
+    def profile_report(self, fmt: str = "table") -> str:
+        """Rapport du dernier profilage, au format 'table' ou 'json'."""
+        if self._profile is None:
+            raise RuntimeError("Aucun profilage : appelez enable_profiling() avant process()")
+        return self._profile.report(fmt)
+
+    def _render_traced(self, action: Action) -> str:
+        tracer = self._tracer
+        tracer.on_start(action)
+        start = perf_counter()
+        lean_code = action.to_lean(self.context, self.mapper)
+        tracer.on_end(action, lean_code, perf_counter() - start)
+        return lean_code
+
+    def _traced_add_action(self, action: Action):
+        if self._sink is not None:
+            self._sink.write("\n")
+            self._sink.write(self._render_traced(action))
+            self._pend_symbols(action)
+            return
+        self._action_buffer.append(action)
+
+    def _traced_process_stream(self, actions: Iterable[Action] = None) -> Iterator[str]:
+        target_actions = actions if actions is not None else self._action_buffer
+        yield from self.header_imports
+        yield ""
         for action in target_actions:
-            lean_code = action.to_lean(self.context, self.mapper)
-            lines.append(lean_code)
-            
-        return "\n".join(lines)
+            yield self._render_traced(action)
+
+    def _traced_render_buffer(self, parallel: int = 0, executor: str = "process") -> List[str]:
+        return [self._render_traced(action) for action in self._action_buffer]
 
+    def _traced_render_parallel(self, actions: List[Action], workers: int, executor: str) -> List[str]:
+        return [self._render_traced(action) for action in actions]
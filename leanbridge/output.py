@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Début d'une déclaration Lean (en colonne 0) ; les lignes indentées qui suivent en font partie
+_DECLARATION = re.compile(
+    r"(?:@\[[^\]]*\][ \t]*)?(?:(?:private|protected|noncomputable|partial|unsafe)[ \t]+)*"
+    r"(?:def|theorem|lemma|abbrev|structure|inductive|class|instance|axiom|opaque|example)\b[ \t]*([^\s:({\[]*)"
+)
+_SCOPE = re.compile(r"(namespace|section|end)\b[ \t]*(\S*)")
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def split_declarations(text: str) -> Dict[str, str]:
+    """
+    Découpe du code Lean en déclarations : nom qualifié -> texte de la déclaration.
+    Les déclarations anonymes (instance, example) et les doublons sont numérotés ('#2'...).
+    """
+    declarations: Dict[str, List[str]] = {}
+    namespaces: List[str] = []
+    scopes: List[str] = [] # "namespace" ou "section", pour savoir quoi dépiler à 'end'
+    current: Optional[List[str]] = None
+    for line in text.split("\n"):
+        if current is not None and line[:1] in (" ", "\t", "|") and line.strip():
+            current.append(line)
+            continue
+        current = None
+        match = _DECLARATION.match(line)
+        if match:
+            name = ".".join([*namespaces, match.group(1) or "_"])
+            key, n = name, 1
+            while key in declarations:
+                n += 1
+                key = f"{name}#{n}"
+            current = declarations[key] = [line]
+            continue
+        scope = _SCOPE.match(line)
+        if scope:
+            kind, name = scope.groups()
+            if kind == "end":
+                if scopes and scopes.pop() == "namespace" and namespaces:
+                    namespaces.pop()
+            else:
+                scopes.append(kind)
+                if kind == "namespace":
+                    namespaces.append(name)
+    return {name: "\n".join(lines) for name, lines in declarations.items()}
+
+class FileChanges:
+    """Déclarations ajoutées, supprimées et modifiées dans un fichier."""
+    def __init__(self, added: List[str], removed: List[str], modified: List[str]):
+        self.added = added
+        self.removed = removed
+        self.modified = modified
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        return {"added": self.added, "removed": self.removed, "modified": self.modified}
+
+class OutputChanges:
+    """Rapport d'une session d'écriture (chemins relatifs au dossier de sortie)."""
+    def __init__(self):
+        self.created: List[str] = []
+        self.modified: List[str] = []
+        self.unchanged: List[str] = []
+        self.removed: List[str] = []
+        self.declarations: Dict[str, FileChanges] = {} # Fichiers .lean créés, modifiés ou supprimés
+
+    @property
+    def written(self) -> List[str]:
+        return self.created + self.modified
+
+    def as_dict(self) -> Dict:
+        return {
+            "created": self.created,
+            "modified": self.modified,
+            "unchanged": self.unchanged,
+            "removed": self.removed,
+            "declarations": {path: changes.as_dict() for path, changes in self.declarations.items()},
+        }
+
+    def summary(self) -> str:
+        lines = [f"{len(self.created)} créés, {len(self.modified)} modifiés, "
+                 f"{len(self.unchanged)} inchangés, {len(self.removed)} supprimés"]
+        for path in (*self.created, *self.modified, *self.removed):
+            changes = self.declarations.get(path)
+            detail = ""
+            if changes:
+                detail = " (" + ", ".join(f"{label} {len(names)}" for label, names in (
+                    ("+", changes.added), ("-", changes.removed), ("~", changes.modified)) if names) + ")"
+            lines.append(f"  {path}{detail}")
+        return "\n".join(lines)
+
+def write_file(out_dir: str, rel_path: str, text: str, previous: Optional[Dict] = None) -> Tuple[Dict, str]:
+    """
+    Écrit 'text' dans 'out_dir/rel_path' de façon atomique (fichier temporaire puis
+    renommage), sauf s'il est identique au contenu actuel. 'previous' est l'entrée du
+    manifeste précédent. Retourne (entrée du manifeste, "created"|"modified"|"unchanged").
+    Sans état partagé : peut être appelée depuis un worker (voir OutputWriter.record).
+    """
+    data = text.encode("utf-8")
+    digest = _digest(data)
+    path = os.path.join(out_dir, *rel_path.split("/"))
+
+    entry = {"hash": digest}
+    if rel_path.endswith(".lean"):
+        entry["declarations"] = {name: _digest(body.encode("utf-8"))
+                                 for name, body in split_declarations(text).items()}
+
+    if _unchanged_on_disk(path, data, digest, previous):
+        return entry, "unchanged"
+
+    existed = os.path.exists(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return entry, "modified" if existed else "created"
+
+def _unchanged_on_disk(path: str, data: bytes, digest: str, previous: Optional[Dict]) -> bool:
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    if size != len(data):
+        return False
+    if previous is not None and previous.get("hash") == digest:
+        return True
+    with open(path, "rb") as f: # Pas de manifeste fiable : comparaison directe
+        return f.read() == data
+
+class OutputWriter:
+    """
+    Écrit des fichiers dans 'out_dir' en ne touchant que ceux dont le contenu change :
+    un fichier identique octet pour octet n'est pas réécrit (sa date de modification
+    est conservée, le build Lean en aval ne le recompile pas).
+
+    Un manifeste ('.leanbridge-manifest.json') garde le hash de chaque fichier et de
+    chacune de ses déclarations, pour rapporter précisément ce qui a changé.
+    finish() supprime les fichiers du manifeste qui n'ont pas été écrits pendant la session.
+    """
+    MANIFEST = ".leanbridge-manifest.json"
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.manifest_path = os.path.join(out_dir, self.MANIFEST)
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self._previous: Dict[str, Dict] = json.load(f).get("files", {})
+        except (OSError, ValueError):
+            self._previous = {}
+        self._files: Dict[str, Dict] = {}
+        self.changes = OutputChanges()
+
+    def write(self, rel_path: str, text: str) -> bool:
+        """Écrit 'text' dans 'out_dir/rel_path' s'il diffère du contenu actuel. Retourne True si écrit."""
+        rel_path = rel_path.replace(os.sep, "/")
+        entry, status = write_file(self.out_dir, rel_path, text, self._previous.get(rel_path))
+        return self.record(rel_path, entry, status)
+
+    def previous_entry(self, rel_path: str) -> Optional[Dict]:
+        """Entrée du manifeste précédent pour 'rel_path' (à passer à write_file)."""
+        return self._previous.get(rel_path.replace(os.sep, "/"))
+
+    def record(self, rel_path: str, entry: Dict, status: str) -> bool:
+        """Enregistre le résultat d'un write_file() fait ailleurs (ex: dans un worker). Retourne True si écrit."""
+        rel_path = rel_path.replace(os.sep, "/")
+        self._files[rel_path] = entry
+        if status == "unchanged":
+            self.changes.unchanged.append(rel_path)
+            return False
+        (self.changes.modified if status == "modified" else self.changes.created).append(rel_path)
+        self._record_declarations(rel_path, self._previous.get(rel_path), entry)
+        return True
+
+    def _record_declarations(self, rel_path: str, previous: Optional[Dict], entry: Optional[Dict]):
+        if not rel_path.endswith(".lean"):
+            return
+        before = (previous or {}).get("declarations", {})
+        after = (entry or {}).get("declarations", {})
+        changes = FileChanges(
+            [name for name in after if name not in before],
+            [name for name in before if name not in after],
+            [name for name in after if name in before and before[name] != after[name]],
+        )
+        if changes or previous is None or entry is None:
+            self.changes.declarations[rel_path] = changes
+
+    def finish(self, remove_stale: bool = True) -> OutputChanges:
+        """
+        Termine la session : supprime (si demandé) les fichiers suivis qui n'ont pas été
+        réécrits, enregistre le manifeste et retourne le rapport des changements.
+        """
+        for rel_path, previous in self._previous.items():
+            if rel_path in self._files:
+                continue
+            if not remove_stale:
+                self._files[rel_path] = previous
+                continue
+            path = os.path.join(self.out_dir, *rel_path.split("/"))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.changes.removed.append(rel_path)
+            self._record_declarations(rel_path, previous, None)
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self._files}, f, indent=1, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+        self._previous = dict(self._files)
+        self._files = {}
+        changes, self.changes = self.changes, OutputChanges()
+        return changes
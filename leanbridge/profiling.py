@@ -0,0 +1,113 @@
+import json
+from collections import Counter
+from typing import Any, Dict, List
+
+class Tracer:
+    """
+    Interface des traceurs de LeanBridgeInterpreter (voir set_tracer()).
+    on_start/on_end encadrent chaque appel à Action.to_lean ; attach/detach sont
+    appelés quand le traceur est installé sur un interpréteur ou retiré.
+    """
+    def attach(self, interpreter):
+        pass
+
+    def detach(self, interpreter):
+        pass
+
+    def on_start(self, action):
+        pass
+
+    def on_end(self, action, lean_code: str, elapsed: float):
+        pass
+
+class ProfileStats(Tracer):
+    """
+    Traceur d'agrégation : temps, nombre d'appels et octets émis par sous-classe
+    d'Action, correspondances trouvées/absentes de LibraryMapper.get_lean_name et
+    efficacité du cache de LibraryMapper.map_type.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.actions: Dict[str, List] = {} # classe -> [appels, secondes, octets]
+        self.mapper_hits = 0
+        self.mapper_misses = 0
+        self.missed_names: Counter = Counter()
+        self.type_hits = 0 # map_type servi par son cache (get_lean_name n'est alors pas appelé)
+        self.type_misses = 0
+
+    def attach(self, interpreter):
+        # Compteurs installés au niveau de l'instance : retirés par detach()
+        mapper = interpreter.mapper
+        get_lean_name, map_type = mapper.get_lean_name, mapper.map_type
+
+        def counted_get_lean_name(abstract_name):
+            if abstract_name in mapper._overrides or abstract_name in mapper._base:
+                self.mapper_hits += 1
+            else:
+                self.mapper_misses += 1
+                self.missed_names[abstract_name] += 1
+            return get_lean_name(abstract_name)
+
+        def counted_map_type(type_hint):
+            if type(type_hint) is str and type_hint in mapper._type_cache():
+                self.type_hits += 1
+            else:
+                self.type_misses += 1
+            return map_type(type_hint)
+
+        mapper.get_lean_name = counted_get_lean_name
+        mapper.map_type = counted_map_type
+
+    def detach(self, interpreter):
+        interpreter.mapper.__dict__.pop("get_lean_name", None)
+        interpreter.mapper.__dict__.pop("map_type", None)
+
+    def on_end(self, action, lean_code: str, elapsed: float):
+        name = type(action).__name__
+        entry = self.actions.get(name)
+        if entry is None:
+            entry = self.actions[name] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] += len(lean_code.encode("utf-8"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "actions": {
+                name: {"calls": calls, "seconds": seconds, "bytes": size}
+                for name, (calls, seconds, size) in sorted(self.actions.items(), key=lambda item: -item[1][1])
+            },
+            "mapper": {
+                "hits": self.mapper_hits,
+                "misses": self.mapper_misses,
+                "top_misses": dict(self.missed_names.most_common(10)),
+                "type_cache_hits": self.type_hits,
+                "type_cache_misses": self.type_misses,
+            },
+        }
+
+    def report(self, fmt: str = "table") -> str:
+        """Rapport au format 'table' (texte) ou 'json'."""
+        data = self.as_dict()
+        if fmt == "json":
+            return json.dumps(data, indent=2, ensure_ascii=False)
+        if fmt != "table":
+            raise ValueError(f"Format de rapport inconnu : {fmt!r} (attendu 'table' ou 'json')")
+
+        total = sum(entry["seconds"] for entry in data["actions"].values()) or 1.0
+        lines = [f"{'Action':<28} {'appels':>9} {'total ms':>10} {'moy. µs':>9} {'octets':>11} {'%':>6}"]
+        for name, entry in data["actions"].items():
+            calls, seconds = entry["calls"], entry["seconds"]
+            lines.append(f"{name:<28} {calls:>9} {seconds * 1000:>10.2f} {seconds / calls * 1e6:>9.1f} "
+                         f"{entry['bytes']:>11} {seconds / total * 100:>5.1f}%")
+        mapper = data["mapper"]
+        lines.append("")
+        lines.append(f"LibraryMapper.get_lean_name : {mapper['hits']} trouvés, {mapper['misses']} absents")
+        if mapper["top_misses"]:
+            lines.append("  absents les plus fréquents : " +
+                         ", ".join(f"{name} ({count})" for name, count in mapper["top_misses"].items()))
+        lines.append(f"LibraryMapper.map_type : {mapper['type_cache_hits']} servis par le cache, "
+                     f"{mapper['type_cache_misses']} calculés")
+        return "\n".join(lines)
@@ -0,0 +1,543 @@
+import base64
+import importlib
+import io
+import json
+import marshal
+import sys
+from array import array
+from functools import lru_cache
+from itertools import compress, islice, repeat
+from operator import attrgetter, is_
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from .core.tracked import TrackedDict, TrackedList
+
+# Format d'échange des buffers d'actions (ex: entre processus), versionné.
+#
+# Binaire : en-tête MAGIC + octet de version, puis des trames (longueur en varint +
+# contenu marshal). Une trame regroupe jusqu'à FRAME_SIZE actions, rangées en
+# colonnes : les actions de même forme (classe et noms des champs) forment un groupe,
+# chaque champ du groupe une colonne, et la suite des indices de forme redonne l'ordre.
+#   - Les chaînes sont remplacées par leur indice dans la table du flux : une chaîne
+#     n'est écrite qu'une fois, dans la trame où elle apparaît la première fois
+#     (de même pour les formes). Une colonne de chaînes est un tableau d'indices.
+#   - Dans les autres colonnes, et dans les valeurs imbriquées : un objet (Action ou
+#     MathObject) est un tuple (indice de forme, valeurs...) ; None, booléens,
+#     flottants, octets, listes et dicts restent tels quels ; entiers, tuples,
+#     bytearray et chaînes hors table sont des tuples (marqueur négatif, ...).
+# En Python, il ne reste qu'à aplatir les colonnes : la lecture des indices et la
+# sérialisation (marshal, array) sont faites en C.
+#
+# JSONL : une ligne d'en-tête {"format": ..., "version": ...}, puis un objet JSON
+# par action : {"@": "module:Classe", champ: valeur, ...}. Plus gros, mais lisible
+# et éditable. Les tuples, dicts non textuels et octets ont une forme balisée.
+#
+# Seules les sous-classes d'Action et de MathObject sont reconstruites : un flux ne
+# peut pas faire exécuter de code arbitraire (contrairement à pickle).
+
+MAGIC = b"LBIR"
+VERSION = 1
+JSONL_FORMAT = "leanbridge-actions"
+
+# Nombre d'actions par trame (comme LeanBridgeInterpreter.STREAM_BATCH)
+FRAME_SIZE = 1024
+# Au-delà, les nouvelles chaînes sont écrites en clair (mémoire bornée des deux côtés)
+MAX_STRINGS = 1 << 20
+# Garde-fou contre une longueur de trame corrompue
+MAX_FRAME_BYTES = 1 << 31
+_MARSHAL_VERSION = 4
+
+# Marqueurs des valeurs qui ne sont pas représentées telles quelles
+_TUPLE, _INT, _BYTEARRAY, _STR = -1, -2, -3, -4
+# Sortes de colonnes : indices de chaînes, valeurs natives de marshal, valeurs aplaties,
+# listes (longueurs + colonne des éléments)
+_STRINGS, _RAW, _VALUES, _LISTS = 0, 1, 2, 3
+_NATIVE = frozenset((type(None), bool, float, bytes))
+_LIST_KINDS = frozenset((list, TrackedList)) # Les listes suivies (core/tracked.py) sont écrites comme des listes
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+def _resolve_class(name: str) -> type:
+    """
+    Classe désignée par 'module:Classe', refusée si ce n'est ni une Action ni un MathObject.
+    Seuls les modules de leanbridge sont importés à la demande ; ceux des classes
+    utilisateur doivent déjà être chargés.
+    """
+    from .actions.commands import Action
+    from .core.objects import MathObject
+    module_name, _, qualname = name.partition(":")
+    try:
+        obj: Any = sys.modules.get(module_name)
+        if obj is None:
+            if module_name.partition(".")[0] != __name__.partition(".")[0]:
+                raise ImportError(module_name)
+            obj = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            obj = getattr(obj, part)
+    except (ImportError, AttributeError) as exc:
+        raise ValueError(f"Classe inconnue dans le flux : {name!r}") from exc
+    if not (isinstance(obj, type) and issubclass(obj, (Action, MathObject))):
+        raise ValueError(f"Classe non autorisée dans le flux : {name!r}")
+    return obj
+
+@lru_cache(maxsize=None)
+def _slot_names(cls: type) -> Tuple[str, ...]:
+    names: List[str] = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(slot for slot in slots if slot not in ("__dict__", "__weakref__") and slot not in names)
+    return tuple(names)
+
+def _is_frozen(cls: type) -> bool:
+    from .core.interned import FrozenMathObject
+    return issubclass(cls, FrozenMathObject)
+
+_state = attrgetter("__dict__")
+
+def _shape_key(obj: Any) -> Any:
+    """Clé de forme : la classe, et les attributs d'instance s'il y en a."""
+    state = getattr(obj, "__dict__", None)
+    return type(obj) if state is None else (type(obj), tuple(state))
+
+def _object_fields(obj: Any) -> Tuple[str, ...]:
+    """Champs à écrire pour un objet ; '_rev' et '_watched' (voir core/tracked.py) ne sont pas écrits."""
+    cls = type(obj)
+    state = getattr(obj, "__dict__", None)
+    if state is None:
+        if not _is_frozen(cls):
+            raise TypeError(f"Objet non sérialisable : {cls.__name__}")
+        return cls._fields
+    slots = tuple(name for name in _slot_names(cls) if hasattr(obj, name))
+    return slots + tuple(key for key in state if key != "_rev" and key != "_watched")
+
+def _check_class(cls: type):
+    from .actions.commands import Action
+    from .core.objects import MathObject
+    if not issubclass(cls, (Action, MathObject)):
+        raise TypeError(f"Valeur non sérialisable : {cls.__name__}")
+
+def _getter(fields: Tuple[str, ...]) -> Callable[[Any], Tuple]:
+    if not fields:
+        return lambda obj: ()
+    if len(fields) == 1:
+        get = attrgetter(fields[0])
+        return lambda obj: (get(obj),)
+    return attrgetter(*fields)
+
+def _builder(cls: type, fields: Tuple[str, ...]) -> Callable[[Iterable[Tuple]], List[Any]]:
+    """
+    Fonction qui reconstruit des objets depuis les valeurs de leurs champs (une ligne
+    par objet), sans passer par __init__.
+    """
+    if _is_frozen(cls):
+        if tuple(fields) != cls._fields:
+            raise ValueError(f"Champs incompatibles pour {cls.__name__} : {fields}")
+        return lambda rows: [cls(*row) for row in rows] # Repasse par la table d'internement
+    slots = set(_slot_names(cls))
+    slot_fields = [(i, name) for i, name in enumerate(fields) if name in slots]
+    dict_fields = [(i, name) for i, name in enumerate(fields) if name not in slots]
+    new = cls.__new__
+    if not slot_fields:
+        names = tuple(fields)
+        def build(rows: Iterable[Tuple]) -> List[Any]:
+            objects = []
+            append = objects.append
+            for row in rows:
+                obj = new(cls)
+                obj.__dict__.update(zip(names, row)) # Sans Action.__setattr__ : révision 0
+                append(obj)
+            return objects
+        return build
+    set_slot = object.__setattr__
+    def build(rows: Iterable[Tuple]) -> List[Any]:
+        objects = []
+        for row in rows:
+            obj = new(cls)
+            for i, name in slot_fields:
+                set_slot(obj, name, row[i])
+            state = obj.__dict__
+            for i, name in dict_fields:
+                state[name] = row[i]
+            objects.append(obj)
+        return objects
+    return build
+
+def _varint(out: bytearray, n: int):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _index_array(indices: List[int]) -> "array":
+    return array("H" if max(indices, default=0) < 1 << 16 else "I", indices)
+
+class _Encoder:
+    """Aplatit les actions par trames ; la table des chaînes et les formes valent pour tout le flux."""
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.shapes: Dict[Any, Tuple[int, Callable[[Any], Tuple]]] = {}
+        self.new_strings: List[str] = []
+        self.new_shapes: List[Tuple[str, Tuple[str, ...]]] = []
+
+    def frame(self, actions: List[Any]) -> bytes:
+        """Contenu d'une trame ; les chaînes et formes qu'elle introduit sont remises à zéro."""
+        try:
+            keys = list(zip(map(type, actions), map(tuple, map(_state, actions))))
+        except AttributeError: # Objet sans __dict__ (MathObject immuable)
+            keys = list(map(_shape_key, actions))
+        shapes = self.shapes
+        order = [shape[0] if shape is not None else None for shape in map(shapes.get, keys)]
+        if None in order:
+            for i, index in enumerate(order):
+                if index is None:
+                    shape = shapes.get(keys[i]) or self._new_shape(actions[i])
+                    order[i] = shape[0]
+
+        getters = {index: getter for index, getter in shapes.values()}
+        column = self.column
+        groups = []
+        for index in dict.fromkeys(order):
+            objects = list(compress(actions, map(index.__eq__, order)))
+            columns = zip(*map(getters[index], objects))
+            groups.append((index, len(objects), [column(values) for values in columns]))
+        order_array = _index_array(order)
+        data = marshal.dumps((tuple(self.new_strings), tuple(self.new_shapes), order_array.typecode,
+                              order_array.tobytes(), groups), _MARSHAL_VERSION)
+        self.new_strings = []
+        self.new_shapes = []
+        return data
+
+    def column(self, values: Sequence[Any]) -> Tuple:
+        kinds = set(map(type, values))
+        if kinds == {str}:
+            strings = self.strings
+            indices = list(map(strings.get, values))
+            if None in indices:
+                missing = dict.fromkeys(compress(values, map(is_, indices, repeat(None))))
+                if len(strings) + len(missing) > MAX_STRINGS:
+                    return (_RAW, tuple(values)) # Table pleine : chaînes en clair
+                strings.update(zip(missing, range(len(strings), len(strings) + len(missing))))
+                self.new_strings.extend(missing)
+                indices = list(map(strings.__getitem__, values))
+            indices_array = _index_array(indices)
+            return (_STRINGS, indices_array.typecode, indices_array.tobytes())
+        if kinds <= _NATIVE:
+            return (_RAW, tuple(values))
+        if kinds <= _LIST_KINDS: # Non vide : déjà traité par _NATIVE
+            # Listes mises bout à bout (colonne des éléments) + longueurs
+            lengths = _index_array(list(map(len, values)))
+            return (_LISTS, lengths.typecode, lengths.tobytes(),
+                    self.column([item for items in values for item in items]))
+        strings = self.strings
+        value = self.value
+        return (_VALUES, [strings[item] if type(item) is str and item in strings else value(item)
+                          for item in values])
+
+    def value(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is str:
+            index = self.strings.get(value)
+            if index is None:
+                if len(self.strings) >= MAX_STRINGS:
+                    return (_STR, value)
+                index = self.strings[value] = len(self.strings)
+                self.new_strings.append(value)
+            return index
+        if kind in _NATIVE:
+            return value
+        if kind is list or kind is TrackedList:
+            strings = self.strings
+            # Cas courant : liste de chaînes déjà connues
+            return [strings[item] if type(item) is str and item in strings else self.value(item) for item in value]
+        if kind is int:
+            return (_INT, value)
+        if kind is dict or kind is TrackedDict:
+            return {self.value(key): self.value(item) for key, item in value.items()}
+        if kind is tuple:
+            return (_TUPLE, *map(self.value, value))
+        if kind is bytearray:
+            return (_BYTEARRAY, bytes(value))
+        shape = self.shapes.get(_shape_key(value))
+        if shape is None:
+            shape = self._new_shape(value)
+        return (shape[0], *map(self.value, shape[1](value)))
+
+    def _new_shape(self, obj: Any) -> Tuple[int, Callable[[Any], Tuple]]:
+        cls = type(obj)
+        _check_class(cls)
+        fields = _object_fields(obj)
+        shape = self.shapes[_shape_key(obj)] = (len(self.shapes), _getter(fields))
+        self.new_shapes.append((_class_name(cls), fields))
+        return shape
+
+class _Decoder:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.shapes: List[Tuple[Callable[[Iterable[Tuple]], List[Any]], int]] = []
+        self.classes: Dict[str, type] = {}
+
+    def frame(self, data: bytes) -> List[Any]:
+        try:
+            new_strings, new_shapes, typecode, order, groups = marshal.loads(data)
+            order = array(typecode, order)
+        except (EOFError, ValueError, TypeError, MemoryError) as exc: # MemoryError : taille corrompue
+            raise ValueError(f"Trame corrompue dans le flux d'actions : {exc}") from None
+        self.strings.extend(new_strings)
+        for name, fields in new_shapes:
+            if type(name) is not str or not all(type(field) is str for field in fields):
+                raise ValueError("Forme invalide dans le flux d'actions")
+            cls = self.classes.get(name)
+            if cls is None:
+                cls = self.classes[name] = _resolve_class(name)
+            self.shapes.append((_builder(cls, tuple(fields)), len(fields)))
+
+        column = self.column
+        objects = {}
+        try:
+            for index, count, columns in groups:
+                build, width = self.shapes[index]
+                if len(columns) != width or not 0 < count <= len(order):
+                    raise ValueError("Trame corrompue dans le flux d'actions (groupes)")
+                rows = zip(*map(column, columns)) if columns else [()] * count
+                objects[index] = iter(build(rows))
+            actions = list(map(next, map(objects.__getitem__, order)))
+        except (IndexError, KeyError, TypeError) as exc:
+            raise ValueError(f"Trame corrompue dans le flux d'actions : {exc!r}") from None
+        if len(actions) != len(order): # Un groupe plus court que prévu arrête map()
+            raise ValueError("Trame corrompue dans le flux d'actions (groupes)")
+        return actions
+
+    def column(self, encoded: Tuple) -> Any:
+        kind = encoded[0]
+        if kind == _STRINGS:
+            return map(self.strings.__getitem__, array(encoded[1], encoded[2]))
+        if kind == _RAW:
+            return encoded[1]
+        if kind == _LISTS:
+            items = iter(self.column(encoded[3]))
+            return [list(islice(items, length)) for length in array(encoded[1], encoded[2])]
+        strings = self.strings
+        value = self.value
+        return [strings[item] if type(item) is int else value(item) for item in encoded[1]]
+
+    def value(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is int:
+            return self.strings[value]
+        if kind is tuple:
+            tag = value[0]
+            if tag >= 0:
+                build, width = self.shapes[tag]
+                if len(value) != width + 1:
+                    raise ValueError("Objet corrompu dans le flux d'actions")
+                strings = self.strings
+                read = self.value
+                return build(([strings[item] if type(item) is int else read(item) for item in value[1:]],))[0]
+            if tag == _INT or tag == _STR:
+                return value[1]
+            if tag == _TUPLE:
+                return tuple(map(self.value, value[1:]))
+            if tag == _BYTEARRAY:
+                return bytearray(value[1])
+            raise ValueError(f"Marqueur inconnu dans le flux d'actions : {tag}")
+        if kind is list:
+            strings = self.strings
+            return [strings[item] if type(item) is int else self.value(item) for item in value]
+        if kind in _NATIVE:
+            return value
+        if kind is dict:
+            return {self.value(key): self.value(item) for key, item in value.items()}
+        raise ValueError(f"Valeur invalide dans le flux d'actions : {kind.__name__}")
+
+class _JsonDecoder:
+    def __init__(self):
+        self.builders: Dict[Tuple[str, Tuple[str, ...]], Callable[[Iterable[Tuple]], List[Any]]] = {}
+
+    def value(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is list:
+            return [self.value(item) for item in value]
+        if kind is not dict:
+            return value
+        name = value.get("@")
+        if name is not None:
+            fields = tuple(key for key in value if key != "@")
+            build = self.builders.get((name, fields))
+            if build is None:
+                build = self.builders[name, fields] = _builder(_resolve_class(name), fields)
+            return build(([self.value(value[key]) for key in fields],))[0]
+        if "@t" in value:
+            return tuple(self.value(item) for item in value["@t"])
+        if "@d" in value:
+            return {self.value(key): self.value(item) for key, item in value["@d"]}
+        if "@b" in value:
+            return base64.b64decode(value["@b"])
+        if "@ba" in value:
+            return bytearray(base64.b64decode(value["@ba"]))
+        return {key: self.value(item) for key, item in value.items()}
+
+class ActionWriter:
+    """
+    Écrit des actions dans un flux ouvert en binaire ('binary') ou en texte ('jsonl').
+    En binaire, les actions sont écrites par trames de FRAME_SIZE : appeler flush()
+    (ou utiliser un bloc with) pour écrire la dernière trame.
+    """
+    def __init__(self, fp: IO, format: str = "binary"):
+        if format not in ("binary", "jsonl"):
+            raise ValueError(f"Format inconnu : {format!r} (attendu 'binary' ou 'jsonl')")
+        self.fp = fp
+        self.format = format
+        self.count = 0
+        if format == "binary":
+            self._encoder = _Encoder()
+            self._pending: List[Any] = []
+            fp.write(MAGIC + bytes((VERSION,)))
+        else:
+            self._shapes: Dict[Any, Tuple[str, Tuple[str, ...], Callable[[Any], Tuple]]] = {}
+            fp.write(json.dumps({"format": JSONL_FORMAT, "version": VERSION}) + "\n")
+
+    def __enter__(self) -> "ActionWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def write(self, action: Any):
+        if self.format == "jsonl":
+            self.fp.write(json.dumps(self._to_json(action), ensure_ascii=False) + "\n")
+        else:
+            self._pending.append(action)
+            if len(self._pending) >= FRAME_SIZE:
+                self._write_frame()
+        self.count += 1
+
+    def write_many(self, actions: Iterable[Any]) -> int:
+        """Écrit toutes les actions ; retourne leur nombre."""
+        start = self.count
+        if self.format == "jsonl":
+            for action in actions:
+                self.write(action)
+            return self.count - start
+        iterator = iter(actions)
+        while True:
+            pending = self._pending
+            before = len(pending)
+            pending.extend(islice(iterator, FRAME_SIZE - before))
+            self.count += len(pending) - before
+            if len(pending) < FRAME_SIZE:
+                break
+            self._write_frame()
+        return self.count - start
+
+    def _write_frame(self):
+        data = self._encoder.frame(self._pending)
+        self._pending = []
+        header = bytearray()
+        _varint(header, len(data))
+        self.fp.write(bytes(header) + data)
+
+    def _to_json(self, value: Any) -> Any:
+        kind = type(value)
+        if kind is str or kind is int or kind is float or kind is bool or value is None:
+            return value
+        if kind is list or kind is TrackedList:
+            return [self._to_json(item) for item in value]
+        if kind is tuple:
+            return {"@t": [self._to_json(item) for item in value]}
+        if kind is dict or kind is TrackedDict:
+            if all(type(key) is str and not key.startswith("@") for key in value):
+                return {key: self._to_json(item) for key, item in value.items()}
+            return {"@d": [[self._to_json(key), self._to_json(item)] for key, item in value.items()]}
+        if kind is bytes or kind is bytearray:
+            return {"@b" if kind is bytes else "@ba": base64.b64encode(value).decode("ascii")}
+        key = _shape_key(value)
+        shape = self._shapes.get(key)
+        if shape is None:
+            _check_class(kind)
+            fields = _object_fields(value)
+            shape = self._shapes[key] = (_class_name(kind), fields, _getter(fields))
+        encoded = {"@": shape[0]}
+        for name, item in zip(shape[1], shape[2](value)):
+            encoded[name] = self._to_json(item)
+        return encoded
+
+    def flush(self):
+        if self.format == "binary" and self._pending:
+            self._write_frame()
+        flush = getattr(self.fp, "flush", None)
+        if flush:
+            flush()
+
+class ActionReader:
+    """
+    Itère sur les actions d'un flux écrit par ActionWriter, sans le charger en entier :
+    le flux binaire est lu trame par trame, le JSONL ligne par ligne.
+    Le format est détecté d'après le début du flux (octets ou texte).
+    """
+    def __init__(self, fp: IO):
+        self.fp = fp
+
+    def __iter__(self) -> Iterator[Any]:
+        head = self.fp.read(len(MAGIC) + 1)
+        if isinstance(head, str):
+            return self._read_jsonl(head)
+        if head[:len(MAGIC)] != MAGIC:
+            raise ValueError("Flux d'actions invalide (en-tête absent)")
+        _check_version(head[len(MAGIC)] if len(head) > len(MAGIC) else None)
+        return self._read_binary()
+
+    def _read_jsonl(self, head: str) -> Iterator[Any]:
+        header = json.loads(head + self.fp.readline())
+        if not isinstance(header, dict) or header.get("format") != JSONL_FORMAT:
+            raise ValueError("Flux d'actions invalide (en-tête JSONL absent)")
+        _check_version(header.get("version"))
+        decoder = _JsonDecoder()
+        for line in self.fp:
+            if line.strip():
+                yield decoder.value(json.loads(line))
+
+    def _read_binary(self) -> Iterator[Any]:
+        decoder = _Decoder()
+        read = self.fp.read
+        while True:
+            size, shift = 0, 0
+            while True:
+                byte = read(1)
+                if not byte:
+                    if shift:
+                        raise ValueError("Flux d'actions tronqué")
+                    return
+                size |= (byte[0] & 0x7F) << shift
+                if byte[0] < 0x80:
+                    break
+                shift += 7
+            if size > MAX_FRAME_BYTES:
+                raise ValueError(f"Trame trop grande dans le flux d'actions : {size} octets")
+            data = read(size)
+            if len(data) != size:
+                raise ValueError("Flux d'actions tronqué")
+            yield from decoder.frame(data)
+
+def _check_version(version: Any):
+    if version != VERSION:
+        raise ValueError(f"Version de flux non supportée : {version!r} (attendu {VERSION})")
+
+def dump_actions(actions: Iterable[Any], fp: IO, format: str = "binary") -> int:
+    """Écrit des actions dans 'fp' (binaire ou texte selon 'format'). Retourne leur nombre."""
+    with ActionWriter(fp, format) as writer:
+        return writer.write_many(actions)
+
+def load_actions(fp: IO) -> Iterator[Any]:
+    """Itère sur les actions de 'fp', au fil de la lecture (utilisable par process_stream)."""
+    return iter(ActionReader(fp))
+
+def dumps_actions(actions: Iterable[Any]) -> bytes:
+    """Encodage binaire d'une suite d'actions."""
+    buffer = io.BytesIO()
+    dump_actions(actions, buffer)
+    return buffer.getvalue()
+
+def loads_actions(data: bytes) -> List[Any]:
+    return list(load_actions(io.BytesIO(data)))
@@ -0,0 +1,481 @@
+import asyncio
+import codecs
+import io
+import json
+import os
+import queue
+import socket
+import stat
+import struct
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+# Démon de rendu : un processus de longue durée qui garde des interpréteurs chauds
+# (mapper chargé, caches remplis, gabarits compilés) et rend les lots d'actions que
+# lui envoient ses clients, sur une socket Unix ou un port local.
+#
+# Protocole : des trames [sorte (1 octet), numéro de requête (4), longueur (4)] + contenu.
+#   client -> serveur : RENDER (actions encodées par serialization.dumps_actions), STATS
+#   serveur -> client : CHUNK* puis DONE (JSON des mesures), ou ERROR (message) ;
+#                       STATS (JSON des statistiques du serveur)
+# Un client peut envoyer plusieurs requêtes sans attendre les réponses (pipelining).
+# Les réponses arrivent dans l'ordre de fin du rendu ; les trames d'une même réponse
+# sont contiguës. Le serveur ne lit plus de requêtes quand 'max_pending' rendus sont
+# en cours (toutes connexions confondues) : le client est freiné par la socket. Une
+# place est libérée dès la fin du rendu, avant l'envoi de la réponse.
+
+RENDER, STATS, CHUNK, DONE, ERROR = 1, 2, 3, 4, 5
+_HEADER = struct.Struct(">BII")
+# Taille des trames CHUNK (la sortie est renvoyée par morceaux)
+CHUNK_SIZE = 1 << 16
+# Garde-fou contre une longueur de trame corrompue
+MAX_FRAME_BYTES = 1 << 30
+DEFAULT_ADDRESS = "127.0.0.1:7878"
+
+class ServerError(RuntimeError):
+    """Erreur rapportée par le serveur (requête invalide, échec du rendu)."""
+
+class RequestTiming(NamedTuple):
+    """Mesures d'une requête, en secondes (renvoyées avec la réponse)."""
+    queued: float # Attente d'une place puis d'un worker (transferts compris)
+    render: float # Chargement et rendu dans le worker
+    total: float # De la réception de la requête à l'envoi de la réponse
+    actions: int
+    size: int # Taille de la sortie (caractères)
+    worker: int # pid du worker
+
+class RenderResult(NamedTuple):
+    text: str
+    timing: RequestTiming
+
+def parse_address(address: Union[str, int]) -> Tuple[str, Any]:
+    """
+    'unix:/run/lb.sock' ou un chemin -> ("unix", chemin) ;
+    'hôte:port', ':port' ou un numéro de port -> ("tcp", (hôte, port)).
+    """
+    if isinstance(address, int):
+        return "tcp", ("127.0.0.1", address)
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+    if os.sep in address:
+        return "unix", address
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Adresse invalide : {address!r} (attendu 'hôte:port' ou 'unix:chemin')")
+    return "tcp", (host.strip("[]") or "127.0.0.1", int(port))
+
+# --- Côté worker -----------------------------------------------------------------
+
+_local = threading.local() # Interpréteur chaud du worker (processus ou thread)
+
+def _init_worker(config_path: str):
+    from .interpreter import LeanBridgeInterpreter
+    bridge = LeanBridgeInterpreter(config_path)
+    base = bridge.snapshot()
+    _warm_up(bridge)
+    bridge.rollback(base)
+    _local.state = (bridge, base)
+
+def _warm_up(bridge):
+    """Rend une action de chaque sorte courante : gabarits compilés et caches remplis d'avance."""
+    from .actions.commands import ActionClaim, ActionDefine
+    with bridge.Namespace("Warm"):
+        bridge.define_structure("Point", {"x": "Int", "y": "Real"})
+        bridge.define_inductive("Color", ["red", "green"])
+        bridge.add_action(ActionDefine("f", "n * n", args=["(n : Nat)"], type_hint="Nat"))
+        bridge.add_action(ActionClaim("f_nonneg", "∀ n, f n ≥ 0"))
+        bridge.define_many([("g", "0")])
+    bridge.process()
+
+def _render_request(data: bytes) -> Tuple[str, int, float, int]:
+    """Rend un lot encodé à partir de l'état initial du worker : (texte, actions, durée, pid)."""
+    bridge, base = _local.state
+    start = perf_counter()
+    bridge.rollback(base)
+    count = bridge.load_buffer(io.BytesIO(data))
+    text = bridge.process()
+    bridge.rollback(base)
+    bridge.clear_render_cache() # Libère les actions du lot (un lot n'est jamais rendu deux fois)
+    return text, count, perf_counter() - start, os.getpid()
+
+# --- Serveur -----------------------------------------------------------------------
+
+class RenderServer:
+    """
+    Serveur de rendu asyncio. Les lots sont rendus par un pool de 'workers'
+    ('process' ou 'thread'), chacun avec son interpréteur chaud ; un lot est rendu
+    comme par LeanBridgeInterpreter.process() sur un interpréteur neuf.
+
+        server = RenderServer("unix:/tmp/leanbridge.sock", workers=4)
+        server.run()                # bloquant (voir aussi run_in_thread())
+    """
+    def __init__(self, address: Union[str, int] = DEFAULT_ADDRESS, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, config_path: str = "leanbridge/config.yaml",
+                 executor: str = "process"):
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Exécuteur inconnu : {executor!r} (attendu 'process' ou 'thread')")
+        self.family, self.address = parse_address(address)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 4 * self.workers
+        self.config_path = config_path
+        self.executor = executor
+        self._pool: Optional[Executor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._started = perf_counter()
+        self._stats = {
+            "connections": 0, "requests": 0, "errors": 0, "actions": 0, "bytes_in": 0, "chars_out": 0,
+            "in_flight": 0, "max_in_flight": 0, "queued_s": 0.0, "render_s": 0.0,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques cumulées depuis le démarrage."""
+        stats = dict(self._stats)
+        stats.update(workers=self.workers, max_pending=self.max_pending,
+                     uptime_s=round(perf_counter() - self._started, 3))
+        for key in ("queued_s", "render_s"):
+            stats[key] = round(stats[key], 6)
+        return stats
+
+    async def start(self):
+        """Démarre le pool (workers initialisés d'avance) puis écoute l'adresse."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        if self.executor == "process":
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config_path,))
+        else:
+            self._pool = ThreadPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.config_path,))
+        # Un lot vide par worker : les interpréteurs sont chauds avant la première requête
+        from .serialization import dumps_actions
+        empty = dumps_actions([])
+        await asyncio.gather(*(self._loop.run_in_executor(self._pool, _render_request, empty)
+                               for _ in range(self.workers)))
+
+        if self.family == "unix":
+            path = self.address
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path) # Socket laissée par un serveur arrêté
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            host, port = self.address
+            self._server = await asyncio.start_server(self._handle, host, port)
+            if not port:
+                self.address = (host, self._server.sockets[0].getsockname()[1])
+
+    @property
+    def bound_address(self) -> str:
+        """Adresse d'écoute, au format accepté par RenderClient."""
+        if self.family == "unix":
+            return f"unix:{self.address}"
+        return "%s:%d" % self.address
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.close()
+
+    def stop(self):
+        """Arrête le serveur (appelable depuis n'importe quel thread)."""
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if self.family == "unix" and os.path.exists(self.address):
+                os.unlink(self.address)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def run(self, ready: Optional[Callable[["RenderServer"], Any]] = None):
+        """Sert jusqu'à stop(), Ctrl+C ou SIGTERM (bloquant). 'ready' est appelé une fois à l'écoute."""
+        async def main():
+            await self.start()
+            if ready is not None:
+                ready(self)
+            try:
+                import signal
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    self._loop.add_signal_handler(sig, self._stopped.set)
+            except (ImportError, NotImplementedError, RuntimeError):
+                pass # Windows, ou hors du thread principal
+            await self.serve_forever()
+        asyncio.run(main())
+
+    def run_in_thread(self, timeout: float = 60.0) -> threading.Thread:
+        """Lance le serveur dans un thread et attend qu'il écoute (tests, démos). Voir stop()."""
+        ready = threading.Event()
+        errors: List[BaseException] = []
+
+        async def main():
+            try:
+                await self.start()
+            except BaseException as exc:
+                errors.append(exc)
+                raise
+            finally:
+                ready.set()
+            await self.serve_forever()
+
+        thread = threading.Thread(target=asyncio.run, args=(main(),), name="leanbridge-server", daemon=True)
+        thread.start()
+        if not ready.wait(timeout):
+            raise TimeoutError(f"Le serveur n'a pas démarré en {timeout}s")
+        if errors:
+            raise errors[0]
+        return thread
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._stats["connections"] += 1
+        lock = asyncio.Lock() # Les trames d'une réponse restent contiguës
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(_HEADER.size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                kind, request_id, size = _HEADER.unpack(header)
+                if size > MAX_FRAME_BYTES:
+                    await self._send(writer, lock, [(ERROR, request_id, b"Trame trop grande")])
+                    break
+                try:
+                    payload = await reader.readexactly(size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                received = perf_counter()
+                if kind == STATS:
+                    data = json.dumps(self.stats()).encode("utf-8")
+                    await self._send(writer, lock, [(STATS, request_id, data)])
+                elif kind == RENDER:
+                    await self._slots.acquire() # Contre-pression : plus de lecture tant que c'est plein
+                    task = asyncio.ensure_future(self._render(writer, lock, request_id, payload, received))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                else:
+                    await self._send(writer, lock, [(ERROR, request_id, f"Trame inconnue : {kind}".encode("utf-8"))])
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def _render(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, request_id: int,
+                      payload: bytes, received: float):
+        stats = self._stats
+        stats["requests"] += 1
+        stats["bytes_in"] += len(payload)
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            text, count, render, pid = await self._loop.run_in_executor(self._pool, _render_request, payload)
+        except Exception as exc:
+            stats["errors"] += 1
+            frames = [(ERROR, request_id, f"{type(exc).__name__}: {exc}".encode("utf-8"))]
+        else:
+            data = text.encode("utf-8")
+            frames = [(CHUNK, request_id, data[i:i + CHUNK_SIZE]) for i in range(0, len(data), CHUNK_SIZE)]
+            elapsed = perf_counter() - received
+            timing = RequestTiming(elapsed - render, render, elapsed, count, len(text), pid)
+            frames.append((DONE, request_id, json.dumps(timing._asdict()).encode("utf-8")))
+            stats["actions"] += count
+            stats["chars_out"] += len(text)
+            stats["queued_s"] += timing.queued
+            stats["render_s"] += render
+        finally:
+            # La place est rendue dès la fin du rendu, pas après l'envoi : un client qui
+            # n'a pas fini d'envoyer ses requêtes ne lit pas encore les réponses, et le
+            # garder bloqué en lecture pendant que la réponse attend serait un interblocage
+            stats["in_flight"] -= 1
+            self._slots.release()
+        await self._send(writer, lock, frames)
+
+    async def _send(self, writer: asyncio.StreamWriter, lock: asyncio.Lock, frames: List[Tuple[int, int, bytes]]):
+        async with lock:
+            if writer.is_closing():
+                return
+            for kind, request_id, data in frames:
+                writer.write(_HEADER.pack(kind, request_id, len(data)))
+                writer.write(data)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+def _frame(kind: int, request_id: int, data: bytes) -> bytes:
+    return _HEADER.pack(kind, request_id, len(data)) + data
+
+def serve(address: Union[str, int] = DEFAULT_ADDRESS, workers: Optional[int] = None,
+          max_pending: Optional[int] = None, config_path: str = "leanbridge/config.yaml",
+          executor: str = "process"):
+    """Lance un serveur de rendu (bloquant). Voir RenderServer."""
+    RenderServer(address, workers, max_pending, config_path, executor).run()
+
+# --- Client ------------------------------------------------------------------------
+
+class RenderClient:
+    """
+    Client synchrone d'un RenderServer.
+
+        with RenderClient("unix:/tmp/leanbridge.sock") as client:
+            print(client.render(actions).text)
+            for result in client.render_many(batches, window=8):  # requêtes en pipeline
+                ...
+    """
+    def __init__(self, address: Union[str, int] = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        family, target = parse_address(address)
+        if family == "unix":
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET6 if ":" in target[0] else socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock.settimeout(timeout)
+        self._sock.connect(target)
+        self._reader = self._sock.makefile("rb")
+        self._send_lock = threading.Lock() # render_many envoie depuis un thread
+        self._next_id = 0
+        self._finished: Dict[int, Union[RenderResult, ServerError]] = {} # Réponses lues en avance
+
+    def __enter__(self) -> "RenderClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def _send(self, kind: int, data: bytes = b"") -> int:
+        with self._send_lock:
+            self._next_id = request_id = (self._next_id + 1) & 0xFFFFFFFF
+            self._sock.sendall(_frame(kind, request_id, data))
+        return request_id
+
+    def _read_frame(self) -> Tuple[int, int, bytes]:
+        header = self._reader.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ConnectionError("Connexion fermée par le serveur")
+        kind, request_id, size = _HEADER.unpack(header)
+        data = self._reader.read(size)
+        if len(data) < size:
+            raise ConnectionError("Connexion fermée par le serveur")
+        return kind, request_id, data
+
+    def _chunks(self, request_id: int) -> Iterator[bytes]:
+        """Morceaux de la réponse à 'request_id' au fil de leur arrivée ; lève ServerError si elle échoue."""
+        while True:
+            kind, frame_id, data = self._read_frame()
+            if frame_id != request_id:
+                self._finished[frame_id] = self._read_rest(kind, frame_id, data)
+                continue
+            if kind == CHUNK:
+                yield data
+            elif kind == DONE:
+                self._timing = RequestTiming(**json.loads(data))
+                return
+            else:
+                raise ServerError(data.decode("utf-8", "replace"))
+
+    def _read_rest(self, kind: int, request_id: int, data: bytes) -> Union[RenderResult, ServerError]:
+        """Lit la fin d'une réponse commencée par la trame (kind, data) : trames contiguës."""
+        parts = []
+        while kind == CHUNK:
+            parts.append(data)
+            kind, _, data = self._read_frame()
+        if kind == DONE:
+            return RenderResult(b"".join(parts).decode("utf-8"), RequestTiming(**json.loads(data)))
+        if kind == STATS:
+            return ServerError("Statistiques inattendues")
+        return ServerError(data.decode("utf-8", "replace"))
+
+    def _result(self, request_id: int) -> RenderResult:
+        result = self._finished.pop(request_id, None)
+        if result is None:
+            text = b"".join(self._chunks(request_id)).decode("utf-8")
+            return RenderResult(text, self._timing)
+        if isinstance(result, ServerError):
+            raise result
+        return result
+
+    @staticmethod
+    def _encode(actions: Iterable[Any]) -> bytes:
+        from .serialization import dumps_actions
+        return dumps_actions(actions)
+
+    def render(self, actions: Iterable[Any]) -> RenderResult:
+        """Rend un lot d'actions (texte identique à process() sur un interpréteur neuf)."""
+        return self._result(self._send(RENDER, self._encode(actions)))
+
+    def stream(self, actions: Iterable[Any]) -> Iterator[str]:
+        """Comme render(), mais produit la sortie par morceaux au fil de la réception."""
+        request_id = self._send(RENDER, self._encode(actions))
+        decoder = codecs.getincrementaldecoder("utf-8")() # Un caractère peut être coupé entre deux trames
+        for chunk in self._chunks(request_id):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+
+    def render_many(self, batches: Iterable[Iterable[Any]], window: int = 8) -> Iterator[RenderResult]:
+        """
+        Rend plusieurs lots en pipeline : jusqu'à 'window' requêtes sont envoyées
+        d'avance. Les résultats sont produits dans l'ordre des lots.
+
+        Les requêtes sont encodées et envoyées par un thread pendant que les réponses
+        sont lues ici : un envoi bloqué (serveur plein, socket saturée) n'empêche
+        jamais de lire les réponses qui le débloqueraient.
+        """
+        if window < 1:
+            raise ValueError("window doit être au moins 1")
+        sent: "queue.Queue[Optional[int]]" = queue.Queue()
+        slots = threading.Semaphore(window)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def send_all():
+            try:
+                for batch in batches:
+                    slots.acquire()
+                    if stop.is_set():
+                        return
+                    sent.put(self._send(RENDER, self._encode(batch)))
+            except BaseException as exc: # Relevée dans le thread de l'appelant
+                errors.append(exc)
+            finally:
+                sent.put(None)
+
+        sender = threading.Thread(target=send_all, name="leanbridge-render-many", daemon=True)
+        sender.start()
+        try:
+            while True:
+                request_id = sent.get()
+                if request_id is None:
+                    break
+                result = self._result(request_id)
+                slots.release()
+                yield result
+        finally:
+            stop.set()
+            slots.release() # Réveille l'envoyeur s'il attend une place
+            sender.join()
+        if errors:
+            raise errors[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques du serveur (voir RenderServer.stats)."""
+        request_id = self._send(STATS)
+        while True:
+            kind, frame_id, data = self._read_frame()
+            if frame_id == request_id and kind == STATS:
+                return json.loads(data)
+            self._finished[frame_id] = self._read_rest(kind, frame_id, data)
@@ -0,0 +1,202 @@
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from .actions.commands import Action, ActionClaim, ActionDeclare, ActionRaw, ActionSolve
+from .actions.scopes import ActionStartScope, ActionEndScope
+
+# Identifiants (éventuellement qualifiés) cités dans le code Lean rendu
+_IDENTIFIER = re.compile(r"[^\W\d][\w'.]*")
+# Commandes de code brut dont l'effet dure jusqu'à la fin du scope et n'est pas exporté
+# par 'import' : elles sont rejouées quand un module rouvre le scope. Les attributs et
+# notations globaux sont exportés, seules leurs variantes locales sont rejouées.
+_SCOPE_COMMAND = re.compile(
+    r"(?:open|set_option|universe|variable|include|omit|attribute[ \t]*\[[ \t]*local\b"
+    r"|local[ \t]+(?:notation|infixl?|infixr|prefix|postfix|macro|macro_rules|syntax|instance|attribute))\b"
+)
+
+class Shard(NamedTuple):
+    """Module Lean produit par le découpage."""
+    module: str # ex: "Generated.Part0001"
+    text: str
+    declarations: int
+    imports: List[str] # Modules du découpage importés par celui-ci
+
+class _Part:
+    __slots__ = ("lines", "declarations")
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self.declarations = 0
+
+def _is_import(action: Action) -> bool:
+    """ActionRaw ne contenant que des lignes 'import ...' (remontées en tête de chaque module)."""
+    if type(action) is not ActionRaw:
+        return False
+    lines = [line.strip() for line in str(action.content).splitlines() if line.strip()]
+    return bool(lines) and all(line.startswith("import ") for line in lines)
+
+def _scope_commands(content: str) -> List[str]:
+    """
+    Commandes de portée (voir _SCOPE_COMMAND) d'un code brut, avec leurs lignes de
+    continuation indentées. 'open X in', 'set_option ... in' ne portent que sur la
+    commande suivante et sont ignorées.
+    """
+    commands: List[List[str]] = []
+    current: Optional[List[str]] = None
+    for line in content.splitlines():
+        if current is not None and line[:1] in (" ", "\t") and line.strip():
+            current.append(line)
+            continue
+        current = None
+        if _SCOPE_COMMAND.match(line) and "in" not in line.split("--", 1)[0].split():
+            current = [line]
+            commands.append(current)
+    return ["\n".join(command) for command in commands]
+
+def _is_global(content: str) -> bool:
+    """
+    Code brut dont l'effet est exporté par 'import' (notation, instance, attribut,
+    déclaration...) : tout ce qui n'est ni commentaire ni commande de portée.
+    """
+    scoped = set(_scope_commands(content))
+    in_comment = False
+    in_command = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        if in_comment:
+            in_comment = "-/" not in stripped
+            continue
+        if not stripped or stripped.startswith("--"):
+            continue
+        if stripped.startswith("/-"):
+            in_comment = "-/" not in stripped[2:]
+            continue
+        if in_command and line[:1] in (" ", "\t"):
+            continue # Continuation d'une commande de portée
+        in_command = any(command.split("\n", 1)[0] == line for command in scoped)
+        if not in_command:
+            return True
+    return False
+
+def _suffixes(qualified: str) -> Iterable[str]:
+    """'A.B.f' -> 'A.B.f', 'B.f', 'f'."""
+    parts = qualified.split(".")
+    for i in range(len(parts)):
+        yield ".".join(parts[i:])
+
+def split_modules(actions: List[Action], fragments: List[str], header_imports: List[str],
+                  max_decls: int, module_name: str = "Generated") -> List[Shard]:
+    """
+    Découpe une suite d'actions (et leurs fragments rendus) en modules Lean
+    d'au plus 'max_decls' déclarations environ.
+
+    Un module ne commence jamais par un ActionSolve (l'énoncé resterait sans preuve)
+    ni par une fin de scope. Chaque module rouvre les namespaces/sections ouverts à
+    son début, rejoue leurs commandes de portée ('variable', et dans le code brut
+    'open', 'set_option', 'universe', notations et attributs locaux...), puis les referme. Les imports entre modules
+    sont déduits des noms déclarés (Action.declared_names) cités dans le code ; un
+    module contenant du code brut global (notation, instance, attribut...) est en
+    plus importé par le module suivant, et ainsi de proche en proche par tous.
+    Les blocs en colonnes (ActionTable...) ne sont pas coupés.
+    """
+    if max_decls < 1:
+        raise ValueError("max_decls doit être au moins 1")
+
+    scopes: List[Tuple[ActionStartScope, str, List[str]]] = [] # (action, fragment, commandes du scope)
+    top_commands: List[str] = [] # Commandes de portée hors de tout scope
+    extra_imports: Dict[str, None] = {} # Imports bruts, dans l'ordre
+    owners: Dict[str, Set[int]] = {} # nom (qualifié ou suffixe) -> modules qui le déclarent
+    global_parts: Set[int] = set() # Modules contenant du code brut global
+    parts: List[_Part] = []
+
+    def open_part() -> _Part:
+        lines = list(top_commands)
+        for _, fragment, commands in scopes:
+            lines.append(fragment)
+            lines.extend(commands)
+        return _Part(lines)
+
+    def close_part(part: _Part):
+        for start, _, _ in reversed(scopes):
+            part.lines.append(ActionEndScope(start.kind, start.name).to_lean(None, None))
+
+    part: Optional[_Part] = None
+    previous: Optional[Action] = None
+    for action, fragment in zip(actions, fragments):
+        kind = type(action)
+        if part is None:
+            part = open_part()
+            parts.append(part)
+        elif (part.declarations >= max_decls and kind is not ActionSolve and kind is not ActionEndScope
+              and type(previous) is not ActionStartScope and type(previous) is not ActionClaim):
+            close_part(part)
+            part = open_part()
+            parts.append(part)
+        previous = action
+
+        if kind is ActionStartScope:
+            scopes.append((action, fragment, []))
+        elif kind is ActionEndScope:
+            if scopes:
+                scopes.pop()
+        elif kind is ActionDeclare:
+            (scopes[-1][2] if scopes else top_commands).append(fragment)
+        elif _is_import(action):
+            for line in str(action.content).splitlines():
+                if line.strip():
+                    extra_imports[line.strip()] = None
+            continue
+        elif kind is ActionRaw:
+            (scopes[-1][2] if scopes else top_commands).extend(_scope_commands(fragment))
+            if _is_global(fragment):
+                global_parts.add(len(parts) - 1)
+
+        names = action.declared_names()
+        if names:
+            prefix = "".join(f"{start.name}." for start, _, _ in scopes if start.kind == "namespace" and start.name)
+            index = len(parts) - 1
+            for name in names:
+                for suffix in _suffixes(prefix + name):
+                    owners.setdefault(suffix, set()).add(index)
+            part.declarations += len(names)
+        part.lines.append(fragment)
+    if part is not None:
+        close_part(part)
+
+    width = max(4, len(str(len(parts))))
+    modules = [f"{module_name}.Part{i + 1:0{width}d}" for i in range(len(parts))]
+    shards = []
+    last_global = -1 # Dernier module à code brut global avant 'index'
+    for index, part in enumerate(parts):
+        body = "\n".join(part.lines)
+        deps: Set[int] = {last_global} if last_global >= 0 else set()
+        if index in global_parts:
+            last_global = index
+        for identifier in set(_IDENTIFIER.findall(body)):
+            identifier = identifier.rstrip(".")
+            while identifier:
+                for owner in owners.get(identifier, ()):
+                    if owner < index:
+                        deps.add(owner)
+                identifier = identifier.rpartition(".")[0]
+        imports = [modules[i] for i in sorted(deps)]
+        header = [*header_imports, *extra_imports, *(f"import {module}" for module in imports)]
+        shards.append(Shard(modules[index], "\n".join([*header, "", body]) + "\n", part.declarations, imports))
+    return shards
+
+def root_module(shards: List[Shard]) -> str:
+    """Module racine important tous les modules du découpage."""
+    return "".join(f"import {shard.module}\n" for shard in shards)
+
+def module_path(module: str) -> str:
+    """'Generated.Part0001' -> 'Generated/Part0001.lean' (chemin relatif au dossier de sortie)."""
+    return "/".join(module.split(".")) + ".lean"
+
+def write_modules(writer, module_name: str, shards: List[Shard]):
+    """
+    Écrit les modules et le module racine via un OutputWriter : seuls les modules
+    modifiés sont réécrits ; ceux d'un découpage précédent devenus inutiles sont
+    supprimés par writer.finish().
+    """
+    for shard in shards:
+        writer.write(module_path(shard.module), shard.text)
+    writer.write(module_path(module_name), root_module(shards))
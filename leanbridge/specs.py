@@ -0,0 +1,308 @@
+import json
+import os
+import re
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from time import perf_counter
+from typing import IO, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# Génération de modules Lean à partir de fichiers de spécifications (JSONL ou YAML) :
+# un enregistrement par déclaration, lu en flux. Un enregistrement 'module' commence
+# un fichier de sortie ; chaque module est rendu par un interpréteur (dans un pool de
+# processus avec jobs > 1) et écrit de façon atomique.
+#
+#   {"kind": "module", "name": "Geometrie.Basic", "imports": ["Mathlib.Data.Real.Basic"]}
+#   {"kind": "namespace", "name": "Geometrie"}        (aussi "section" ; "end" ferme le dernier)
+#   {"kind": "structure", "name": "Point", "fields": {"x": "Int", "y": "Int"}}
+#   {"kind": "inductive", "name": "Forme", "constructors": ["cercle (r : Nat)", "carre"]}
+#   {"kind": "def", "name": "f", "value": "n * n", "args": ["(n : Nat)"], "type": "Nat"}
+#   {"kind": "claim", "name": "f_pos", "statement": "∀ n, f n ≥ 0", "proof": "simp"}  (par défaut "sorry")
+#   {"kind": "variable", "name": "x", "type": "Réel"}
+#   {"kind": "raw", "content": "-- texte Lean"}       (aussi "solve" : {"kind": "solve", "method": "simp"})
+#
+# En YAML, chaque document est un enregistrement ou une liste d'enregistrements.
+# Les enregistrements placés avant le premier 'module' vont dans un module nommé
+# d'après le fichier de spécifications.
+
+# Sortes qui produisent une déclaration Lean (comptées dans les rapports)
+_DECLARATIONS = frozenset(("structure", "inductive", "def", "claim"))
+KINDS = ("module", "namespace", "section", "end", "structure", "inductive", "def", "claim",
+         "variable", "raw", "solve")
+
+# Nom de module Lean : segments identifiants séparés par des points
+_MODULE_NAME = re.compile(r"[^\W\d][\w']*(?:\.[^\W\d][\w']*)*")
+
+class SpecError(ValueError):
+    """Spécification invalide (avec sa position : 'fichier:ligne')."""
+
+class ModuleSpec(NamedTuple):
+    name: str # ex: "Geometrie.Basic" -> Geometrie/Basic.lean
+    imports: Optional[List[str]] # None : en-tête par défaut de l'interpréteur
+    records: List[Dict[str, Any]]
+    source: str # Position du début du module (messages d'erreur)
+
+    @property
+    def path(self) -> str:
+        return self.name.replace(".", "/") + ".lean"
+
+class ModuleResult(NamedTuple):
+    module: str
+    path: str
+    declarations: int
+    size: int # Caractères écrits
+    seconds: float # Rendu et écriture, dans le worker
+    status: str # "created", "modified", "unchanged" ou "failed"
+    entry: Optional[Dict[str, Any]] # Entrée du manifeste de l'OutputWriter
+    error: Optional[str] = None
+
+# --- Lecture ------------------------------------------------------------------------
+
+def read_specs(fp: IO[str], format: str = "jsonl", name: str = "<specs>") -> Iterator[Tuple[Dict[str, Any], str]]:
+    """Enregistrements (dict, position) lus en flux depuis un fichier JSONL ou YAML."""
+    if format == "jsonl":
+        for number, line in enumerate(fp, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                raise SpecError(f"{name}:{number}: JSON invalide ({exc})") from None
+            yield _checked(record, f"{name}:{number}")
+    elif format == "yaml":
+        import yaml
+        try:
+            for number, document in enumerate(yaml.safe_load_all(fp), 1):
+                if document is None:
+                    continue
+                for index, record in enumerate(document if isinstance(document, list) else [document]):
+                    yield _checked(record, f"{name}:document {number}, #{index + 1}")
+        except yaml.YAMLError as exc:
+            raise SpecError(f"{name}: YAML invalide ({exc})") from None
+    else:
+        raise ValueError(f"Format inconnu : {format!r} (attendu 'jsonl' ou 'yaml')")
+
+def _checked(record: Any, where: str) -> Tuple[Dict[str, Any], str]:
+    if not isinstance(record, dict):
+        raise SpecError(f"{where}: un enregistrement doit être un objet")
+    kind = record.get("kind")
+    if kind not in KINDS:
+        raise SpecError(f"{where}: sorte inconnue {kind!r} (attendu : {', '.join(KINDS)})")
+    if kind not in ("end", "section", "raw", "solve") and not record.get("name"):
+        raise SpecError(f"{where}: 'name' manquant pour {kind!r}")
+    return record, where
+
+def spec_format(path: str) -> str:
+    """Format d'un fichier de spécifications d'après son extension."""
+    return "yaml" if path.endswith((".yaml", ".yml")) else "jsonl"
+
+def group_modules(records: Iterable[Tuple[Dict[str, Any], str]], default: str) -> Iterator[ModuleSpec]:
+    """Regroupe les enregistrements par module, au fil de la lecture (un module n'est produit qu'une fois)."""
+    seen: Set[str] = set()
+    current: Optional[ModuleSpec] = None
+    for record, where in records:
+        if record["kind"] == "module":
+            if current is not None:
+                yield current
+            name = str(record["name"])
+            if not _MODULE_NAME.fullmatch(name):
+                raise SpecError(f"{where}: nom de module invalide {name!r}")
+            if name in seen:
+                raise SpecError(f"{where}: module {name!r} déjà défini")
+            seen.add(name)
+            imports = record.get("imports")
+            current = ModuleSpec(name, list(imports) if imports is not None else None, [], where)
+            continue
+        if current is None:
+            seen.add(default)
+            current = ModuleSpec(default, None, [], where)
+        current.records.append(record)
+    if current is not None:
+        yield current
+
+# --- Rendu d'un module ----------------------------------------------------------------
+
+def apply_record(bridge, record: Dict[str, Any], scopes: List[Tuple[str, str]], solve_follows: bool = False):
+    """
+    Ajoute à 'bridge' les actions d'un enregistrement ('scopes' : pile des scopes ouverts).
+    Un 'claim' sans 'proof' est prouvé par 'sorry', sauf si l'enregistrement suivant
+    est un 'solve' ('solve_follows').
+    """
+    from .actions.commands import ActionClaim, ActionDeclare, ActionRaw, ActionSolve
+    from .actions.scopes import ActionEndScope, ActionStartScope
+    from .core.objects import MScalar
+
+    kind = record["kind"]
+    if kind == "def":
+        bridge.define_many(({
+            "name": record["name"],
+            "value_expr": record.get("value", record.get("value_expr", "")),
+            "args": record.get("args"),
+            "type_hint": record.get("type", record.get("type_hint")),
+            "is_computable": record.get("computable", record.get("is_computable", True)),
+        },))
+    elif kind == "claim":
+        bridge.add_action(ActionClaim(record["name"], str(record.get("statement", ""))))
+        if record.get("proof") or not solve_follows:
+            bridge.add_action(ActionSolve(record.get("proof") or "sorry"))
+    elif kind == "structure":
+        bridge.define_structure(record["name"], dict(record.get("fields") or {}))
+    elif kind == "inductive":
+        bridge.define_inductive(record["name"], list(record.get("constructors") or []))
+    elif kind in ("namespace", "section"):
+        name = str(record.get("name") or "")
+        scopes.append((kind, name))
+        bridge.add_action(ActionStartScope(kind, name))
+    elif kind == "end":
+        if not scopes:
+            raise SpecError("'end' sans scope ouvert")
+        scope_kind, name = scopes.pop()
+        if record.get("name") not in (None, name):
+            raise SpecError(f"'end {record['name']}' ferme {scope_kind} {name!r}")
+        bridge.add_action(ActionEndScope(scope_kind, name))
+    elif kind == "variable":
+        bridge.add_action(ActionDeclare(record["name"], MScalar(str(record.get("type", "Real")))))
+    elif kind == "raw":
+        bridge.add_action(ActionRaw(str(record.get("content", ""))))
+    elif kind == "solve":
+        bridge.add_action(ActionSolve(record.get("method", "sorry")))
+
+_local = threading.local() # Interpréteur réutilisé d'un module à l'autre dans un worker
+
+def _interpreter(config_path: str):
+    state = getattr(_local, "state", None)
+    if state is None or state[0] != config_path:
+        from .interpreter import LeanBridgeInterpreter
+        bridge = LeanBridgeInterpreter(config_path)
+        state = _local.state = (config_path, bridge, bridge.snapshot(), list(bridge.header_imports))
+    return state[1:]
+
+def render_module(spec: ModuleSpec, config_path: str = "leanbridge/config.yaml") -> Tuple[str, int]:
+    """Code Lean d'un module et son nombre de déclarations. Les scopes restés ouverts sont fermés."""
+    from .actions.scopes import ActionEndScope
+    bridge, base, header = _interpreter(config_path)
+    bridge.rollback(base)
+    bridge.header_imports = header if spec.imports is None else [f"import {name}" for name in spec.imports]
+    scopes: List[Tuple[str, str]] = []
+    declarations = 0
+    records = spec.records
+    for index, record in enumerate(records):
+        solve_follows = index + 1 < len(records) and records[index + 1]["kind"] == "solve"
+        try:
+            apply_record(bridge, record, scopes, solve_follows)
+        except (KeyError, TypeError, ValueError) as exc:
+            raise SpecError(f"{spec.source} ({spec.name}), enregistrement {index + 1} : {exc}") from None
+        declarations += record["kind"] in _DECLARATIONS
+    while scopes:
+        bridge.add_action(ActionEndScope(*scopes.pop()))
+    text = bridge.process()
+    bridge.rollback(base) # Libère les actions du module
+    return text, declarations
+
+def build_module(spec: ModuleSpec, out_dir: str, previous: Optional[Dict[str, Any]],
+                 config_path: str = "leanbridge/config.yaml") -> ModuleResult:
+    """Rend un module et l'écrit dans 'out_dir' (exécuté dans un worker)."""
+    from .output import write_file
+    start = perf_counter()
+    try:
+        text, declarations = render_module(spec, config_path)
+        entry, status = write_file(out_dir, spec.path, text, previous)
+    except Exception as exc:
+        return ModuleResult(spec.name, spec.path, 0, 0, perf_counter() - start, "failed", None,
+                            f"{type(exc).__name__}: {exc}")
+    return ModuleResult(spec.name, spec.path, declarations, len(text), perf_counter() - start, status, entry)
+
+# --- Build parallèle ------------------------------------------------------------------
+
+class BuildReport:
+    """Résultat d'un build : un ModuleResult par module, dans l'ordre des spécifications."""
+    def __init__(self):
+        self.results: List[ModuleResult] = []
+        self.elapsed = 0.0
+
+    @property
+    def failed(self) -> List[ModuleResult]:
+        return [result for result in self.results if result.status == "failed"]
+
+    @property
+    def declarations(self) -> int:
+        return sum(result.declarations for result in self.results)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed_s": round(self.elapsed, 6),
+            "declarations": self.declarations,
+            "declarations_per_s": round(self.declarations / self.elapsed) if self.elapsed else None,
+            "modules": [{"module": result.module, "path": result.path, "declarations": result.declarations,
+                         "size": result.size, "seconds": round(result.seconds, 6), "status": result.status,
+                         "error": result.error} for result in self.results],
+        }
+
+    def summary(self) -> str:
+        lines = []
+        for result in self.results:
+            detail = result.error if result.error else f"{result.declarations} décl., {result.size} car."
+            lines.append(f"  {result.path:<40} {result.seconds * 1000:9.1f} ms  {result.status:<9} {detail}")
+        rate = f"{self.declarations / self.elapsed:,.0f} décl./s" if self.elapsed else "-"
+        lines.append(f"{len(self.results)} modules, {self.declarations} déclarations en {self.elapsed:.3f} s ({rate})"
+                     + (f", {len(self.failed)} en échec" if self.failed else ""))
+        return "\n".join(lines)
+
+def build(sources: Iterable[str], out_dir: str, jobs: Optional[int] = None,
+          config_path: str = "leanbridge/config.yaml", remove_stale: bool = False,
+          on_result=None) -> BuildReport:
+    """
+    Lit les fichiers de spécifications ('-' : entrée standard, en JSONL) en flux et
+    produit un module Lean par module spécifié dans 'out_dir', avec 'jobs' processus
+    (défaut : nombre de CPU ; 1 : dans le processus courant). Au plus 2 * jobs modules
+    sont en attente à la fois : la mémoire reste bornée quelle que soit la taille des
+    spécifications. Les fichiers inchangés ne sont pas réécrits (voir OutputWriter).
+    'on_result' est appelé avec chaque ModuleResult dès qu'il est disponible.
+    """
+    from .output import OutputWriter
+    jobs = jobs or os.cpu_count() or 1
+    writer = OutputWriter(out_dir)
+    report = BuildReport()
+    start = perf_counter()
+
+    def modules() -> Iterator[ModuleSpec]:
+        for source in sources:
+            if source == "-":
+                yield from group_modules(read_specs(sys.stdin, "jsonl", "<stdin>"), "Main")
+                continue
+            default = re.sub(r"\W", "_", os.path.splitext(os.path.basename(source))[0]).lstrip("_0123456789") or "Main"
+            with open(source, "r", encoding="utf-8") as f:
+                yield from group_modules(read_specs(f, spec_format(source), source), default)
+
+    def finish(result: ModuleResult):
+        if result.entry is not None:
+            writer.record(result.path, result.entry, result.status)
+        report.results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    try:
+        if jobs == 1:
+            for spec in modules():
+                finish(build_module(spec, out_dir, writer.previous_entry(spec.path), config_path))
+        else:
+            with ProcessPoolExecutor(jobs) as pool:
+                pending: List[Future] = [] # Dans l'ordre des spécifications
+                try:
+                    for spec in modules():
+                        pending.append(pool.submit(build_module, spec, out_dir,
+                                                   writer.previous_entry(spec.path), config_path))
+                        if len(pending) >= 2 * jobs:
+                            finish(pending.pop(0).result()) # Contre-pression : on n'avance pas la lecture
+                        while pending and pending[0].done():
+                            finish(pending.pop(0).result())
+                finally:
+                    for future in pending: # Modules déjà soumis, même si la lecture a échoué
+                        finish(future.result())
+    except BaseException:
+        writer.finish(remove_stale=False) # Le manifeste garde les modules écrits
+        raise
+    writer.finish(remove_stale=remove_stale)
+    report.elapsed = perf_counter() - start
+    return report
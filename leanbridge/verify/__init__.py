@@ -0,0 +1,13 @@
+from typing import TYPE_CHECKING
+from .._lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    ".claims": ("ClaimRequest", "Outcome", "DEFAULT_TACTICS", "collect_claims"),
+    ".pool": ("CheckerPool", "CheckerError"),
+    ".cache": ("OutcomeCache", "CachedVerifier"),
+})
+
+if TYPE_CHECKING:
+    from .claims import ClaimRequest, Outcome, DEFAULT_TACTICS, collect_claims
+    from .pool import CheckerPool, CheckerError
+    from .cache import OutcomeCache, CachedVerifier
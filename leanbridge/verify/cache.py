@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from .claims import ClaimRequest, Outcome, attempt_text
+
+class OutcomeCache:
+    """
+    Cache persistant (SQLite) des résultats de vérification, adressé par contenu :
+    la clé d'une tentative est le hash de ClaimRequest.context_key (en-tête, code
+    brut et scopes qui précèdent, variables, déclarations citées), de l'énoncé rendu
+    et de la preuve rendue (ActionSolve).
+
+    Éviction LRU dès que 'max_entries' entrées ou 'max_bytes' octets (taille estimée
+    des résultats) sont dépassés.
+    """
+    def __init__(self, path: str = ".leanbridge-cache/outcomes.sqlite", max_entries: int = 100_000,
+                 max_bytes: int = 64 * 2**20):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outcomes ("
+            " key TEXT PRIMARY KEY, success INTEGER NOT NULL, tactic TEXT, elapsed REAL NOT NULL,"
+            " messages TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS outcomes_lru ON outcomes (last_used)")
+        self._db.commit()
+
+    def __enter__(self) -> "OutcomeCache":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def key(claim: ClaimRequest, tactic: str) -> str:
+        digest = hashlib.blake2b(digest_size=20)
+        for part in (claim.context_key, attempt_text(claim.statement, tactic)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[bool, Optional[str], float, Tuple[str, ...]]]:
+        """Retourne (succès, tactique, durée, messages) ou None."""
+        row = self._db.execute(
+            "SELECT success, tactic, elapsed, messages FROM outcomes WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE outcomes SET last_used = ? WHERE key = ?", (time.time(), key))
+        return bool(row[0]), row[1], row[2], tuple(json.loads(row[3]))
+
+    def put(self, key: str, success: bool, tactic: Optional[str], elapsed: float, messages: Sequence[str] = ()):
+        encoded = json.dumps(list(messages), ensure_ascii=False)
+        size = len(key) + len(tactic or "") + len(encoded) + 32
+        self._db.execute(
+            "INSERT OR REPLACE INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, int(success), tactic, elapsed, encoded, size, time.time()),
+        )
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà des limites."""
+        count, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outcomes").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        excess_rows = max(0, count - self.max_entries)
+        excess_bytes = max(0, total - self.max_bytes)
+        removed_rows = removed_bytes = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM outcomes ORDER BY last_used"):
+            if removed_rows >= excess_rows and removed_bytes >= excess_bytes:
+                break
+            victims.append((key,))
+            removed_rows += 1
+            removed_bytes += size
+        self._db.executemany("DELETE FROM outcomes WHERE key = ?", victims)
+
+    def commit(self):
+        self.evict()
+        self._db.commit()
+
+    def clear(self):
+        self._db.execute("DELETE FROM outcomes")
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM outcomes").fetchone()[0]
+
+    def close(self):
+        self.commit()
+        self._db.close()
+
+class CachedVerifier:
+    """
+    Enveloppe un vérificateur (ex: CheckerPool) : chaque tentative est d'abord cherchée
+    dans le cache, seules les tentatives inconnues sont envoyées au vérificateur, et
+    leurs résultats sont enregistrés. Un énoncé inchangé n'est donc jamais renvoyé.
+    Les échecs dus au vérificateur (Outcome.checker_error) ne sont pas enregistrés.
+    """
+    def __init__(self, verifier, cache: OutcomeCache):
+        self.verifier = verifier
+        self.cache = cache
+
+    def verify(self, claims: Sequence[ClaimRequest], tactics: Sequence[str]) -> List[Outcome]:
+        cache = self.cache
+        outcomes: List[Optional[Outcome]] = [None] * len(claims)
+        groups: Dict[Tuple[str, ...], List[int]] = {} # tactiques restantes -> énoncés
+        failures: Dict[int, List[Tuple[float, Tuple[str, ...]]]] = {}
+        for index, claim in enumerate(claims):
+            remaining = []
+            for tactic in tactics:
+                hit = cache.get(cache.key(claim, tactic))
+                if hit is None:
+                    remaining.append(tactic)
+                elif hit[0]:
+                    outcomes[index] = Outcome(claim.name, True, tactic, hit[2], (), True)
+                    break
+                else:
+                    failures.setdefault(index, []).append((hit[2], hit[3]))
+            if outcomes[index] is not None:
+                continue
+            if remaining:
+                groups.setdefault(tuple(remaining), []).append(index)
+            else:
+                known = failures[index]
+                outcomes[index] = Outcome(claim.name, False, None, max(e for e, _ in known), known[-1][1], True)
+
+        for remaining, indices in groups.items():
+            results = self.verifier.verify([claims[i] for i in indices], list(remaining))
+            for index, outcome in zip(indices, results):
+                claim = claims[index]
+                if outcome.success:
+                    cache.put(cache.key(claim, outcome.tactic), True, outcome.tactic, outcome.elapsed)
+                elif not outcome.checker_error:
+                    # Échec du portefeuille : chaque tactique restante a échoué (une erreur du
+                    # vérificateur, elle, n'est pas définitive : rien n'est enregistré)
+                    for tactic in remaining:
+                        cache.put(cache.key(claim, tactic), False, None, outcome.elapsed, outcome.messages)
+                outcomes[index] = outcome
+        cache.commit()
+        return outcomes
@@ -0,0 +1,125 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from ..actions.commands import Action, ActionClaim, ActionDeclare, ActionRaw, ActionSolve
+from ..actions.scopes import ActionStartScope, ActionEndScope
+
+# Tactiques essayées par défaut, en concurrence, pour chaque énoncé
+DEFAULT_TACTICS = ("rfl", "simp", "decide", "omega", "norm_num", "aesop")
+
+_IDENTIFIER = re.compile(r"[^\W\d][\w'.]*")
+
+class ClaimRequest(NamedTuple):
+    """
+    Énoncé à vérifier. 'prelude' est le code qui le précède, en morceaux (le premier
+    est l'en-tête d'imports) ; 'prelude_keys[i]' identifie le préfixe prelude[:i+1]
+    (hash chaîné), ce qui permet aux workers de réutiliser un environnement déjà élaboré.
+
+    'context_key' résume ce dont dépend le résultat : en-tête, code brut et actions de
+    scope qui précèdent l'énoncé ('open', 'set_option', notations et attributs...),
+    variables ouvertes, et déclarations citées par l'énoncé (hashs transitifs). Deux
+    énoncés de même texte et de même context_key ont le même résultat (voir OutcomeCache).
+    """
+    name: str
+    statement: str # Fragment rendu de l'ActionClaim ("lemma nom : ...")
+    prelude: Tuple[str, ...]
+    prelude_keys: Tuple[str, ...]
+    context_key: str = ""
+
+class Outcome(NamedTuple):
+    """Résultat de la vérification d'un énoncé."""
+    name: str
+    success: bool
+    tactic: Optional[str] # Tactique gagnante (None en cas d'échec)
+    elapsed: float # Secondes (tentative gagnante, ou la plus longue en cas d'échec)
+    messages: Tuple[str, ...] = () # Erreurs de la dernière tentative en échec
+    cached: bool = False # Résultat lu dans un OutcomeCache
+    # Échec dû (au moins en partie) au vérificateur lui-même (délai dépassé, processus
+    # arrêté) et non à la preuve : le résultat n'est pas définitif et n'est jamais mis en cache
+    checker_error: bool = False
+
+def attempt_text(statement: str, tactic: str) -> str:
+    """Code Lean d'une tentative, au format de rendu d'ActionSolve."""
+    return f"{statement}\n{ActionSolve(tactic).to_lean(None, None)}"
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _chain(previous: str, chunk: str) -> str:
+    return _digest(previous, chunk)
+
+def _suffixes(qualified: str) -> Iterable[str]:
+    parts = qualified.split(".")
+    for i in range(len(parts)):
+        yield ".".join(parts[i:])
+
+def _references(text: str, hashes: Dict[str, str]) -> List[str]:
+    """Hashs (triés) des déclarations connues citées dans 'text'."""
+    found = set()
+    for identifier in set(_IDENTIFIER.findall(text)):
+        identifier = identifier.rstrip(".")
+        while identifier:
+            digest = hashes.get(identifier)
+            if digest is not None:
+                found.add(digest)
+            identifier = identifier.rpartition(".")[0]
+    return sorted(found)
+
+def collect_claims(actions: Sequence[Action], fragments: Sequence[str], header: str,
+                   only_sorry: bool = True) -> Tuple[List[ClaimRequest], List[ActionSolve]]:
+    """
+    Extrait les paires ActionClaim + ActionSolve d'un buffer rendu.
+    Retourne les requêtes et les ActionSolve correspondantes (pour y écrire la tactique gagnante).
+    Avec only_sorry, seules les preuves encore en 'sorry' sont retenues.
+    """
+    requests: List[ClaimRequest] = []
+    solves: List[ActionSolve] = []
+    chunks = [header]
+    keys = [_chain("", header)]
+    segment: List[str] = []
+    scopes: List[Tuple[ActionStartScope, List[str]]] = [] # (ouverture, variables du scope)
+    top_variables: List[str] = []
+    hashes: Dict[str, str] = {} # nom (qualifié ou suffixe) -> hash transitif de la déclaration
+    commands = "" # Hash chaîné du code brut et des actions de scope rencontrés
+    for index, action in enumerate(actions):
+        fragment = fragments[index]
+        kind = type(action)
+        if kind is ActionRaw or kind is ActionStartScope or kind is ActionEndScope:
+            commands = _chain(commands, fragment)
+        if kind is ActionStartScope:
+            scopes.append((action, []))
+        elif kind is ActionEndScope:
+            if scopes:
+                scopes.pop()
+        elif kind is ActionDeclare:
+            (scopes[-1][1] if scopes else top_variables).append(fragment)
+
+        following = actions[index + 1] if index + 1 < len(actions) else None
+        if kind is ActionClaim and type(following) is ActionSolve:
+            if not only_sorry or following.method.strip() == "sorry":
+                if segment:
+                    chunk = "\n".join(segment)
+                    keys.append(_chain(keys[-1], chunk))
+                    chunks.append(chunk)
+                    segment = []
+                scope_lines = [*top_variables]
+                for start, variables in scopes:
+                    scope_lines.append(f"{start.kind} {start.name}")
+                    scope_lines.extend(variables)
+                context_key = _digest(header, commands, "\n".join(scope_lines), *_references(fragment, hashes))
+                requests.append(ClaimRequest(action.name, fragment, tuple(chunks), tuple(keys), context_key))
+                solves.append(following)
+
+        names = action.declared_names()
+        if names:
+            digest = _digest(fragment, *_references(fragment, hashes))
+            prefix = "".join(f"{start.name}." for start, _ in scopes if start.kind == "namespace" and start.name)
+            for name in names:
+                for suffix in _suffixes(prefix + name):
+                    hashes[suffix] = digest
+        segment.append(fragment)
+    return requests, solves
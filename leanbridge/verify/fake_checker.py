@@ -0,0 +1,62 @@
+"""
+Vérificateur factice parlant le protocole de CheckerWorker, pour les tests et les démos :
+
+    python -m leanbridge.verify.fake_checker --accept simp --solve mon_lemme=omega
+
+Une tentative "... := by T" réussit si T est accepté pour tous les énoncés (--accept)
+ou pour cet énoncé (--solve NOM=T). Les délais simulent l'import de Mathlib et
+l'élaboration d'une tactique (--slow T=SECONDES pour une tactique lente).
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+_ATTEMPT = re.compile(r"(?:lemma|theorem)\s+(\S+)[\s\S]*:=\s*by\s+(.+?)\s*$")
+
+def respond(command: str, accept: List[str], solve: Dict[str, str], tactic_delay: float,
+            slow: Optional[Dict[str, float]] = None) -> List[dict]:
+    match = _ATTEMPT.search(command)
+    if match is None:
+        return []
+    name, tactic = match.groups()
+    time.sleep((slow or {}).get(tactic, tactic_delay))
+    if tactic == "sorry":
+        return [{"severity": "warning", "data": "declaration uses 'sorry'"}]
+    if tactic in accept or solve.get(name) == tactic:
+        return []
+    return [{"severity": "error", "data": f"{tactic} failed to prove {name}"}]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Vérificateur factice (protocole JSON du REPL Lean).")
+    parser.add_argument("--accept", action="append", default=[], help="tactique qui prouve tout énoncé")
+    parser.add_argument("--solve", action="append", default=[], help="NOM=TACTIQUE : tactique qui prouve cet énoncé")
+    parser.add_argument("--import-delay", type=float, default=0.0, help="secondes par élaboration d'imports")
+    parser.add_argument("--tactic-delay", type=float, default=0.0, help="secondes par tentative")
+    parser.add_argument("--slow", action="append", default=[], help="TACTIQUE=SECONDES : délai propre à cette tactique")
+    args = parser.parse_args(argv)
+    solve = dict(item.split("=", 1) for item in args.solve)
+    slow = {tactic: float(delay) for tactic, delay in (item.split("=", 1) for item in args.slow)}
+
+    envs = 0
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        env = request.get("env")
+        if env is not None and not 0 <= env < envs:
+            response = {"message": f"unknown environment {env}"}
+        else:
+            command = request.get("cmd", "")
+            if re.search(r"^import\s", command, re.MULTILINE):
+                time.sleep(args.import_delay)
+            response = {"env": envs, "messages": respond(command, args.accept, solve, args.tactic_delay, slow)}
+            envs += 1
+        sys.stdout.write(json.dumps(response) + "\n\n")
+        sys.stdout.flush()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
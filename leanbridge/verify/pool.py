@@ -0,0 +1,250 @@
+import json
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .claims import ClaimRequest, Outcome, attempt_text
+
+class CheckerError(RuntimeError):
+    """Le processus vérificateur a quitté ou n'a pas répondu à temps."""
+
+class CheckerWorker:
+    """
+    Processus vérificateur de longue durée.
+
+    Protocole (celui du REPL Lean) : chaque requête est un objet JSON
+    {"cmd": <code Lean>, "env": <id>} écrit sur une ligne suivie d'une ligne vide ;
+    la réponse est un objet JSON (sur une ou plusieurs lignes) contenant "env"
+    (environnement résultant) et "messages" ([{"severity": ..., "data": ...}]).
+    Les environnements élaborés (imports, prélude) sont conservés : un même préfixe
+    n'est élaboré qu'une fois par worker.
+    """
+    MAX_ENVS = 256
+
+    def __init__(self, command: Sequence[str], cwd: Optional[str] = None):
+        self.command = list(command)
+        self.cwd = cwd
+        self._envs: Dict[str, int] = {} # clé de préfixe -> environnement
+        self._start()
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            self.command, cwd=self.cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1,
+        )
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        reader = threading.Thread(target=self._read_lines, args=(self.process.stdout, self._lines), daemon=True)
+        reader.start()
+        self._envs = {}
+
+    @staticmethod
+    def _read_lines(stream, lines: "queue.Queue[Optional[str]]"):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def restart(self):
+        self.process.kill()
+        self.process.wait()
+        self._start()
+
+    def interrupt(self):
+        """
+        Interrompt la requête en cours (depuis un autre thread). Le REPL n'a pas
+        d'annulation : le processus est arrêté, la requête lève CheckerError et
+        restart() relance un processus neuf (sans ses environnements élaborés).
+        """
+        self.process.kill()
+
+    def close(self):
+        process = self.process
+        if process.poll() is None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+
+    def request(self, message: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        try:
+            self.process.stdin.write(json.dumps(message, ensure_ascii=False) + "\n\n")
+            self.process.stdin.flush()
+        except OSError as exc:
+            raise CheckerError(f"Vérificateur arrêté : {exc}") from exc
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        buffer = ""
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise CheckerError(f"Pas de réponse du vérificateur après {timeout}s") from None
+            if line is None:
+                raise CheckerError("Le vérificateur s'est arrêté")
+            if not buffer and not line.strip():
+                continue
+            buffer += line
+            try:
+                return json.loads(buffer)
+            except ValueError:
+                continue # Réponse sur plusieurs lignes
+
+    def _env_for(self, claim: ClaimRequest, timeout: Optional[float]) -> Optional[int]:
+        """Élabore (si besoin) le prélude de 'claim' à partir du plus long préfixe déjà connu."""
+        keys = claim.prelude_keys
+        start, env = 0, None
+        for i in range(len(keys) - 1, -1, -1):
+            known = self._envs.get(keys[i])
+            if known is not None:
+                if i == len(keys) - 1:
+                    return known
+                start, env = i + 1, known
+                break
+        message: Dict[str, Any] = {"cmd": "\n".join(claim.prelude[start:])}
+        if env is not None:
+            message["env"] = env
+        response = self.request(message, timeout)
+        env = response.get("env")
+        if env is None:
+            raise CheckerError(f"Prélude refusé : {response.get('message', response)}")
+        if len(self._envs) >= self.MAX_ENVS:
+            del self._envs[next(iter(self._envs))]
+        self._envs[keys[-1]] = env
+        return env
+
+    def check(self, claim: ClaimRequest, tactic: str, timeout: Optional[float]) -> Tuple[bool, Tuple[str, ...]]:
+        """Essaie une tactique. Retourne (succès, messages d'erreur)."""
+        env = self._env_for(claim, timeout)
+        response = self.request({"cmd": attempt_text(claim.statement, tactic), "env": env}, timeout)
+        if "message" in response and "messages" not in response:
+            return False, (str(response["message"]),)
+        errors = tuple(
+            str(message.get("data", "")) for message in response.get("messages", ())
+            if message.get("severity") == "error" or "sorry" in str(message.get("data", ""))
+        )
+        return not errors, errors
+
+class _Race:
+    """Tentatives concurrentes d'un même énoncé : workers occupés, et ceux à interrompre."""
+    __slots__ = ("lock", "decided", "running", "interrupted")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.decided = False
+        self.running: List[CheckerWorker] = []
+        self.interrupted: List[CheckerWorker] = []
+
+    def enter(self, worker: CheckerWorker) -> bool:
+        """Faux si l'énoncé est déjà prouvé (la tentative n'est pas lancée)."""
+        with self.lock:
+            if not self.decided:
+                self.running.append(worker)
+            return not self.decided
+
+    def leave(self, worker: CheckerWorker) -> bool:
+        """Vrai si le worker a été interrompu pendant la tentative (il doit être relancé)."""
+        with self.lock:
+            self.running.remove(worker)
+            return worker in self.interrupted
+
+    def finish(self):
+        """L'énoncé est prouvé : interrompt les tentatives encore en cours."""
+        with self.lock:
+            self.decided = True
+            for worker in self.running:
+                self.interrupted.append(worker)
+                worker.interrupt()
+
+class CheckerPool:
+    """
+    Pool de vérificateurs maintenus chauds (les imports, ex. Mathlib, ne sont élaborés
+    qu'une fois par worker). Pour chaque énoncé, un portefeuille de tactiques est
+    essayé en concurrence sur les workers : la première qui réussit l'emporte ; les
+    tentatives restantes de cet énoncé sont annulées si elles n'ont pas commencé,
+    interrompues sinon (le worker est alors relancé, voir CheckerWorker.interrupt).
+
+    'command' lance un vérificateur parlant le protocole de CheckerWorker, ex.
+    ["lake", "exe", "repl"] ou [sys.executable, "-m", "leanbridge.verify.fake_checker", "--accept", "simp"].
+    """
+    def __init__(self, command: Sequence[str], workers: int = 2, timeout: Optional[float] = 60.0,
+                 cwd: Optional[str] = None):
+        if workers < 1:
+            raise ValueError("Il faut au moins un worker")
+        self.timeout = timeout
+        self._workers = [CheckerWorker(command, cwd) for _ in range(workers)]
+        self._idle: "queue.Queue[CheckerWorker]" = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+
+    def __enter__(self) -> "CheckerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+        for worker in self._workers:
+            worker.close()
+
+    def _attempt(self, claim: ClaimRequest, tactic: str, race: _Race) -> Tuple[bool, Tuple[str, ...], float, bool]:
+        """Retourne (succès, messages, durée, erreur du vérificateur)."""
+        worker = self._idle.get()
+        if not race.enter(worker):
+            self._idle.put(worker)
+            return False, (), 0.0, False # Énoncé déjà prouvé : résultat ignoré
+        start = time.perf_counter()
+        checker_error = False
+        try:
+            ok, messages = worker.check(claim, tactic, self.timeout)
+        except CheckerError as exc:
+            ok, messages, checker_error = False, (str(exc),), True
+        finally:
+            # Worker interrompu, bloqué ou arrêté : on repart d'un processus neuf
+            if race.leave(worker) or checker_error:
+                worker.restart()
+            self._idle.put(worker)
+        return ok, messages, time.perf_counter() - start, checker_error
+
+    def verify(self, claims: Sequence[ClaimRequest], tactics: Sequence[str]) -> List[Outcome]:
+        """Vérifie un lot d'énoncés ; retourne un Outcome par énoncé, dans l'ordre."""
+        if not tactics:
+            raise ValueError("Le portefeuille de tactiques est vide")
+        pending: Dict[Future, Tuple[int, str]] = {}
+        by_claim: List[List[Future]] = []
+        races = [_Race() for _ in claims]
+        for index, claim in enumerate(claims):
+            futures = [self._executor.submit(self._attempt, claim, tactic, races[index]) for tactic in tactics]
+            by_claim.append(futures)
+            for future, tactic in zip(futures, tactics):
+                pending[future] = (index, tactic)
+
+        outcomes: List[Optional[Outcome]] = [None] * len(claims)
+        failures: List[List[Tuple[float, Tuple[str, ...]]]] = [[] for _ in claims]
+        checker_errors = [False] * len(claims)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, tactic = pending.pop(future)
+                if future.cancelled() or outcomes[index] is not None:
+                    continue
+                ok, messages, elapsed, checker_error = future.result()
+                if ok:
+                    outcomes[index] = Outcome(claims[index].name, True, tactic, elapsed)
+                    for sibling in by_claim[index]:
+                        if sibling.cancel():
+                            pending.pop(sibling, None)
+                    races[index].finish()
+                    continue
+                failures[index].append((elapsed, messages))
+                checker_errors[index] |= checker_error
+                if len(failures[index]) == len(tactics):
+                    outcomes[index] = Outcome(claims[index].name, False, None,
+                                              max(e for e, _ in failures[index]), failures[index][-1][1],
+                                              checker_error=checker_errors[index])
+        return outcomes
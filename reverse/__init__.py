@@ -1,2 +1,21 @@
-from .converter import LeanToPythonConverter
-from .lexer import LeanLexer
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Lazy attribute loading (PEP 562): the lexer and converter are imported on first access
+_EXPORTS = {"LeanToPythonConverter": ".converter", "LeanLexer": ".lexer", "LexedDocument": ".lexer",
+            "TokenChange": ".lexer"}
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(import_module(module, __name__), name)
+    return value
+
+def __dir__():
+    return sorted({*globals(), *_EXPORTS})
+
+if TYPE_CHECKING:
+    from .converter import LeanToPythonConverter
+    from .lexer import LeanLexer, LexedDocument, TokenChange
@@ -0,0 +1,254 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from .converter import LeanToPythonConverter
+
+def _convert_source(data: bytes) -> Tuple[Optional[str], int, Optional[str]]:
+    """Worker entry point: returns (script, token count, error)."""
+    converter = LeanToPythonConverter()
+    try:
+        return "\n".join(converter.iter_lines(data)), converter.token_count, None
+    except Exception as exc: # Reported per file, the batch goes on
+        return None, converter.token_count, f"{type(exc).__name__}: {exc}"
+
+def _write_atomic(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+class ConversionCache:
+    """
+    Content-addressed store of converted scripts.
+
+    Entries are keyed by the SHA-256 of the converter version plus the Lean source
+    bytes, so a converter upgrade never serves stale output. The cache also keeps a
+    manifest (output path -> key) used to skip files whose output is already current.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest: Dict[str, str] = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        digest = hashlib.sha256(LeanToPythonConverter.VERSION.encode())
+        digest.update(b"\0")
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _object_path(self, key: str) -> str:
+        return os.path.join(self.root, "objects", key[:2], key[2:] + ".json")
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """Returns (script, token count) or None."""
+        try:
+            with open(self._object_path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["script"], entry["tokens"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, script: str, tokens: int):
+        _write_atomic(self._object_path(key), json.dumps({"script": script, "tokens": tokens}))
+
+    def remove(self, key: str):
+        """Drops an entry (and its fan-out directory once empty)."""
+        path = self._object_path(key)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            pass # Already gone, or the directory still holds other entries
+
+    def save_manifest(self):
+        _write_atomic(self.manifest_path, json.dumps(self.manifest, indent=0, sort_keys=True))
+
+class BatchReport:
+    """Counters of a batch conversion run."""
+    def __init__(self):
+        self.files = 0
+        self.converted = 0
+        self.from_cache = 0 # Output restored from the cache without converting
+        self.skipped = 0 # Output already up to date
+        self.removed: List[str] = [] # Sources that disappeared: their output was deleted
+        self.failed: List[Tuple[str, str]] = [] # (source path, error)
+        self.tokens = 0 # Tokens of the files actually converted
+        self.elapsed = 0.0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def tokens_per_sec(self) -> float:
+        return self.tokens / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "files": self.files,
+            "converted": self.converted,
+            "from_cache": self.from_cache,
+            "skipped": self.skipped,
+            "removed": self.removed,
+            "failed": [{"path": path, "error": error} for path, error in self.failed],
+            "tokens": self.tokens,
+            "elapsed": self.elapsed,
+            "files_per_sec": self.files_per_sec,
+            "tokens_per_sec": self.tokens_per_sec,
+        }
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.files} files in {self.elapsed:.2f}s ({self.files_per_sec:.1f} files/s, "
+            f"{self.tokens_per_sec:.0f} tokens/s)",
+            f"  converted: {self.converted}, from cache: {self.from_cache}, "
+            f"skipped: {self.skipped}, removed: {len(self.removed)}, failed: {len(self.failed)}",
+        ]
+        lines.extend(f"  FAILED {path}: {error}" for path, error in self.failed)
+        return "\n".join(lines)
+
+def iter_lean_files(root: str) -> Iterator[str]:
+    """Yields the `.lean` files under `root`, relative to it, in a stable order."""
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if name.endswith(".lean"):
+                yield os.path.relpath(os.path.join(directory, name), root)
+
+def _remove_output(out_root: str, rel: str):
+    """Deletes the output of `rel`, then its directories up to `out_root` once empty."""
+    path = _output_path(out_root, rel)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    root = os.path.abspath(out_root)
+    directory = os.path.dirname(os.path.abspath(path))
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break # Not empty
+        directory = os.path.dirname(directory)
+
+def convert_tree(src_root: str, out_root: str, jobs: Optional[int] = None,
+                 cache_dir: Optional[str] = None, remove_stale: bool = True) -> BatchReport:
+    """
+    Converts every `.lean` file under `src_root` into a LeanBridge script under
+    `out_root` (same relative path, `.py` extension).
+
+    Files are hashed in this process; files whose output is already current are
+    skipped, files already in the cache are restored from it, and the rest are
+    converted across a pool of `jobs` processes (default: CPU count). With
+    `jobs=1` everything runs in this process.
+
+    Outputs of sources that disappeared since the previous run, and their cache
+    entries, are deleted unless `remove_stale` is False (they are then left in
+    place, untracked). A source that fails to convert loses its previous output,
+    which no longer matches it; the failure is listed in the report.
+    """
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    cache = ConversionCache(cache_dir or os.path.join(out_root, ".leanbridge-cache"))
+    report = BatchReport()
+
+    def store(rel: str, key: str, script: Optional[str], tokens: int, error: Optional[str]):
+        if error is not None:
+            report.failed.append((rel, error))
+            # The previous output was converted from an older version of the source
+            cache.manifest.pop(rel, None)
+            _remove_output(out_root, rel)
+            return
+        cache.put(key, script, tokens)
+        _write_atomic(_output_path(out_root, rel), script)
+        cache.manifest[rel] = key
+        report.converted += 1
+        report.tokens += tokens
+
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    in_flight: Dict[Future, Tuple[str, str]] = {}
+    seen: Set[str] = set()
+    try:
+        for rel in iter_lean_files(src_root):
+            report.files += 1
+            seen.add(rel)
+            with open(os.path.join(src_root, rel), "rb") as f:
+                data = f.read()
+            key = cache.key(data)
+            out_path = _output_path(out_root, rel)
+
+            if cache.manifest.get(rel) == key and os.path.exists(out_path):
+                report.skipped += 1
+                continue
+            cached = cache.get(key)
+            if cached is not None:
+                _write_atomic(out_path, cached[0])
+                cache.manifest[rel] = key
+                report.from_cache += 1
+                continue
+
+            if pool is None:
+                store(rel, key, *_convert_source(data))
+                continue
+            # Bounded number of pending files: sources are not all held in memory
+            if len(in_flight) >= jobs * 4:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    store(*in_flight.pop(future), *future.result())
+            in_flight[pool.submit(_convert_source, data)] = (rel, key)
+
+        for future, (rel, key) in in_flight.items():
+            store(rel, key, *future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Sources that disappeared no longer own an output
+    stale = sorted(set(cache.manifest) - seen)
+    live_keys = {cache.manifest[rel] for rel in seen if rel in cache.manifest}
+    for rel in stale:
+        key = cache.manifest.pop(rel)
+        if not remove_stale:
+            continue
+        _remove_output(out_root, rel)
+        if key not in live_keys:
+            cache.remove(key)
+        report.removed.append(rel)
+    cache.save_manifest()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+def _output_path(out_root: str, rel: str) -> str:
+    return os.path.join(out_root, os.path.splitext(rel)[0] + ".py")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert a tree of .lean files into LeanBridge scripts.")
+    parser.add_argument("src", help="root of the Lean sources")
+    parser.add_argument("out", help="output directory for the generated scripts")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default=None, help="cache directory (default: OUT/.leanbridge-cache)")
+    parser.add_argument("--keep-stale", action="store_true",
+                        help="keep the outputs of deleted sources (default: delete them)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = convert_tree(args.src, args.out, jobs=args.jobs, cache_dir=args.cache,
+                          remove_stale=not args.keep_stale)
+    print(json.dumps(report.as_dict(), indent=2) if args.json else report.summary())
+    return 1 if report.failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
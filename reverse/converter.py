@@ -1,4 +1,6 @@
-from typing import List, Optional
+import mmap
+from collections import deque
+from typing import Any, Deque, Iterable, Iterator, List, Optional, TextIO
 from .lexer import LeanLexer, Token
 
 class LeanToPythonConverter:
@@ -6,27 +8,61 @@ class LeanToPythonConverter:
     Parses Lean code tokens and generates `LeanBridge` Python code.
     Follows a recursive descent-like pattern but simplified for "flat" files
     declarations.
+
+    Tokens are pulled from a stream through a small lookahead buffer and output
+    lines are released as soon as each top-level declaration is parsed, so memory
+    is proportional to the largest declaration rather than to the file size.
     """
+    # Bump whenever the generated scripts change (invalidates batch caches)
+    VERSION = "1"
+
     def __init__(self):
         self.lexer = LeanLexer()
-        self.tokens: List[Token] = []
-        self.pos = 0
+        self._tokens: Iterator[Token] = iter(())
+        self._lookahead: Deque[Token] = deque()
         self.indent_level = 0
-        self.python_lines = []
+        self._pending: List[str] = []
+        self.token_count = 0 # Tokens consumed by the last conversion
 
     def convert(self, lean_code: str) -> str:
-        self.tokens = self.lexer.tokenize(lean_code)
-        self.pos = 0
+        return "\n".join(self.iter_lines(lean_code))
+
+    def convert_to(self, source: Any, writer: TextIO):
+        """
+        Streams the converted script to `writer` (any object with a `write` method).
+        The text written is identical to what `convert` returns.
+        """
+        lines = self.iter_lines(source)
+        for line in lines:
+            writer.write(line)
+            break
+        for line in lines:
+            writer.write("\n")
+            writer.write(line)
+
+    def iter_lines(self, source: Any) -> Iterator[str]:
+        """
+        Yields the lines of the generated script, one top-level declaration at a time.
+
+        `source` is Lean code (`str`, bytes-like, `mmap` or file object, see
+        `LeanLexer.iter_tokens`) or an already tokenized iterable of `Token`.
+        """
+        if isinstance(source, (str, bytes, bytearray, memoryview, mmap.mmap)) or hasattr(source, "read"):
+            source = self.lexer.iter_tokens(source)
+        self._tokens = iter(source)
+        self._lookahead = deque()
         self.indent_level = 0
-        self.python_lines = []
-        
+        self.token_count = 0
+        self._pending = []
+
         self._emit_header()
-        
-        while self.pos < len(self.tokens):
+
+        while True:
+            yield from self._flush()
             token = self._peek()
-            if not token: 
+            if not token:
                 break
-                
+
             if token.type == 'KEYWORD':
                 if token.value in ('namespace', 'section'):
                     self._parse_scope()
@@ -52,36 +88,46 @@ class LeanToPythonConverter:
                     self._advance()
             else:
                  self._advance()
-                 
-        return "\n".join(self.python_lines)
+
+    def _flush(self) -> List[str]:
+        lines, self._pending = self._pending, []
+        return lines
 
     def _emit_header(self):
-        self.python_lines.append("from leanbridge import LeanBridgeInterpreter, MScalar, MStructure")
-        self.python_lines.append("from leanbridge.actions.commands import ActionDeclare, ActionClaim, ActionSolve, ActionDefine")
-        self.python_lines.append("")
-        self.python_lines.append("bridge = LeanBridgeInterpreter()")
-        self.python_lines.append("")
+        self._pending.append("from leanbridge import LeanBridgeInterpreter, MScalar, MStructure")
+        self._pending.append("from leanbridge.actions.commands import ActionDeclare, ActionClaim, ActionSolve, ActionDefine")
+        self._pending.append("")
+        self._pending.append("bridge = LeanBridgeInterpreter()")
+        self._pending.append("")
 
     def _emit(self, line: str):
         indent = "    " * self.indent_level
-        self.python_lines.append(f"{indent}{line}")
+        self._pending.append(f"{indent}{line}")
         
     def _emit_comment(self, text: str):
         self._emit(f"# {text}")
 
     def _peek(self, offset=0) -> Optional[Token]:
-        if self.pos + offset < len(self.tokens):
-            return self.tokens[self.pos + offset]
-        return None
+        lookahead = self._lookahead
+        while len(lookahead) <= offset:
+            token = next(self._tokens, None)
+            if token is None:
+                return None
+            lookahead.append(token)
+            self.token_count += 1
+        return lookahead[offset]
 
     def _advance(self):
-        self.pos += 1
+        if self._lookahead:
+            self._lookahead.popleft()
+        elif next(self._tokens, None) is not None:
+            self.token_count += 1
 
     def _consume(self, type_name: str, value: str = None) -> Optional[Token]:
         token = self._peek()
         if token and token.type == type_name:
             if value is None or token.value == value:
-                self.pos += 1
+                self._advance()
                 return token
         return None
     
@@ -1,5 +1,8 @@
+import codecs
 import re
-from typing import NamedTuple, List, Optional
+from bisect import bisect_left
+from itertools import islice
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
 
 class Token(NamedTuple):
     type: str
@@ -7,11 +10,16 @@ class Token(NamedTuple):
     line: int
     column: int
 
+# Characters that can never start another token. Runs of them (operators, Unicode
+# math such as ℕ, →, ∀) are folded into a single MISC token. '-', '<', '>' and '!'
+# only join a run when they do not start '--', '->', '<=', '>=' or '!='.
+_MISC_RUN = r'(?:[^\s\dA-Za-z_"()\[\]{}|:<>!\-]|-(?![->])|<(?!=)|>(?!=)|!(?!=))+'
+
 class LeanLexer:
     """
     Simplex regex-based lexer for a subset of Lean 4.
     """
-    
+
     TOKEN_SPEC = [
         ('COMMENT', r'--.*'), # Single line comment
         ('STRING', r'"(?:[^"\\]|\\.)*"'), # String literal
@@ -33,40 +41,370 @@ class LeanLexer:
         ('ID', r'[a-zA-Z_][a-zA-Z0-9_\']*'),
         ('SKIP', r'[ \t]+'), # Skip spaces and tabs
         ('NEWLINE', r'\n'),
+        ('MISC', _MISC_RUN), # Run of unclassified symbols
         ('MISMATCH', r'.'), # Any other character
     ]
 
+    KEYWORDS = frozenset((
+        'namespace', 'section', 'end', 'structure', 'def', 'lemma', 'theorem',
+        'class', 'variable', 'where', 'extends', 'instance', 'noncomputable',
+    ))
+    _KEYWORD_KINDS = dict.fromkeys(KEYWORDS, 'KEYWORD')
+    PUNCTUATION = {
+        ':=': 'ASSIGN', '->': 'ARROW', '>=': 'GE', '<=': 'LE', '!=': 'NE', ':': 'COLON',
+        '(': 'LPAREN', ')': 'RPAREN', '[': 'LBRACKET', ']': 'RBRACKET',
+        '{': 'LBRACE', '}': 'RBRACE', '|': 'PIPE',
+    }
+
+    # Reference pattern built from TOKEN_SPEC (kept for compatibility)
+    REGEX = '|'.join(f'(?P<{pair[0]}>{pair[1]})' for pair in TOKEN_SPEC)
+
+    # Compiled once for all instances. Same rules as TOKEN_SPEC, arranged for speed:
+    # blanks and comments are absorbed in front of each token, identifiers and
+    # keywords share one branch (keywords are looked up in KEYWORDS) and all
+    # punctuation shares another. The group index tells the token kind.
+    RE_TOKEN = re.compile(
+        r'[ \t]*(?:--[^\n]*)?(?:'
+        r'([a-zA-Z_][a-zA-Z0-9_\']*)'                # 1: ID / KEYWORD
+        r'|(\n)'                                      # 2: NEWLINE
+        r'|(:=|->|>=|<=|!=|[:()\[\]{}|])'             # 3: punctuation
+        r'|(\d+(?:\.\d+)?)'                           # 4: NUMBER
+        r'|("[^"\\]*(?:\\.[^"\\]*)*")'                # 5: STRING (unrolled: no backtracking per character)
+        r'|(' + _MISC_RUN + r')'                      # 6: MISC
+        r'|(.)'                                       # 7: MISMATCH
+        r'|\Z)'
+    )
+
+    # Size (in bytes or characters) of the pieces read from non-str sources
+    CHUNK_SIZE = 1 << 16
+    # Longest text (in characters) held back for a quote that may close in a later
+    # piece of a non-str source. Past it the quote is emitted as MISC.
+    MAX_CARRY = 1 << 18
+
     def __init__(self):
-        self.regex = '|'.join(f'(?P<{pair[0]}>{pair[1]})' for pair in self.TOKEN_SPEC)
-        self.re_token = re.compile(self.regex)
+        self.regex = self.REGEX
+        self.re_token = self.RE_TOKEN
 
     def tokenize(self, code: str) -> List[Token]:
-        tokens = []
-        line_num = 1
-        line_start = 0
-        
-        for mo in self.re_token.finditer(code):
-            kind = mo.lastgroup
-            value = mo.group()
-            column = mo.start() - line_start
-            
-            if kind == 'NEWLINE':
-                line_start = mo.end()
-                line_num += 1
+        return list(self.iter_tokens(code))
+
+    def open_document(self, text: str = "") -> "LexedDocument":
+        """Lexes `text` into a document that can then be edited incrementally (see LexedDocument)."""
+        return LexedDocument(self, text)
+
+    def iter_tokens(self, source: Any) -> Iterator[Token]:
+        """
+        Yields tokens one at a time.
+
+        `source` may be a `str`, a bytes-like object (`bytes`, `bytearray`,
+        `memoryview`, `mmap.mmap`; decoded as UTF-8) or a file object opened in
+        text or binary mode. Non-str sources are lexed chunk by chunk, so memory
+        stays bounded by the chunk size (plus the longest line) whatever the input size.
+        A string literal longer than MAX_CARRY that crosses a chunk boundary is not
+        recognised: its opening quote is emitted as MISC.
+        """
+        if isinstance(source, str):
+            yield from self._scan(source, [1, False])
+            return
+
+        state = [1, False] # [current line number, unmatched quote seen]
+        carry = ""
+        quoted = False # carry starts with the line of a quote still open
+        for piece in self._iter_text(source):
+            if quoted and '"' not in piece and len(carry) < self.MAX_CARRY:
+                carry += piece # The open string cannot close in this piece
                 continue
-            elif kind == 'SKIP':
+            text = carry + piece
+            cut = text.rfind("\n") + 1
+            if not cut:
+                carry = text
                 continue
-            elif kind == 'COMMENT':
+            if '"' not in text[:cut]:
+                yield from self._scan(text[:cut], state) # No string can cross the cut
+                carry = text[cut:]
                 continue
-            elif kind == 'MISMATCH':
-                # Simplified error handling: treat as part of random text if needed, 
-                # but for now let's just create a generic token or raise error.
-                # LeanBridgeReverse needs to be robust, so maybe just 'SYMBOL'?
-                # For now let's keep it robust and add it as 'SYMBOL' or similar if needed.
-                # Actually, definitions bodies can contain anything.
-                # Let's emit a 'MISC' token for symbols like +, *, etc if not defined.
-                tokens.append(Token('MISC', value, line_num, column))
+            trial = [state[0], False, 0, state[0]]
+            tokens = list(self._scan(text[:cut], trial))
+            quoted = trial[1] and len(text) < self.MAX_CARRY
+            if quoted:
+                # A quote without its closing pair may open a string that continues
+                # in a later piece: keep its line, emit what comes before.
+                start, line = trial[2], trial[3]
+                yield from (token for token in tokens if token[2] < line)
+                state[0] = line
+                carry = text[start:]
+                continue
+            yield from tokens
+            state = trial[:2]
+            carry = text[cut:]
+        if carry:
+            yield from self._scan(carry, state)
+
+    def _iter_text(self, source: Any) -> Iterator[str]:
+        """Decodes a bytes-like object or a file object into text pieces."""
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        size = self.CHUNK_SIZE
+        read = getattr(source, "read", None)
+        if read is not None and not isinstance(source, (bytes, bytearray, memoryview)):
+            while True:
+                piece = read(size)
+                if not piece:
+                    break
+                yield piece if isinstance(piece, str) else decoder.decode(piece)
+        else:
+            view = memoryview(source)
+            for offset in range(0, len(view), size):
+                yield decoder.decode(view[offset:offset + size])
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def _scan(self, code: str, state: list) -> Iterator[Token]:
+        """
+        Lexes `code`, which must start at the beginning of a line.
+        `state[0]` is the line number of the first line and is updated as lines
+        are consumed; `state[1]` is set if an unmatched quote was seen. If `state`
+        has four items, the offset and the number of the line holding the first
+        unmatched quote are stored in `state[2]` and `state[3]`.
+        """
+        line_num = state[0]
+        line_start = 0
+        newline_end, newline_num = 0, line_num # Last line start outside a string
+        new_token = tuple.__new__
+        keyword = self._KEYWORD_KINDS.get
+        punctuation = self.PUNCTUATION.__getitem__
+
+        for mo in self.RE_TOKEN.finditer(code):
+            group = mo.lastindex
+            if group == 1:
+                value = mo[1]
+                yield new_token(Token, (keyword(value, 'ID'), value, line_num, mo.start(1) - line_start))
+            elif group == 2:
+                line_start = newline_end = mo.end()
+                line_num = newline_num = line_num + 1
+                state[0] = line_num
+            elif group == 3:
+                value = mo[3]
+                yield new_token(Token, (punctuation(value), value, line_num, mo.start(3) - line_start))
+            elif group == 4:
+                yield new_token(Token, ('NUMBER', mo[4], line_num, mo.start(4) - line_start))
+            elif group == 6:
+                yield new_token(Token, ('MISC', mo[6], line_num, mo.start(6) - line_start))
+            elif group == 5:
+                value = mo[5]
+                start = mo.start(5)
+                yield new_token(Token, ('STRING', value, line_num, start - line_start))
+                if "\n" in value:
+                    # Multi-line string: keep the positions of what follows exact
+                    line_num += value.count("\n")
+                    line_start = start + value.rindex("\n") + 1
+                    state[0] = line_num
+            elif group == 7:
+                # Definition bodies can contain anything: emit a generic 'MISC' token
+                # for isolated symbols not covered above.
+                value = mo[7]
+                if value == '"' and not state[1]:
+                    state[1] = True
+                    if len(state) > 2:
+                        state[2:] = newline_end, newline_num
+                yield new_token(Token, ('MISC', value, line_num, mo.start(7) - line_start))
+
+
+class TokenChange(NamedTuple):
+    """
+    Result of LexedDocument.edit: tokens [start, old_stop) of the previous stream were
+    replaced by `tokens`, now at [start, new_stop). Tokens after the change kept their
+    values and columns; their line numbers moved by `line_delta`.
+    """
+    start: int
+    old_stop: int
+    new_stop: int
+    tokens: List[Token]
+    line_delta: int
+
+class LexedDocument:
+    """
+    Token stream of an editable document, kept per line so that an edit only
+    re-lexes the lines it touches.
+
+    Lexing state only crosses a line boundary inside a multi-line string, so the
+    document is split into units: a unit starts on a line where no string is open
+    and usually covers that single line. Its tokens are stored with line numbers
+    relative to the unit. After an edit, units are lexed again from the edited line
+    until one ends on a line where an old unit started, past the replaced text:
+    from there on, the old tokens are valid again and are shifted, not re-lexed.
+
+    Positions are (line, column) pairs as in Token: lines start at 1 and columns
+    at 0, counted in characters. `tokens()` is always equal to
+    `LeanLexer().tokenize(document.text)`.
+    """
+
+    def __init__(self, lexer: LeanLexer, text: str = ""):
+        self._lexer = lexer
+        self._lines: List[str] = text.split("\n")
+        # Per line: tokens of the unit starting there (None inside a unit) and their number
+        self._units: List[Optional[List[Token]]] = []
+        self._counts: List[int] = []
+        self._dangling: List[int] = [] # Units with an unmatched quote, which a later '"' could close
+        self._units = [None] * len(self._lines)
+        self._counts = [0] * len(self._lines)
+        self._lex_lines(0, len(self._lines))
+        self._total = sum(self._counts)
+        # Last computed (line index, token index) pair: edits are usually close to the previous one
+        self._anchor = (0, 0)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self._lines)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._lines)
+
+    def line(self, line: int) -> str:
+        """Text of a line (without its newline)."""
+        return self._lines[line - 1]
+
+    def __len__(self) -> int:
+        return self._total
+
+    def tokens(self) -> List[Token]:
+        return list(self.iter_tokens())
+
+    def iter_tokens(self, start_line: int = 1) -> Iterator[Token]:
+        """Tokens of the units starting at or after `start_line`."""
+        units = self._units
+        new_token = tuple.__new__
+        for index in range(max(start_line, 1) - 1, len(units)):
+            unit = units[index]
+            if unit:
+                base = index + 1
+                for kind, value, line, column in unit:
+                    yield new_token(Token, (kind, value, line + base, column))
+
+    def token_index(self, line: int) -> int:
+        """Index in tokens() of the first token of the first unit starting at or after `line`."""
+        counts = self._counts
+        target = min(max(line, 1) - 1, len(counts))
+        anchor, index = self._anchor
+        # Counts from the closest known point: document start, previous result or end
+        if target >= anchor:
+            if target - anchor <= len(counts) - target:
+                index += sum(counts[anchor:target])
             else:
-                tokens.append(Token(kind, value, line_num, column))
-                
-        return tokens
+                index = self._total - sum(counts[target:])
+        elif target <= anchor - target:
+            index = sum(counts[:target])
+        else:
+            index -= sum(counts[target:anchor])
+        self._anchor = (target, index)
+        return index
+
+    def offset(self, line: int, column: int) -> int:
+        """Offset in `text` of a (line, column) position."""
+        self._check_position(line, column)
+        return sum(map(len, islice(self._lines, line - 1))) + line - 1 + column
+
+    def _check_position(self, line: int, column: int):
+        if not 1 <= line <= len(self._lines) or not 0 <= column <= len(self._lines[line - 1]):
+            raise IndexError(f"position ({line}, {column}) outside the document")
+
+    def edit(self, start: Tuple[int, int], end: Tuple[int, int], text: str) -> TokenChange:
+        """
+        Replaces the text between the `start` and `end` positions (end excluded) by
+        `text` and re-lexes what the edit may have changed. Returns the TokenChange.
+        """
+        (start_line, start_column), (end_line, end_column) = start, end
+        self._check_position(start_line, start_column)
+        self._check_position(end_line, end_column)
+        if (end_line, end_column) < (start_line, start_column):
+            raise ValueError("edit end is before its start")
+        lines = self._lines
+        first, last = start_line - 1, end_line - 1
+        removed = lines[first:last + 1]
+        # Quotes and backslashes decide where strings end, possibly for an earlier unit
+        quoted = any('"' in part or "\\" in part for part in (text, *removed))
+        replacement = (lines[first][:start_column] + text + lines[last][end_column:]).split("\n")
+        delta = len(replacement) - len(removed)
+
+        # Re-lexing starts at the unit holding the first edited line, or at an earlier
+        # unmatched quote that the edit may close
+        units = self._units
+        begin = first
+        while units[begin] is None:
+            begin -= 1
+        dangling = self._dangling
+        if quoted and dangling and dangling[0] < begin:
+            begin = dangling[0]
+
+        start_index = self.token_index(begin + 1) # Also anchors token_index() on `begin`, unchanged by the edit
+        lines[first:last + 1] = replacement
+        units[first:last + 1] = [None] * len(replacement)
+        old_counts = self._counts[first:last + 1]
+        self._counts[first:last + 1] = [0] * len(replacement)
+        split = bisect_left(dangling, first)
+        self._dangling = dangling[:split] + [line + delta for line in dangling[split:] if line > last]
+
+        old_count = sum(self._counts[begin:first]) + sum(old_counts)
+        stop, old_rest = self._lex_lines(begin, first + len(replacement))
+        old_count += old_rest
+        new_count = sum(self._counts[begin:stop])
+        self._total += new_count - old_count
+        return TokenChange(start_index, start_index + old_count, start_index + new_count,
+                           list(islice(self.iter_tokens(begin + 1), new_count)), delta)
+
+    def _lex_lines(self, begin: int, end: int) -> Tuple[int, int]:
+        """
+        Re-lexes units from line index `begin` until one ends at or after `end` on a
+        line where an old unit starts (or at the end of the document). Returns the
+        index where re-lexing stopped and the number of old tokens it replaced
+        beyond `end`.
+        """
+        lines, units, counts = self._lines, self._units, self._counts
+        size = len(lines)
+        replaced = 0
+        index = begin
+        while index < size:
+            if index >= end and units[index] is not None:
+                break # Resynchronised: the old units from here on are still valid
+            tokens, stop, dangling = self._lex_unit(index)
+            for line in range(max(index, end), stop):
+                replaced += counts[line]
+            units[index] = tokens
+            counts[index] = len(tokens)
+            units[index + 1:stop] = [None] * (stop - index - 1)
+            counts[index + 1:stop] = [0] * (stop - index - 1)
+            self._set_dangling(index, stop, dangling)
+            index = stop
+        return index, replaced
+
+    def _set_dangling(self, index: int, stop: int, dangling: bool):
+        """Records whether the unit [index, stop) ends with an unmatched quote."""
+        marks = self._dangling
+        low, high = bisect_left(marks, index), bisect_left(marks, stop)
+        marks[low:high] = [index] if dangling else []
+
+    def _lex_unit(self, index: int) -> Tuple[List[Token], int, bool]:
+        """
+        Lexes the unit starting on line `index`: the line itself, extended while a
+        quote opened in the unit is closed on a later line. Returns the tokens (lines
+        relative to the unit), the index of the line after the unit, and whether an
+        unmatched quote remains.
+        """
+        lines = self._lines
+        size = len(lines)
+        stop = index + 1
+        while True:
+            code = "\n".join(lines[index:stop]) if stop - index > 1 else lines[index]
+            if stop < size:
+                code += "\n"
+            state = [0, False]
+            tokens = list(self._lexer._scan(code, state))
+            if not state[1] or stop >= size:
+                return tokens, stop, state[1]
+            following = stop
+            while following < size and '"' not in lines[following]:
+                following += 1
+            if following == size:
+                return tokens, stop, True # No quote left: the unmatched one stays a MISC token
+            stop = following + 1
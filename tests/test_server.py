@@ -0,0 +1,58 @@
+import os
+import socket
+import tempfile
+import unittest
+from leanbridge import LeanBridgeInterpreter
+from leanbridge.actions.commands import ActionClaim, ActionSolve
+from leanbridge.server import RenderClient, RenderServer
+
+# Lot dont le rendu (~1 Mo) dépasse les tampons des sockets : le serveur ne peut pas
+# envoyer une réponse d'un coup et le client envoie encore ses requêtes
+ACTIONS = []
+for i in range(24000):
+    ACTIONS += [ActionClaim(f"l{i}", f"{i} + 0 = {i}"), ActionSolve("simp")]
+
+def expected_text() -> str:
+    bridge = LeanBridgeInterpreter()
+    for action in ACTIONS:
+        bridge.add_action(action)
+    return bridge.process()
+
+class PipelineTest(unittest.TestCase):
+    """Aller-retour render_many sur la machine locale (interblocage si le client n'est pas lu)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = expected_text()
+
+    def round_trip(self, address: str, max_pending=None):
+        server = RenderServer(address, workers=1, max_pending=max_pending, executor="thread")
+        server.run_in_thread()
+        try:
+            with RenderClient(server.bound_address, timeout=30) as client:
+                results = list(client.render_many([ACTIONS] * 8, window=8))
+                self.assertEqual(client.stats()["requests"], 8)
+        finally:
+            server.stop()
+        self.assertEqual(len(results), 8)
+        for result in results:
+            self.assertEqual(result.text, self.expected)
+
+    def test_tcp(self):
+        self.round_trip("127.0.0.1:0")
+
+    def test_tcp_single_slot(self):
+        self.round_trip("127.0.0.1:0", max_pending=1)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "sockets unix indisponibles")
+    def test_unix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.round_trip("unix:" + os.path.join(directory, "render.sock"), max_pending=4)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "sockets unix indisponibles")
+    def test_unix_single_slot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.round_trip("unix:" + os.path.join(directory, "render.sock"), max_pending=1)
+
+if __name__ == "__main__":
+    unittest.main()